@@ -0,0 +1,316 @@
+"""Delta maintenance of dailyAggregates.json and employeeTotals.json.
+
+Inserting, replacing or deleting shift reports adjusts only the dates and
+employees those reports touch. A small sidecar file (aggregateState.json)
+keeps the per-date report counts and the per-employee submittedAt multiset,
+so a deletion can drop an emptied date or employee and recompute
+``lastUpdated`` without looking at the rest of the history.
+
+Drafts saved from the API have no submittedAt and count for nothing until
+they are submitted, as in the Node services.
+
+The running totals are kept in whole cents, so any sequence of inserts and
+deletes lands on exactly the totals of a rebuild; they are turned back into
+dollars only when the files are written.
+"""
+import json
+import os
+
+from cents import from_cents, to_cents
+from reportStore import source_fingerprint
+from shiftRecords import ShiftReport
+
+AGGREGATES_FILE = 'dailyAggregates.json'
+EMPLOYEE_TOTALS_FILE = 'employeeTotals.json'
+STATE_FILE = 'aggregateState.json'
+
+DAILY_FIELDS = ['totalVideoCashIn', 'totalPosDeposit', 'totalLotteryDeposit']
+TOTAL_FIELDS = ['totalShortage', 'totalOverage']
+
+
+def over_short_split(over_short):
+    """Return (shortage, overage) for one over/short value"""
+    if over_short < 0:
+        return abs(over_short), 0
+    if over_short > 0:
+        return 0, over_short
+    return 0, 0
+
+
+def is_draft(report):
+    """True for a report saved but not submitted yet (a dict or a ShiftReport)"""
+    status = report.status if isinstance(report, ShiftReport) else report.get('status')
+    return status == 'draft'
+
+
+def report_contribution(report):
+    """What one report (a dict or a ShiftReport) adds to its date aggregate and its employee total, in cents
+
+    A draft adds nothing.
+    """
+    if is_draft(report):
+        return {field: 0 for field in DAILY_FIELDS}, 0, 0
+    if isinstance(report, ShiftReport):
+        pos, lottery = report.pos_shift_data, report.lottery_shift_data
+        video, pos_deposit, lottery_deposit = (
+            to_cents(lottery.video_cash_in) if lottery else 0,
+            to_cents(pos.expected_deposit) if pos else 0,
+            to_cents(lottery.transfer_bank) if lottery else 0,
+        )
+        over_shorts = [to_cents(section.over_short) if section else 0 for section in (pos, lottery)]
+    else:
+        pos = report.get('posShiftData') or {}
+        lottery = report.get('lotteryShiftData') or {}
+        video = to_cents(lottery.get('videoCashIn'))
+        pos_deposit = to_cents(pos.get('expectedDeposit'))
+        lottery_deposit = to_cents(lottery.get('transferBank'))
+        over_shorts = [to_cents(section.get('overShort')) for section in (pos, lottery)]
+    daily = {
+        'totalVideoCashIn': video,
+        'totalPosDeposit': pos_deposit,
+        'totalLotteryDeposit': lottery_deposit,
+    }
+    shortage = overage = 0
+    for over_short in over_shorts:
+        short, over = over_short_split(over_short)
+        shortage += short
+        overage += over
+    return daily, shortage, overage
+
+
+def report_identity(report):
+    """(date, employeeName, submittedAt) of a dict or a ShiftReport; submittedAt is '' when missing"""
+    if isinstance(report, ShiftReport):
+        return report.date, report.employee_name, report.submitted_at or ''
+    return report['date'], report['employeeName'], report.get('submittedAt') or ''
+
+
+def _in_cents(row, fields):
+    return {**row, **{field: to_cents(row.get(field)) for field in fields}}
+
+
+def _in_dollars(row, fields):
+    return {**row, **{field: from_cents(row[field]) for field in fields}}
+
+
+class AggregateState:
+    """Daily aggregates and employee totals that can be updated report by report
+
+    Takes and returns the rows of the JSON files (dollars); holds cents.
+    """
+
+    def __init__(self, daily=None, totals=None, date_counts=None, submitted=None):
+        self.daily = {a['date']: _in_cents(a, DAILY_FIELDS) for a in (daily or [])}
+        self.totals = {t['employeeName']: _in_cents(t, TOTAL_FIELDS) for t in (totals or [])}
+        self.date_counts = dict(date_counts or {})
+        # employeeName -> {submittedAt: number of reports}
+        self.submitted = {name: dict(stamps) for name, stamps in (submitted or {}).items()}
+        self.next_emp = 1 + max((int(t['id'].split('-')[-1]) for t in self.totals.values()
+                                 if str(t.get('id', '')).startswith('emp-')), default=0)
+
+    def insert(self, report):
+        if is_draft(report):
+            return
+        daily, shortage, overage = report_contribution(report)
+        date, name, stamp = report_identity(report)
+        agg = self.daily.get(date)
+        if agg is None:
+            agg = self.daily[date] = {'date': date, **{field: 0 for field in DAILY_FIELDS}}
+        for field, amount in daily.items():
+            agg[field] += amount
+        self.date_counts[date] = self.date_counts.get(date, 0) + 1
+
+        total = self.totals.get(name)
+        if total is None:
+            total = self.totals[name] = {
+                'id': f'emp-{self.next_emp:04d}',
+                'employeeName': name,
+                'totalShortage': 0,
+                'totalOverage': 0,
+                'lastUpdated': stamp,
+            }
+            self.next_emp += 1
+        total['totalShortage'] += shortage
+        total['totalOverage'] += overage
+        stamps = self.submitted.setdefault(name, {})
+        stamps[stamp] = stamps.get(stamp, 0) + 1
+        if stamp > total['lastUpdated']:
+            total['lastUpdated'] = stamp
+
+    def delete(self, report):
+        if is_draft(report):
+            return
+        daily, shortage, overage = report_contribution(report)
+        date, name, stamp = report_identity(report)
+        if date in self.daily:
+            if self.date_counts.get(date, 0) <= 1:
+                del self.daily[date]
+                self.date_counts.pop(date, None)
+            else:
+                for field, amount in daily.items():
+                    self.daily[date][field] -= amount
+                self.date_counts[date] -= 1
+
+        stamps = self.submitted.get(name, {})
+        if stamp in stamps:
+            stamps[stamp] -= 1
+            if stamps[stamp] == 0:
+                del stamps[stamp]
+        if name in self.totals:
+            if not stamps:
+                del self.totals[name]
+                self.submitted.pop(name, None)
+            else:
+                total = self.totals[name]
+                total['totalShortage'] -= shortage
+                total['totalOverage'] -= overage
+                if stamp == total['lastUpdated'] and stamp not in stamps:
+                    total['lastUpdated'] = max(stamps)
+
+    def apply(self, inserted=(), deleted=()):
+        """Apply a batch of changes; a replacement is the old report deleted and the new one inserted"""
+        for report in deleted:
+            self.delete(report)
+        for report in inserted:
+            self.insert(report)
+
+    def aggregates(self):
+        return [_in_dollars(agg, DAILY_FIELDS) for agg in self.daily.values()]
+
+    def employee_totals(self):
+        return [_in_dollars(total, TOTAL_FIELDS) for total in self.totals.values()]
+
+    def to_dict(self):
+        """Everything needed to restore the state, for the partition aggregate files"""
+        return {'daily': self.aggregates(), 'totals': self.employee_totals(),
+                'dates': self.date_counts, 'submitted': self.submitted}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get('daily'), data.get('totals'), data.get('dates'), data.get('submitted'))
+
+    def save(self, data_dir):
+        outputs = [
+            (AGGREGATES_FILE, self.aggregates(), 2),
+            (EMPLOYEE_TOTALS_FILE, self.employee_totals(), 2),
+            (STATE_FILE, {'dates': self.date_counts, 'submitted': self.submitted,
+                          'source': source_fingerprint(data_dir)}, None),
+        ]
+        for filename, data, indent in outputs:
+            path = os.path.join(data_dir, filename)
+            with open(path + '.tmp', 'w') as f:
+                json.dump(data, f, indent=indent)
+            os.replace(path + '.tmp', path)
+
+
+def merge(states):
+    """Combine the states of disjoint sets of reports, such as partitions, into one"""
+    merged = AggregateState()
+    for state in states:
+        for date, agg in state.daily.items():
+            target = merged.daily.get(date)
+            if target is None:
+                merged.daily[date] = dict(agg)
+            else:
+                for field in DAILY_FIELDS:
+                    target[field] += agg[field]
+            merged.date_counts[date] = merged.date_counts.get(date, 0) + state.date_counts.get(date, 0)
+        for name, total in state.totals.items():
+            target = merged.totals.get(name)
+            if target is None:
+                merged.totals[name] = {**total, 'id': f'emp-{merged.next_emp:04d}'}
+                merged.next_emp += 1
+            else:
+                for field in TOTAL_FIELDS:
+                    target[field] += total[field]
+                target['lastUpdated'] = max(target['lastUpdated'], total['lastUpdated'])
+            stamps = merged.submitted.setdefault(name, {})
+            for stamp, count in state.submitted.get(name, {}).items():
+                stamps[stamp] = stamps.get(stamp, 0) + count
+    return merged
+
+
+def rebuild(reports):
+    """Build the aggregates from scratch"""
+    state = AggregateState()
+    state.apply(inserted=reports)
+    return state
+
+
+def _read(path, default):
+    if not os.path.exists(path):
+        return default
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def load_state(data_dir, load_reports=None):
+    """Load the current aggregates for delta updates
+
+    Files written before the sidecar existed carry no counts, and files saved
+    before the reports last changed (see source_fingerprint) are behind, so
+    then the state is rebuilt from the reports returned by load_reports().
+    """
+    state = _read(os.path.join(data_dir, STATE_FILE), None)
+    if state is None or state.get('source') != source_fingerprint(data_dir):
+        reports = load_reports() if load_reports else []
+        return rebuild(reports)
+    return AggregateState(
+        _read(os.path.join(data_dir, AGGREGATES_FILE), []),
+        _read(os.path.join(data_dir, EMPLOYEE_TOTALS_FILE), []),
+        state.get('dates'),
+        state.get('submitted'),
+    )
+
+
+def compare(state, expected):
+    """List the differences between two states as human readable strings (totals must match to the cent)"""
+    problems = []
+    for date in sorted(set(state.daily) | set(expected.daily)):
+        got, want = state.daily.get(date), expected.daily.get(date)
+        if got is None or want is None:
+            problems.append(f'date {date}: {"missing" if got is None else "unexpected"}')
+            continue
+        for field in DAILY_FIELDS:
+            if got[field] != want[field]:
+                problems.append(f'date {date} {field}: '
+                                f'{from_cents(got[field]):.2f} != {from_cents(want[field]):.2f}')
+    for name in sorted(set(state.totals) | set(expected.totals)):
+        got, want = state.totals.get(name), expected.totals.get(name)
+        if got is None or want is None:
+            problems.append(f'employee {name}: {"missing" if got is None else "unexpected"}')
+            continue
+        for field in TOTAL_FIELDS:
+            if got[field] != want[field]:
+                problems.append(f'employee {name} {field}: '
+                                f'{from_cents(got[field]):.2f} != {from_cents(want[field]):.2f}')
+        if got['lastUpdated'] != want['lastUpdated']:
+            problems.append(f'employee {name} lastUpdated: {got["lastUpdated"]} != {want["lastUpdated"]}')
+    return problems
+
+
+def check(data_dir, reports):
+    """Compare the stored aggregates with a full rebuild from the reports"""
+    stored = AggregateState(_read(os.path.join(data_dir, AGGREGATES_FILE), []),
+                            _read(os.path.join(data_dir, EMPLOYEE_TOTALS_FILE), []))
+    return compare(stored, rebuild(reports))
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Verify or rebuild the aggregate files from shiftReports.json')
+    parser.add_argument('data_dir', help='Directory holding the data/*.json files')
+    parser.add_argument('--rebuild', action='store_true', help='Rewrite the aggregates from scratch')
+    args = parser.parse_args()
+
+    reports = _read(os.path.join(args.data_dir, 'shiftReports.json'), [])
+    if args.rebuild:
+        rebuild(reports).save(args.data_dir)
+        print(f'[SUCCESS] Rebuilt aggregates from {len(reports)} reports')
+    else:
+        problems = check(args.data_dir, reports)
+        for problem in problems:
+            print(f'  [MISMATCH] {problem}')
+        print(f'[{"ERROR" if problems else "OK"}] {len(problems)} mismatches against a full rebuild of {len(reports)} reports')
+        raise SystemExit(1 if problems else 0)
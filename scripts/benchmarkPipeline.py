@@ -0,0 +1,235 @@
+"""Benchmarks for the import, generation and aggregation pipeline.
+
+Every stage runs in a fresh worker process so its peak memory is its own:
+
+* ``import``    - fixture workbooks in the template layout, extracted the way
+  importExcelData.py does (workbooks/s, reports/s)
+* ``generate``  - synthetic reports written as a shiftReports.json array
+* ``aggregate`` - loading the reports, then a full rebuild of the aggregates,
+  the NumPy roll-up and a one-day delta update
+
+Results are saved as JSON. Given a baseline file, metrics that got worse by
+more than the threshold are flagged and the run exits with status 1.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date as Date, datetime, timedelta, timezone
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+DEFAULT_SIZES = [1000, 100000, 1000000]
+DEFAULT_WORKBOOKS = 50
+STAGES = ['import', 'generate', 'aggregate']
+THRESHOLD = 0.2
+SEED = 20240101
+
+# Whether a metric is better when higher (rates) or lower (latency, memory)
+HIGHER_IS_BETTER = ('PerSec',)
+LOWER_IS_BETTER = ('Seconds', 'Mb')
+
+
+def _dates_for(shifts):
+    """Enough consecutive dates for the given number of day + night shifts"""
+    from workloadGenerator import date_range
+
+    days = max(1, (shifts + 1) // 2)
+    return date_range('2020-01-01', (Date(2020, 1, 1) + timedelta(days=days - 1)).isoformat())
+
+
+def peak_memory_mb():
+    """Peak resident memory of this process, or None where it cannot be read"""
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return None
+        return getattr(psutil.Process().memory_info(), 'peak_wset', 0) / 2 ** 20 or None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+
+def bench_import(size, workdir, workers):
+    """Extract `size` fixture workbooks; returns throughput metrics"""
+    from importExcelData import extract_workbooks
+    from sheetTemplate import write_workbook
+    from workloadGenerator import iter_reports
+
+    dates = _dates_for(size * 2)[:size]
+    by_date = {}
+    for report in iter_reports(dates, seed=SEED):
+        by_date.setdefault(report['date'], []).append(report)
+    workbooks = []
+    for date_str, reports in by_date.items():
+        path = os.path.join(workdir, f'{date_str}.xlsx')
+        write_workbook(path, reports)
+        workbooks.append((path, date_str))
+
+    started = time.perf_counter()
+    cpu = time.process_time()
+    reports = errors = 0
+    for result in extract_workbooks(workbooks, workers):
+        reports += len(result['reports'])
+        errors += bool(result['error'])
+    elapsed = time.perf_counter() - started
+    return {
+        'workbooks': len(workbooks),
+        'reports': reports,
+        'errors': errors,
+        'wallSeconds': elapsed,
+        'cpuSeconds': time.process_time() - cpu,
+        'workbooksPerSec': len(workbooks) / elapsed,
+        'reportsPerSec': reports / elapsed,
+    }
+
+
+def bench_generate(size, workdir, workers):
+    """Generate and serialize `size` shifts to a shiftReports.json array"""
+    from workloadGenerator import plan_chunks, write_dataset
+
+    started = time.perf_counter()
+    cpu = time.process_time()
+    total = write_dataset(os.path.join(workdir, 'shiftReports.json'),
+                          plan_chunks(_dates_for(size), seed=SEED), workers)
+    elapsed = time.perf_counter() - started
+    return {
+        'reports': total,
+        'wallSeconds': elapsed,
+        'cpuSeconds': time.process_time() - cpu,
+        'reportsPerSec': total / elapsed,
+        'megabytesPerSec': os.path.getsize(os.path.join(workdir, 'shiftReports.json')) / 2 ** 20 / elapsed,
+    }
+
+
+def bench_aggregate(size, workdir, workers):
+    """Recompute the aggregates over `size` shifts three ways"""
+    from aggregateMaintenance import rebuild
+    from vectorAggregates import ReportColumns, daily_aggregates, employee_totals
+    from workloadGenerator import plan_chunks, write_dataset
+
+    path = os.path.join(workdir, 'shiftReports.json')
+    if not os.path.exists(path):
+        write_dataset(path, plan_chunks(_dates_for(size), seed=SEED), workers)
+
+    started = time.perf_counter()
+    with open(path, 'r') as f:
+        reports = json.load(f)
+    loaded = time.perf_counter()
+    state = rebuild(reports)
+    rebuilt = time.perf_counter()
+    cols = ReportColumns.from_reports(reports)
+    columns = time.perf_counter()
+    daily_aggregates(cols)
+    employee_totals(cols)
+    vectored = time.perf_counter()
+    # A one-day backfill: the last date's reports replaced in place
+    last_day = [r for r in reports[-4:] if r['date'] == reports[-1]['date']]
+    state.apply(inserted=last_day, deleted=last_day)
+    delta = time.perf_counter()
+    return {
+        'reports': len(reports),
+        'loadSeconds': loaded - started,
+        'rebuildSeconds': rebuilt - loaded,
+        'rebuildReportsPerSec': len(reports) / (rebuilt - loaded),
+        'vectorLoadSeconds': columns - rebuilt,
+        'vectorAggregateSeconds': vectored - columns,
+        'deltaSeconds': delta - vectored,
+    }
+
+
+BENCHMARKS = {
+    'import': bench_import,
+    'generate': bench_generate,
+    'aggregate': bench_aggregate,
+}
+
+
+def _run_stage(job):
+    """Run one benchmark inside a fresh worker process"""
+    stage, size, workers = job
+    with tempfile.TemporaryDirectory(prefix=f'bench-{stage}-') as workdir:
+        metrics = BENCHMARKS[stage](size, workdir, workers)
+    metrics['peakMemoryMb'] = peak_memory_mb()
+    return metrics
+
+
+def run_benchmarks(stages, sizes, workbooks=DEFAULT_WORKBOOKS, workers=1):
+    """Run every stage at every size; returns the results document"""
+    results = []
+    for stage in stages:
+        # Workbook fixtures are slow to build, so the import stage has its own size
+        for size in ([workbooks] if stage == 'import' else sizes):
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                metrics = pool.submit(_run_stage, (stage, size, workers)).result()
+            results.append({'stage': stage, 'size': size, 'metrics': metrics})
+            print(f'  [OK] {stage} x {size}: ' + ', '.join(
+                f'{k} {v:.3f}' if isinstance(v, float) else f'{k} {v}' for k, v in metrics.items()))
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpuCount': os.cpu_count(),
+        'workers': workers,
+        'results': results,
+    }
+
+
+def compare_results(current, baseline, threshold=THRESHOLD):
+    """Metrics that got worse than the baseline by more than threshold, as strings"""
+    previous = {(r['stage'], r['size']): r['metrics'] for r in baseline.get('results', [])}
+    regressions = []
+    for result in current['results']:
+        before = previous.get((result['stage'], result['size']))
+        if not before:
+            continue
+        for name, value in result['metrics'].items():
+            old = before.get(name)
+            if not isinstance(value, (int, float)) or not isinstance(old, (int, float)) or not old:
+                continue
+            change = (value - old) / old
+            if name.endswith(HIGHER_IS_BETTER) and change < -threshold or \
+                    name.endswith(LOWER_IS_BETTER) and change > threshold:
+                regressions.append(f'{result["stage"]} x {result["size"]} {name}: '
+                                   f'{old:.3f} -> {value:.3f} ({change:+.0%})')
+    return regressions
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark the import, generation and aggregation pipeline')
+    parser.add_argument('--stages', default=','.join(STAGES), help='Comma separated stages (default: %(default)s)')
+    parser.add_argument('--sizes', default=','.join(str(s) for s in DEFAULT_SIZES),
+                        help='Comma separated shift counts for generate/aggregate (default: %(default)s)')
+    parser.add_argument('--workbooks', type=int, default=DEFAULT_WORKBOOKS,
+                        help='Fixture workbooks for the import stage (default: %(default)s)')
+    parser.add_argument('-j', '--workers', type=int, default=1)
+    parser.add_argument('--output', default='benchmarkResults.json', help='Where to save the results')
+    parser.add_argument('--baseline', help='Earlier results file to compare against')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help='Relative slowdown flagged as a regression (default: %(default)s)')
+    args = parser.parse_args()
+
+    stages = args.stages.split(',')
+    unknown = [s for s in stages if s not in BENCHMARKS]
+    if unknown:
+        parser.error(f'unknown stages: {", ".join(unknown)}')
+
+    document = run_benchmarks(stages, [int(s) for s in args.sizes.split(',')], args.workbooks, args.workers)
+    with open(args.output, 'w') as f:
+        json.dump(document, f, indent=2)
+    print(f'[SUCCESS] Saved results to {args.output}')
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            regressions = compare_results(document, json.load(f), args.threshold)
+        for line in regressions:
+            print(f'  [REGRESSION] {line}')
+        if regressions:
+            sys.exit(1)
+        print('[OK] No regressions against the baseline')
@@ -0,0 +1,452 @@
+"""Batched bulk loader from shift-report JSON or Excel into the Prisma schema.
+
+Reports are staged in temporary tables in large batches (COPY on Postgres,
+executemany on the SQLite stand-in) and merged with set-based SQL:
+
+* ``daily_shift_reports`` is upserted on its ``(date, shift_type,
+  employee_name)`` unique key, then the staged reports are joined back on
+  that key so children always point at the row that won, whatever its id.
+* ``pos_shift_data``, ``lottery_shift_data``, ``lottery_draws`` and
+  ``transfer_bank_deposits`` of the loaded reports are replaced.
+* ``daily_aggregates`` and ``employee_totals`` are recomputed for the dates
+  and employees that were touched, using the same rules as
+  aggregateService.ts and employeeTotalsService.ts.
+
+The SQLite stand-in creates the tables itself so the loader can be tried
+locally: ``python bulkLoader.py data/shiftReports.json --database-url sqlite:///local.db``.
+"""
+import csv
+import io
+import json
+import os
+import sqlite3
+import time
+import uuid
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from jsonStream import iter_array
+from shiftRecords import to_dicts
+
+BATCH_SIZE = 20000
+
+# Child row ids are derived from the report's natural key, so re-loading is idempotent
+ID_NAMESPACE = uuid.UUID('6f1c1d9e-3a5b-4f0e-9a57-2b1f4c6d8e01')
+
+# JSON denomination labels -> DenominationType enum; the enum has no $2 value
+DENOMINATION_ENUM = {
+    'coin': 'coin', '1': 'one', '5': 'five', '10': 'ten',
+    '20': 'twenty', '50': 'fifty', '100': 'hundred',
+}
+
+POS_COLUMNS = [
+    ('am_start_till', 'amStartTill'),
+    ('expected_deposit', 'expectedDeposit'),
+    ('lottery_till_added', 'lotteryTillAdded'),
+    ('total_pos_sales', 'totalPosSales'),
+    ('transfer_bank_should_have', 'transferBankShouldHave'),
+    ('transfer_bank_actually_have', 'transferBankActuallyHave'),
+    ('over_short', 'overShort'),
+]
+LOTTERY_COLUMNS = [
+    ('am_start_till', 'amStartTill'),
+    ('video_cash_in', 'videoCashIn'),
+    ('online_sales', 'onlineSales'),
+    ('extra_money_added', 'extraMoneyAdded'),
+    ('extra_money_added_dayshift', 'extraMoneyAddedDayshift'),
+    ('extra_money_added_nightshift', 'extraMoneyAddedNightshift'),
+    ('online_validate', 'onlineValidate'),
+    ('free_tickets', 'freeTickets'),
+    ('scratch_it_validate', 'scratchItValidate'),
+    ('misc_payout', 'miscPayout'),
+    ('misc_payout_dayshift', 'miscPayoutDayshift'),
+    ('misc_payout_nightshift', 'miscPayoutNightshift'),
+    ('money_given_to_pos', 'moneyGivenToPos'),
+    ('video_validate', 'videoValidate'),
+    ('total_lottery', 'totalLottery'),
+    ('transfer_bank', 'transferBank'),
+    ('over_short', 'overShort'),
+]
+# Columns that are NOT NULL in the schema default to 0 when a sheet leaves them out
+POS_REQUIRED = {'am_start_till', 'expected_deposit', 'lottery_till_added', 'transfer_bank_actually_have'}
+LOTTERY_REQUIRED = {'am_start_till', 'video_cash_in', 'online_sales', 'online_validate',
+                    'free_tickets', 'scratch_it_validate', 'misc_payout', 'transfer_bank'}
+
+# Staging tables: (name, [(column, type)])
+STAGES = [
+    ('stage_reports', [('id', 'text'), ('date', 'date'), ('location_id', 'text'), ('shift_type', 'text'),
+                       ('employee_name', 'text'), ('submitted_by', 'text'), ('submitted_at', 'timestamp'),
+                       ('status', 'text')]),
+    ('stage_pos', [('report_id', 'text'), ('id', 'text')] + [(c, 'money') for c, _ in POS_COLUMNS]
+     + [('comments', 'text')]),
+    ('stage_lottery', [('report_id', 'text'), ('id', 'text')] + [(c, 'money') for c, _ in LOTTERY_COLUMNS]
+     + [('comments', 'text')]),
+    ('stage_draws', [('report_id', 'text'), ('id', 'text'), ('draw_amount', 'money'), ('draw_number', 'int')]),
+    ('stage_deposits', [('report_id', 'text'), ('id', 'text'), ('denomination_type', 'text'),
+                        ('transfer_bank_amount', 'money'), ('deposit_amount', 'money')]),
+]
+
+SQLITE_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY, email TEXT UNIQUE NOT NULL, password_hash TEXT NOT NULL,
+    role TEXT NOT NULL DEFAULT 'employee', name TEXT NOT NULL, employee_id TEXT UNIQUE,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP, updated_at TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS locations (
+    id TEXT PRIMARY KEY, name TEXT NOT NULL, address TEXT,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP, updated_at TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS daily_shift_reports (
+    id TEXT PRIMARY KEY, date TEXT NOT NULL, location_id TEXT REFERENCES locations(id),
+    shift_type TEXT NOT NULL, employee_name TEXT NOT NULL, submitted_by TEXT NOT NULL REFERENCES users(id),
+    submitted_at TEXT, status TEXT NOT NULL DEFAULT 'draft',
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP, updated_at TEXT NOT NULL,
+    UNIQUE (date, shift_type, employee_name));
+CREATE INDEX IF NOT EXISTS daily_shift_reports_date_idx ON daily_shift_reports (date);
+CREATE TABLE IF NOT EXISTS pos_shift_data (
+    id TEXT PRIMARY KEY, shift_report_id TEXT UNIQUE NOT NULL REFERENCES daily_shift_reports(id) ON DELETE CASCADE,
+    am_start_till REAL NOT NULL, expected_deposit REAL NOT NULL, lottery_till_added REAL NOT NULL,
+    total_pos_sales REAL, transfer_bank_should_have REAL, transfer_bank_actually_have REAL NOT NULL,
+    over_short REAL, comments TEXT);
+CREATE TABLE IF NOT EXISTS lottery_shift_data (
+    id TEXT PRIMARY KEY, shift_report_id TEXT UNIQUE NOT NULL REFERENCES daily_shift_reports(id) ON DELETE CASCADE,
+    am_start_till REAL NOT NULL, video_cash_in REAL NOT NULL, online_sales REAL NOT NULL,
+    extra_money_added REAL, extra_money_added_dayshift REAL, extra_money_added_nightshift REAL,
+    online_validate REAL NOT NULL, free_tickets REAL NOT NULL, scratch_it_validate REAL NOT NULL,
+    misc_payout REAL NOT NULL, misc_payout_dayshift REAL, misc_payout_nightshift REAL,
+    money_given_to_pos REAL, video_validate REAL, total_lottery REAL, transfer_bank REAL NOT NULL,
+    over_short REAL, comments TEXT);
+CREATE TABLE IF NOT EXISTS lottery_draws (
+    id TEXT PRIMARY KEY, shift_report_id TEXT NOT NULL REFERENCES daily_shift_reports(id) ON DELETE CASCADE,
+    draw_amount REAL NOT NULL, draw_number INTEGER NOT NULL,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP);
+CREATE INDEX IF NOT EXISTS lottery_draws_shift_report_id_idx ON lottery_draws (shift_report_id);
+CREATE TABLE IF NOT EXISTS transfer_bank_deposits (
+    id TEXT PRIMARY KEY, shift_report_id TEXT NOT NULL REFERENCES daily_shift_reports(id) ON DELETE CASCADE,
+    denomination_type TEXT NOT NULL, transfer_bank_amount REAL NOT NULL, deposit_amount REAL NOT NULL);
+CREATE INDEX IF NOT EXISTS transfer_bank_deposits_shift_report_id_idx ON transfer_bank_deposits (shift_report_id);
+CREATE TABLE IF NOT EXISTS employee_totals (
+    id TEXT PRIMARY KEY, employee_id TEXT NOT NULL REFERENCES users(id), location_id TEXT REFERENCES locations(id),
+    total_shortage REAL NOT NULL DEFAULT 0, total_overage REAL NOT NULL DEFAULT 0,
+    last_updated TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP, UNIQUE (employee_id, location_id));
+CREATE TABLE IF NOT EXISTS daily_aggregates (
+    id TEXT PRIMARY KEY, date TEXT NOT NULL, location_id TEXT REFERENCES locations(id),
+    total_video_cash_in REAL NOT NULL DEFAULT 0, total_pos_deposit REAL NOT NULL DEFAULT 0,
+    total_lottery_deposit REAL NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP, updated_at TEXT NOT NULL,
+    UNIQUE (date, location_id));
+'''
+
+
+class SqliteDialect:
+    name = 'sqlite'
+    now = 'CURRENT_TIMESTAMP'
+    new_id = 'lower(hex(randomblob(16)))'
+    types = {'text': 'TEXT', 'date': 'TEXT', 'timestamp': 'TEXT', 'money': 'REAL', 'int': 'INTEGER'}
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA foreign_keys = ON')
+        self.conn.executescript(SQLITE_SCHEMA)
+
+    def cast(self, expr, enum):
+        return expr
+
+    def create_stage(self, table, columns):
+        cols = ', '.join(f'{c} {self.types[t]}' for c, t in columns)
+        self.conn.execute(f'CREATE TEMP TABLE IF NOT EXISTS {table} ({cols})')
+        self.conn.execute(f'DELETE FROM {table}')
+
+    def load(self, table, columns, rows):
+        marks = ', '.join('?' for _ in columns)
+        self.conn.executemany(f'INSERT INTO {table} ({", ".join(c for c, _ in columns)}) VALUES ({marks})', rows)
+
+    def execute(self, sql, params=()):
+        return self.conn.execute(sql, params)
+
+    def commit(self):
+        self.conn.commit()
+
+    def default_user(self):
+        """The stand-in has no real users, so reports are attributed to a local import user"""
+        row = self.conn.execute("SELECT id FROM users WHERE email = 'import@sheetpro.local'").fetchone()
+        if row:
+            return row[0]
+        user_id = str(uuid.uuid5(ID_NAMESPACE, 'import-user'))
+        self.conn.execute(
+            "INSERT INTO users (id, email, password_hash, role, name, updated_at) "
+            "VALUES (?, 'import@sheetpro.local', '!', 'admin', 'Bulk Import', CURRENT_TIMESTAMP)", (user_id,))
+        return user_id
+
+
+class PostgresDialect:
+    name = 'postgres'
+    now = 'now()'
+    new_id = 'gen_random_uuid()::text'
+    types = {'text': 'text', 'date': 'date', 'timestamp': 'timestamp(3)', 'money': 'numeric(10, 2)',
+             'int': 'integer'}
+
+    def __init__(self, url):
+        try:
+            import psycopg2
+        except ImportError:
+            raise SystemExit('[ERROR] Loading into Postgres needs psycopg2 (pip install psycopg2-binary)')
+        # Prisma URLs carry ?schema=..., which libpq does not understand
+        parts = urlsplit(url)
+        query = dict(parse_qsl(parts.query))
+        schema = query.pop('schema', None)
+        self.conn = psycopg2.connect(urlunsplit(parts._replace(query=urlencode(query))))
+        if schema:
+            with self.conn.cursor() as cur:
+                cur.execute('SET search_path TO %s', (schema,))
+
+    def cast(self, expr, enum):
+        return f'CAST({expr} AS "{enum}")'
+
+    def create_stage(self, table, columns):
+        cols = ', '.join(f'{c} {self.types[t]}' for c, t in columns)
+        with self.conn.cursor() as cur:
+            cur.execute(f'CREATE TEMP TABLE IF NOT EXISTS {table} ({cols})')
+            cur.execute(f'TRUNCATE {table}')
+
+    def load(self, table, columns, rows):
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        for row in rows:
+            writer.writerow(['\\N' if v is None else v for v in row])
+        buf.seek(0)
+        with self.conn.cursor() as cur:
+            cur.copy_expert(
+                f"COPY {table} ({', '.join(c for c, _ in columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')", buf)
+
+    def execute(self, sql, params=()):
+        cur = self.conn.cursor()
+        cur.execute(sql.replace('?', '%s'), params)
+        return cur
+
+    def commit(self):
+        self.conn.commit()
+
+    def default_user(self):
+        raise SystemExit('[ERROR] --submitted-by USER_ID is required when loading into Postgres')
+
+
+def connect(url):
+    if url.startswith('sqlite:///'):
+        return SqliteDialect(url[len('sqlite:///'):])
+    if url.endswith('.db') or url.endswith('.sqlite'):
+        return SqliteDialect(url)
+    return PostgresDialect(url)
+
+
+def _child_id(report, kind, n=0):
+    key = f'{report["date"]}|{report["shiftType"]}|{report["employeeName"]}|{kind}|{n}'
+    return str(uuid.uuid5(ID_NAMESPACE, key))
+
+
+def stage_rows(reports, submitted_by, skipped):
+    """Map report dicts onto the staging tables' rows"""
+    rows = {table: [] for table, _ in STAGES}
+    for report in reports:
+        rid = report['id']
+        rows['stage_reports'].append((
+            rid, report['date'], report.get('locationId'), report['shiftType'], report['employeeName'],
+            submitted_by, report.get('submittedAt'), report.get('status', 'submitted'),
+        ))
+        pos = report.get('posShiftData')
+        if pos:
+            values = [pos.get(key, 0 if col in POS_REQUIRED else None) for col, key in POS_COLUMNS]
+            rows['stage_pos'].append((rid, _child_id(report, 'pos'), *values, pos.get('comments') or None))
+        lottery = report.get('lotteryShiftData')
+        if lottery:
+            values = [lottery.get(key, 0 if col in LOTTERY_REQUIRED else None) for col, key in LOTTERY_COLUMNS]
+            rows['stage_lottery'].append((rid, _child_id(report, 'lottery'), *values,
+                                          lottery.get('comments') or None))
+        for draw in report.get('lotteryDraws') or []:
+            rows['stage_draws'].append((rid, _child_id(report, 'draw', draw['drawNumber']),
+                                        draw['drawAmount'], draw['drawNumber']))
+        for deposit in report.get('transferBankDeposits') or []:
+            enum = DENOMINATION_ENUM.get(str(deposit['denominationType']))
+            if enum is None:
+                skipped[str(deposit['denominationType'])] = skipped.get(str(deposit['denominationType']), 0) + 1
+                continue
+            rows['stage_deposits'].append((rid, _child_id(report, 'deposit', enum), enum,
+                                           deposit.get('transferBankAmount', 0), deposit.get('depositAmount', 0)))
+    return rows
+
+
+def merge_batch(db):
+    """Upsert the staged reports and replace their children"""
+    now = db.now
+    db.execute(f'''
+        INSERT INTO daily_shift_reports
+            (id, date, location_id, shift_type, employee_name, submitted_by, submitted_at, status,
+             created_at, updated_at)
+        SELECT id, date, location_id, {db.cast('shift_type', 'ShiftType')}, employee_name, submitted_by,
+               submitted_at, {db.cast('status', 'ReportStatus')}, {now}, {now}
+        FROM stage_reports WHERE true
+        ON CONFLICT (date, shift_type, employee_name) DO UPDATE SET
+            location_id = excluded.location_id, submitted_by = excluded.submitted_by,
+            submitted_at = excluded.submitted_at, status = excluded.status, updated_at = excluded.updated_at
+    ''')
+    # Which row each staged report ended up in, whether inserted or already there
+    db.execute('DROP TABLE IF EXISTS stage_map')
+    db.execute(f'''
+        CREATE TEMP TABLE stage_map AS
+        SELECT s.id AS stage_id, r.id AS report_id
+        FROM stage_reports s
+        JOIN daily_shift_reports r
+          ON r.date = s.date AND r.shift_type = {db.cast('s.shift_type', 'ShiftType')}
+         AND r.employee_name = s.employee_name
+    ''')
+    children = [
+        ('pos_shift_data', 'stage_pos', [c for c, _ in POS_COLUMNS] + ['comments'], {}),
+        ('lottery_shift_data', 'stage_lottery', [c for c, _ in LOTTERY_COLUMNS] + ['comments'], {}),
+        ('lottery_draws', 'stage_draws', ['draw_amount', 'draw_number'], {'created_at': now}),
+        ('transfer_bank_deposits', 'stage_deposits',
+         ['denomination_type', 'transfer_bank_amount', 'deposit_amount'],
+         {'denomination_type': db.cast('c.denomination_type', 'DenominationType')}),
+    ]
+    for table, stage, columns, overrides in children:
+        db.execute(f'DELETE FROM {table} WHERE shift_report_id IN (SELECT report_id FROM stage_map)')
+        target = ['id', 'shift_report_id'] + columns + [c for c in overrides if c not in columns]
+        source = ['c.id', 'm.report_id'] + [overrides.get(c, f'c.{c}') for c in columns] + \
+                 [overrides[c] for c in overrides if c not in columns]
+        db.execute(f'''
+            INSERT INTO {table} ({", ".join(target)})
+            SELECT {", ".join(source)} FROM {stage} c JOIN stage_map m ON m.stage_id = c.report_id
+        ''')
+
+
+def refresh_aggregates(db, dates, employees):
+    """Recompute daily aggregates and employee totals for the touched dates and employees"""
+    now = db.now
+    db.create_stage('stage_dates', [('date', 'date')])
+    db.load('stage_dates', [('date', 'date')], [(d,) for d in sorted(dates)])
+    db.create_stage('stage_employees', [('employee_name', 'text')])
+    db.load('stage_employees', [('employee_name', 'text')], [(e,) for e in sorted(employees)])
+
+    # Same totals as calculateDailyAggregates: submitted reports, POS deposit = transfer bank actually have
+    db.execute('DELETE FROM daily_aggregates WHERE date IN (SELECT date FROM stage_dates)')
+    db.execute(f'''
+        INSERT INTO daily_aggregates
+            (id, date, location_id, total_video_cash_in, total_pos_deposit, total_lottery_deposit,
+             created_at, updated_at)
+        SELECT {db.new_id}, r.date, r.location_id,
+               COALESCE(SUM(l.video_cash_in), 0), COALESCE(SUM(p.transfer_bank_actually_have), 0),
+               COALESCE(SUM(l.transfer_bank), 0), {now}, {now}
+        FROM daily_shift_reports r
+        LEFT JOIN pos_shift_data p ON p.shift_report_id = r.id
+        LEFT JOIN lottery_shift_data l ON l.shift_report_id = r.id
+        WHERE r.status = 'submitted' AND r.date IN (SELECT date FROM stage_dates)
+        GROUP BY r.date, r.location_id
+    ''')
+
+    # employee_totals is keyed by user, matched on users.name like the API's employee names
+    db.execute('''
+        DELETE FROM employee_totals WHERE employee_id IN (
+            SELECT u.id FROM users u WHERE u.name IN (SELECT employee_name FROM stage_employees))
+    ''')
+    db.execute(f'''
+        INSERT INTO employee_totals (id, employee_id, location_id, total_shortage, total_overage, last_updated)
+        SELECT {db.new_id}, u.id, r.location_id,
+               SUM(CASE WHEN p.over_short < 0 THEN -p.over_short ELSE 0 END
+                 + CASE WHEN l.over_short < 0 THEN -l.over_short ELSE 0 END),
+               SUM(CASE WHEN p.over_short > 0 THEN p.over_short ELSE 0 END
+                 + CASE WHEN l.over_short > 0 THEN l.over_short ELSE 0 END),
+               {now}
+        FROM daily_shift_reports r
+        JOIN users u ON u.name = r.employee_name
+        LEFT JOIN pos_shift_data p ON p.shift_report_id = r.id
+        LEFT JOIN lottery_shift_data l ON l.shift_report_id = r.id
+        WHERE r.status <> 'draft' AND r.employee_name IN (SELECT employee_name FROM stage_employees)
+        GROUP BY u.id, r.location_id
+    ''')
+    row = db.execute('''
+        SELECT COUNT(DISTINCT employee_name) FROM stage_employees
+        WHERE employee_name NOT IN (SELECT name FROM users)
+    ''').fetchone()
+    return row[0] if row else 0
+
+
+def load_reports(db, reports, submitted_by=None, batch_size=BATCH_SIZE):
+    """Load an iterable of report dicts in batches; returns counters for the summary"""
+    submitted_by = submitted_by or db.default_user()
+    for table, columns in STAGES:
+        db.create_stage(table, columns)
+    stats = {'reports': 0, 'batches': 0, 'skippedDenominations': {}}
+    dates, employees = set(), set()
+
+    def flush(batch):
+        # The unique key can only be hit once per statement, so the last report per key wins
+        by_key = {(r['date'], r['shiftType'], r['employeeName']): r for r in batch}
+        rows = stage_rows(by_key.values(), submitted_by, stats['skippedDenominations'])
+        for table, columns in STAGES:
+            db.create_stage(table, columns)
+            db.load(table, columns, rows[table])
+        merge_batch(db)
+        db.commit()
+        stats['reports'] += len(by_key)
+        stats['batches'] += 1
+
+    batch = []
+    for report in reports:
+        batch.append(report)
+        dates.add(report['date'])
+        employees.add(report['employeeName'])
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+    stats['unmatchedEmployees'] = refresh_aggregates(db, dates, employees)
+    db.commit()
+    return stats
+
+
+def iter_input(paths, year):
+    """Reports from data directories, JSON arrays, JSON Lines files, or workbooks (directories/globs of .xlsx)"""
+    workbooks = []
+    for path in paths:
+        if os.path.isdir(path) and os.path.exists(os.path.join(path, 'shiftReports.json')):
+            from reportStore import open_store
+            yield from open_store(path).iter_reports()
+        elif path.endswith('.jsonl'):
+            with open(path, 'r') as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+        elif path.endswith('.json'):
+            yield from iter_array(path)
+        else:
+            workbooks.append(path)
+    if workbooks:
+        from importExcelData import collect_workbooks, import_workbooks
+        for result in import_workbooks(collect_workbooks(workbooks, year)):
+            yield from to_dicts(result['reports'])
+
+
+if __name__ == '__main__':
+    import argparse
+    from datetime import datetime
+
+    parser = argparse.ArgumentParser(description='Bulk load shift reports into the relational schema')
+    parser.add_argument('inputs', nargs='+', help='Data directories, shiftReports.json / .jsonl files, or workbook directories/globs')
+    parser.add_argument('--database-url', default=os.environ.get('DATABASE_URL'),
+                        help='Postgres URL or sqlite:///path.db (default: $DATABASE_URL)')
+    parser.add_argument('--submitted-by', help='users.id recorded as submitter of the loaded reports')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--year', type=int, default=datetime.now().year,
+                        help='Year for workbooks named month.day.xlsx (default: current year)')
+    args = parser.parse_args()
+    if not args.database_url:
+        parser.error('--database-url or DATABASE_URL is required')
+
+    db = connect(args.database_url)
+    started = time.perf_counter()
+    stats = load_reports(db, iter_input(args.inputs, args.year), args.submitted_by, args.batch_size)
+    elapsed = time.perf_counter() - started
+    print(f'[SUCCESS] Loaded {stats["reports"]} reports in {stats["batches"]} batches into {db.name} '
+          f'in {elapsed:.2f}s ({stats["reports"] / elapsed if elapsed else 0:.0f} reports/s)')
+    for denom, count in sorted(stats['skippedDenominations'].items()):
+        print(f'  [WARN] Skipped {count} deposits with denomination {denom!r} (not in DenominationType)')
+    if stats['unmatchedEmployees']:
+        print(f'  [WARN] {stats["unmatchedEmployees"]} employee names have no matching user, '
+              f'so no employee_totals row')
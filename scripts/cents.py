@@ -0,0 +1,80 @@
+"""Money as whole cents.
+
+Every amount in the reports has two decimals, so sums, differences and
+reconciliation are done on integers (Python ints, or int64 NumPy arrays for
+the batch code) and are exact. Amounts are turned into cents once, where
+they are read from a workbook cell or a JSON document, and back into
+dollars only where they are written out; the float dollars of the JSON files
+are unchanged.
+
+A cell can hold more decimals (a formula's result); it is rounded to the
+cent half away from zero, as Excel rounds, on the decimal the amount was
+written as: 1.005 is 1.01 even though the float nearest to it is just below.
+
+``x / 100`` of an integer is the float nearest to the two-decimal value, the
+same float ``json`` reads back from "12.34", so no ``round`` is needed on
+the way out.
+"""
+from decimal import ROUND_HALF_UP, Decimal
+
+# How close to half a cent a float product must be to be settled on its decimal digits
+HALF_TOLERANCE = 1e-6
+
+
+def _half_cents(dollars):
+    # repr gives the shortest decimal that reads back as this float, the amount as written
+    return int(Decimal(repr(dollars)).scaleb(2).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def to_cents(value):
+    """Whole cents of a dollar amount; blank, 'even', NaN and anything unparsable are 0"""
+    if value is None or value == '':
+        return 0
+    if isinstance(value, int):
+        return value * 100
+    if isinstance(value, str):
+        if value.strip().lower() == 'even':
+            return 0
+        try:
+            value = float(value)
+        except ValueError:
+            return 0
+    try:
+        dollars = float(value)
+    except (TypeError, ValueError):
+        return 0
+    # NaN never equals itself; infinities have no cents either
+    if dollars != dollars or dollars in (float('inf'), float('-inf')):
+        return 0
+    cents = dollars * 100
+    if abs(abs(cents % 1) - 0.5) < HALF_TOLERANCE:
+        return _half_cents(dollars)
+    return round(cents)
+
+
+def from_cents(cents):
+    """Dollars of a whole cent amount, as the float the JSON files hold"""
+    return cents / 100
+
+
+def cents_array(values, count=-1):
+    """int64 cents of an array or iterable of dollar amounts (None, NaN and infinities count as 0)"""
+    import numpy as np
+
+    if isinstance(values, np.ndarray):
+        dollars = values.astype(np.float64)
+    else:
+        dollars = np.fromiter((0 if v is None else v for v in values), dtype=np.float64, count=count)
+    # As in to_cents; nan_to_num would turn infinities into 1.8e308, which overflows int64
+    dollars = np.where(np.isfinite(dollars), dollars, 0.0)
+    cents = dollars * 100
+    whole = np.rint(cents).astype(np.int64)
+    # The few amounts near half a cent are rounded like to_cents
+    for i in np.flatnonzero(np.abs(np.abs(cents % 1) - 0.5) < HALF_TOLERANCE):
+        whole[i] = _half_cents(float(dollars[i]))
+    return whole
+
+
+def to_dollars(cents):
+    """Float dollars of an int64 cents array, as a list ready to serialize"""
+    return (cents / 100).tolist()
@@ -0,0 +1,208 @@
+"""Columnar export of shift reports to Parquet, partitioned by year/month.
+
+The nested report dicts are flattened into three tables:
+
+* ``shifts``   - one wide row per shift report (POS, lottery till and
+  transfer-bank details as prefixed columns)
+* ``draws``    - one row per lottery draw
+* ``deposits`` - one row per transfer-bank denomination
+
+Reports are streamed in batches, so the export never holds the whole history
+in memory. pyarrow is only needed when this module is used.
+"""
+from datetime import date as Date
+import os
+import shutil
+
+POS_FIELDS = [
+    'amStartTill', 'expectedDeposit', 'lotteryTillAdded', 'totalPosSales',
+    'transferBankShouldHave', 'transferBankActuallyHave', 'overShort',
+]
+LOTTERY_FIELDS = [
+    'amStartTill', 'videoCashIn', 'onlineSales',
+    'extraMoneyAdded', 'extraMoneyAddedDayshift', 'extraMoneyAddedNightshift',
+    'onlineValidate', 'freeTickets', 'scratchItValidate',
+    'miscPayout', 'miscPayoutDayshift', 'miscPayoutNightshift',
+    'transferBank', 'moneyGivenToPos', 'videoValidate', 'totalLottery', 'overShort',
+]
+DETAIL_FIELDS = ['transferBankBlueBag', 'depositShouldHave', 'actuallyHaveBlackBag', 'totalCashDeposit']
+
+# Columns shared by every table: the report key plus the partition columns
+KEY_COLUMNS = ['reportId', 'date', 'year', 'month', 'shiftType', 'employeeName', 'locationId']
+
+BATCH_SIZE = 50000
+
+
+def _column(prefix, key):
+    return prefix + key[0].upper() + key[1:] if prefix else key
+
+
+SHIFT_MONEY_COLUMNS = (
+    [(_column('pos', k), 'posShiftData', k) for k in POS_FIELDS]
+    + [(_column('lottery', k), 'lotteryShiftData', k) for k in LOTTERY_FIELDS]
+    + [(_column('', k), 'transferBankDetails', k) for k in DETAIL_FIELDS]
+)
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.dataset
+    except ImportError:
+        raise SystemExit('[ERROR] The columnar export needs pyarrow (pip install pyarrow)')
+    return pyarrow
+
+
+def schemas(pa):
+    key_fields = [
+        pa.field('reportId', pa.string()),
+        pa.field('date', pa.date32()),
+        pa.field('year', pa.int16()),
+        pa.field('month', pa.int8()),
+        pa.field('shiftType', pa.string()),
+        pa.field('employeeName', pa.string()),
+        pa.field('locationId', pa.string()),
+    ]
+    shifts = pa.schema(
+        key_fields
+        + [pa.field('status', pa.string()), pa.field('submittedAt', pa.string())]
+        + [pa.field(name, pa.float64()) for name, _, _ in SHIFT_MONEY_COLUMNS]
+        + [pa.field('drawCount', pa.int8()), pa.field('drawTotal', pa.float64()),
+           pa.field('depositTotal', pa.float64())]
+    )
+    draws = pa.schema(key_fields + [pa.field('drawNumber', pa.int8()), pa.field('drawAmount', pa.float64())])
+    deposits = pa.schema(key_fields + [
+        pa.field('denominationType', pa.string()),
+        pa.field('transferBankAmount', pa.float64()),
+        pa.field('depositAmount', pa.float64()),
+    ])
+    return {'shifts': shifts, 'draws': draws, 'deposits': deposits}
+
+
+class _Columns:
+    """Column lists for one table, filled row by row and handed to pyarrow per batch"""
+
+    def __init__(self, names):
+        self.data = {name: [] for name in names}
+
+    def add(self, values):
+        for name, column in self.data.items():
+            column.append(values.get(name))
+
+    def __len__(self):
+        return len(next(iter(self.data.values())))
+
+
+def flatten_batch(reports, schema_map):
+    """Flatten a batch of report dicts into column lists for each table"""
+    tables = {name: _Columns(schema.names) for name, schema in schema_map.items()}
+    for report in reports:
+        y, m, d = (int(part) for part in report['date'].split('-'))
+        key = {
+            'reportId': report.get('id'),
+            'date': Date(y, m, d),
+            'year': y,
+            'month': m,
+            'shiftType': report.get('shiftType'),
+            'employeeName': report.get('employeeName'),
+            'locationId': report.get('locationId'),
+        }
+        draws = report.get('lotteryDraws') or []
+        deposits = report.get('transferBankDeposits') or []
+        row = dict(key)
+        row['status'] = report.get('status')
+        row['submittedAt'] = report.get('submittedAt')
+        for name, section, field in SHIFT_MONEY_COLUMNS:
+            row[name] = (report.get(section) or {}).get(field)
+        row['drawCount'] = len(draws)
+        row['drawTotal'] = sum(d.get('drawAmount', 0) for d in draws)
+        row['depositTotal'] = sum(d.get('depositAmount', 0) for d in deposits)
+        tables['shifts'].add(row)
+        for draw in draws:
+            tables['draws'].add({**key, **draw})
+        for deposit in deposits:
+            tables['deposits'].add({**key, **deposit})
+    return tables
+
+
+def iter_tables(reports, batch_size=BATCH_SIZE):
+    """Yield {table name: pyarrow.Table} for each batch of reports"""
+    pa = _require_pyarrow()
+    schema_map = schemas(pa)
+    batch = []
+    for report in reports:
+        batch.append(report)
+        if len(batch) >= batch_size:
+            yield _to_tables(pa, schema_map, batch)
+            batch = []
+    if batch:
+        yield _to_tables(pa, schema_map, batch)
+
+
+def _to_tables(pa, schema_map, batch):
+    columns = flatten_batch(batch, schema_map)
+    return {name: pa.Table.from_pydict(columns[name].data, schema=schema_map[name]) for name in schema_map}
+
+
+def to_arrow(reports):
+    """In-memory Arrow view of the reports: {'shifts': Table, 'draws': Table, 'deposits': Table}"""
+    pa = _require_pyarrow()
+    schema_map = schemas(pa)
+    parts = {name: [] for name in schema_map}
+    for tables in iter_tables(reports):
+        for name, table in tables.items():
+            parts[name].append(table)
+    return {name: pa.concat_tables(parts[name]) if parts[name] else schema_map[name].empty_table()
+            for name in schema_map}
+
+
+def export_parquet(reports, out_dir, batch_size=BATCH_SIZE):
+    """Write the three tables as hive-partitioned Parquet datasets under out_dir/<table>/year=/month=/"""
+    pa = _require_pyarrow()
+    import pyarrow.dataset as ds
+
+    schema_map = schemas(pa)
+    counts = {name: 0 for name in schema_map}
+    partitioning = ds.partitioning(pa.schema([('year', pa.int16()), ('month', pa.int8())]), flavor='hive')
+    # A full export replaces whatever a previous run left behind
+    for name in schema_map:
+        shutil.rmtree(os.path.join(out_dir, name), ignore_errors=True)
+    for batch_no, tables in enumerate(iter_tables(reports, batch_size)):
+        for name, table in tables.items():
+            if not table.num_rows:
+                continue
+            counts[name] += table.num_rows
+            ds.write_dataset(
+                table, os.path.join(out_dir, name), format='parquet',
+                partitioning=partitioning,
+                basename_template=f'part-{batch_no:05d}-{{i}}.parquet',
+                existing_data_behavior='overwrite_or_ignore',
+            )
+    return counts
+
+
+def open_dataset(out_dir, table='shifts'):
+    """Open an exported table for column- and partition-pruned scans"""
+    pa = _require_pyarrow()
+    import pyarrow.dataset as ds
+
+    partitioning = ds.partitioning(pa.schema([('year', pa.int16()), ('month', pa.int8())]), flavor='hive')
+    return ds.dataset(os.path.join(out_dir, table), format='parquet', partitioning=partitioning)
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    from reportStore import open_store
+
+    parser = argparse.ArgumentParser(description='Export shift reports to Parquet partitioned by year/month')
+    parser.add_argument('data_dir', help='Directory holding shiftReports.json')
+    parser.add_argument('out_dir', help='Directory to write the shifts/draws/deposits datasets to')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    counts = export_parquet(open_store(args.data_dir).iter_reports(), args.out_dir, args.batch_size)
+    print(f'[SUCCESS] Exported {counts["shifts"]} shifts, {counts["draws"]} draws and '
+          f'{counts["deposits"]} deposits to {args.out_dir} in {time.perf_counter() - started:.2f}s')
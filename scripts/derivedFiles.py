@@ -0,0 +1,83 @@
+"""Every file derived from the shift reports, maintained as one.
+
+The daily aggregates and employee totals, the over/short series, the
+draw/deposit cube and the over/short sketches are all folded from the same
+reports. Writers (the importer, the January top-up, the sample generator,
+``sheetpro aggregate --rebuild``) go through DerivedFiles instead of naming
+each file, so a batch reaches all of them and a new derived file is added
+here once.
+
+Each file records the fingerprint of the shiftReports.json it was saved
+after (reportStore.source_fingerprint) and is rebuilt on load when the
+reports have changed since, e.g. by the Node backend. Save only after the
+reports themselves are written.
+"""
+from contextlib import nullcontext
+
+from aggregateMaintenance import AggregateState, load_state
+from drawDepositCube import FACTS, DrawDepositCube, load_cube, report_facts
+from overShortSeries import OverShortSeries, load_series
+from overShortSketches import OverShortSketches, load_sketches
+
+NAMES = ['aggregates', 'series', 'cube', 'sketches']
+
+
+def _stage(metrics, name):
+    return metrics.stage(name) if metrics else nullcontext()
+
+
+class DerivedFiles:
+    """The aggregates, series, cube and sketches of one data directory"""
+
+    def __init__(self, aggregates=None, series=None, cube=None, sketches=None):
+        self.aggregates = aggregates or AggregateState()
+        self.series = series or OverShortSeries()
+        self.cube = cube or DrawDepositCube()
+        self.sketches = sketches or OverShortSketches()
+
+    @classmethod
+    def load(cls, data_dir, load_reports=None, metrics=None):
+        """Load the saved files; a missing or stale one is built from the reports returned by load_reports()"""
+        loaders = {'aggregates': load_state, 'series': load_series, 'cube': load_cube, 'sketches': load_sketches}
+        parts = {}
+        for name in NAMES:
+            with _stage(metrics, f'{name}.load'):
+                parts[name] = loaders[name](data_dir, load_reports)
+        return cls(**parts)
+
+    @classmethod
+    def from_reports(cls, reports, metrics=None):
+        """Build every file in one pass over the reports"""
+        derived = cls()
+        with _stage(metrics, 'derived.rebuild'):
+            for _ in derived.building(reports):
+                pass
+        return derived
+
+    def building(self, reports):
+        """Yield the reports back while inserting them into every file, for a pass that also writes them out
+
+        The cube is built from the collected draw and deposit rows once the
+        reports run out.
+        """
+        rows = {fact: [] for fact in FACTS}
+        for report in reports:
+            self.aggregates.insert(report)
+            self.series.insert(report)
+            self.sketches.insert(report)
+            for fact, fact_rows in report_facts(report).items():
+                rows[fact].extend(fact_rows)
+            yield report
+        self.cube = DrawDepositCube.from_fact_rows(rows)
+
+    def apply(self, inserted=(), deleted=(), metrics=None):
+        """Fold in new reports and take out the ones they replace or that were deleted"""
+        inserted, deleted = list(inserted), list(deleted)
+        for name in NAMES:
+            with _stage(metrics, f'{name}.update'):
+                getattr(self, name).apply(inserted=inserted, deleted=deleted)
+
+    def save(self, data_dir, metrics=None):
+        for name in NAMES:
+            with _stage(metrics, f'{name}.save'):
+                getattr(self, name).save(data_dir)
@@ -0,0 +1,252 @@
+"""Materialized cube over the lottery draws and the deposit denominations.
+
+Two fact tables are taken out of the nested report lists:
+
+* draws     date x shiftType x employee x location x drawNumber   -> drawAmount, count
+* deposits  date x shiftType x employee x location x denomination -> depositAmount, transferBankAmount, count
+
+Each keeps a day-level base cuboid plus every roll-up of month, shiftType,
+employee, location and the draw number / denomination (32 cuboids, down to
+the grand total), so a question like "$20 deposits per month per store" is a
+dictionary lookup. A batch of new or replaced reports is turned into a small
+delta cube with the same roll-ups and added in, so imports never rebuild the
+whole cube. Measures are whole cents, so adding and subtracting deltas never
+drifts from a rebuild. Everything is saved to drawDepositCube.json next to
+the aggregates. Drafts are left out, as they are of the aggregates.
+"""
+from itertools import combinations
+import json
+import os
+
+from aggregateMaintenance import is_draft
+from cents import from_cents, to_cents
+from reportStore import source_fingerprint
+from shiftRecords import ShiftReport
+
+CUBE_FILE = 'drawDepositCube.json'
+# Files from before the measures were kept in cents lack this and are rebuilt
+CUBE_UNIT = 'cents'
+FACTS = {
+    'draws': {'dimension': 'drawNumber', 'measures': ['drawAmount']},
+    'deposits': {'dimension': 'denomination', 'measures': ['depositAmount', 'transferBankAmount']},
+}
+REPORT_DIMS = ['shiftType', 'employee', 'location']
+GRAND_TOTAL = '*'
+
+
+def _dims(fact):
+    return ['month'] + REPORT_DIMS + [FACTS[fact]['dimension']]
+
+
+def base_dims(fact):
+    return ['date'] + REPORT_DIMS + [FACTS[fact]['dimension']]
+
+
+def cuboid_name(dims):
+    return ','.join(dims) or GRAND_TOTAL
+
+
+def rollup_dims(fact):
+    """Every subset of the month-level dimensions, in a fixed order"""
+    dims = _dims(fact)
+    return [list(subset) for size in range(len(dims), -1, -1) for subset in combinations(dims, size)]
+
+
+def report_facts(report):
+    """{fact: [(date, shiftType, employee, location, key, *measures in cents)]} for one dict or ShiftReport
+
+    A draft has no facts yet.
+    """
+    if is_draft(report):
+        return {'draws': [], 'deposits': []}
+    if isinstance(report, ShiftReport):
+        head = (report.date, report.shift_type, report.employee_name, report.location_id)
+        draws = [head + (d.draw_number, to_cents(d.draw_amount)) for d in report.lottery_draws or ()]
+        deposits = [head + (str(d.denomination_type), to_cents(d.deposit_amount), to_cents(d.transfer_bank_amount))
+                    for d in report.transfer_bank_deposits or ()]
+    else:
+        head = (report['date'], report['shiftType'], report['employeeName'], report.get('locationId'))
+        draws = [head + (d.get('drawNumber'), to_cents(d.get('drawAmount'))) for d in report.get('lotteryDraws') or ()]
+        deposits = [head + (str(d.get('denominationType')), to_cents(d.get('depositAmount')),
+                            to_cents(d.get('transferBankAmount')))
+                    for d in report.get('transferBankDeposits') or ()]
+    return {'draws': draws, 'deposits': deposits}
+
+
+def _add_cell(cells, key, values, sign=1):
+    cell = cells.get(key)
+    if cell is None:
+        cells[key] = [sign * v for v in values]
+    else:
+        for i, v in enumerate(values):
+            cell[i] += sign * v
+
+
+def _group(cells, positions):
+    """Sum cells onto the key positions given"""
+    grouped = {}
+    for key, values in cells.items():
+        _add_cell(grouped, tuple(key[i] for i in positions), values)
+    return grouped
+
+
+class FactCube:
+    """The base cuboid and the roll-ups of one fact table; each cell is [*measures in cents, count]"""
+
+    def __init__(self, fact, cuboids=None):
+        self.fact = fact
+        self.measures = FACTS[fact]['measures']
+        self.cuboids = cuboids if cuboids is not None else {}
+
+    @classmethod
+    def from_rows(cls, fact, rows):
+        """Build base cells from fact rows, then derive every roll-up from the finest month cuboid"""
+        base = {}
+        for row in rows:
+            _add_cell(base, row[:5], list(row[5:]) + [1])
+        cube = cls(fact, {cuboid_name(base_dims(fact)): base})
+        finest = {}
+        for key, values in base.items():
+            _add_cell(finest, (key[0][:7],) + key[1:], values)
+        dims = _dims(fact)
+        for subset in rollup_dims(fact):
+            positions = [dims.index(d) for d in subset]
+            cube.cuboids[cuboid_name(subset)] = finest if len(subset) == len(dims) else _group(finest, positions)
+        return cube
+
+    def add(self, other, sign=1):
+        """Add (or with sign=-1 subtract) another cube of the same fact, dropping emptied cells"""
+        for name, cells in other.cuboids.items():
+            target = self.cuboids.setdefault(name, {})
+            for key, values in cells.items():
+                _add_cell(target, key, values, sign)
+                if not target[key][-1]:
+                    del target[key]
+
+    def query(self, by, where=None):
+        """Rows grouped by the dimensions in by, restricted to where {dimension: value}"""
+        where = where or {}
+        wanted = set(by) | set(where)
+        if 'date' in wanted:
+            dims = base_dims(self.fact)
+        else:
+            dims = [d for d in _dims(self.fact) if d in wanted]
+        unknown = wanted - set(dims)
+        if unknown:
+            raise KeyError(f'Unknown {self.fact} dimensions: {", ".join(sorted(unknown))} '
+                           f'(known: {", ".join(["date"] + _dims(self.fact))})')
+        cells = self.cuboids.get(cuboid_name(dims), {})
+        checks = [(dims.index(d), str(v)) for d, v in where.items()]
+        positions = [dims.index(d) for d in by]
+        grouped = {}
+        for key, values in cells.items():
+            if all(str(key[i]) == v for i, v in checks):
+                _add_cell(grouped, tuple(key[i] for i in positions), values)
+        rows = []
+        for key in sorted(grouped, key=lambda k: tuple('' if v is None else str(v) for v in k)):
+            values = grouped[key]
+            row = dict(zip(by, key))
+            row.update({m: from_cents(v) for m, v in zip(self.measures, values)})
+            row['count'] = values[-1]
+            rows.append(row)
+        return rows
+
+    def to_dict(self):
+        return {name: [list(key) + values for key, values in cells.items()] for name, cells in self.cuboids.items()}
+
+    @classmethod
+    def from_dict(cls, fact, data):
+        width = len(FACTS[fact]['measures']) + 1
+        cuboids = {}
+        for name, rows in data.items():
+            size = 0 if name == GRAND_TOTAL else name.count(',') + 1
+            cuboids[name] = {tuple(row[:size]): row[size:size + width] for row in rows}
+        return cls(fact, cuboids)
+
+
+class DrawDepositCube:
+    """The draws and deposits cubes, updated together"""
+
+    def __init__(self, cubes=None):
+        self.cubes = cubes or {fact: FactCube(fact) for fact in FACTS}
+
+    @classmethod
+    def from_reports(cls, reports):
+        rows = {fact: [] for fact in FACTS}
+        for report in reports:
+            for fact, fact_rows in report_facts(report).items():
+                rows[fact].extend(fact_rows)
+        return cls.from_fact_rows(rows)
+
+    @classmethod
+    def from_fact_rows(cls, rows):
+        """Build the cubes from {fact: [report_facts rows]}"""
+        return cls({fact: FactCube.from_rows(fact, fact_rows) for fact, fact_rows in rows.items()})
+
+    def apply(self, inserted=(), deleted=()):
+        """Fold a batch of new and replaced reports in through two small delta cubes"""
+        deleted = list(deleted)
+        if deleted:
+            for fact, cube in DrawDepositCube.from_reports(deleted).cubes.items():
+                self.cubes[fact].add(cube, -1)
+        for fact, cube in DrawDepositCube.from_reports(inserted).cubes.items():
+            self.cubes[fact].add(cube)
+
+    def query(self, fact, by, where=None):
+        return self.cubes[fact].query(by, where)
+
+    def save(self, data_dir):
+        path = os.path.join(data_dir, CUBE_FILE)
+        with open(path + '.tmp', 'w') as f:
+            json.dump({'unit': CUBE_UNIT, 'source': source_fingerprint(data_dir),
+                       **{fact: cube.to_dict() for fact, cube in self.cubes.items()}}, f)
+        os.replace(path + '.tmp', path)
+
+
+def load_cube(data_dir, load_reports=None):
+    """Load the saved cube, or build it from the reports returned by load_reports() when it is missing or stale"""
+    path = os.path.join(data_dir, CUBE_FILE)
+    data = None
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            data = json.load(f)
+    if data is None or data.get('unit') != CUBE_UNIT or data.get('source') != source_fingerprint(data_dir):
+        return DrawDepositCube.from_reports(load_reports() if load_reports else [])
+    return DrawDepositCube({fact: FactCube.from_dict(fact, data.get(fact, {})) for fact in FACTS})
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    from reportStore import open_store
+
+    parser = argparse.ArgumentParser(description='Roll-ups of the lottery draws and deposit denominations')
+    parser.add_argument('data_dir', help='Directory holding shiftReports.json')
+    parser.add_argument('action', choices=['query', 'rebuild'])
+    parser.add_argument('--fact', choices=sorted(FACTS), default='deposits')
+    parser.add_argument('--by', default='month',
+                        help='Comma separated dimensions: date, month, shiftType, employee, location, '
+                             'drawNumber (draws) or denomination (deposits)')
+    parser.add_argument('--where', action='append', default=[], metavar='DIM=VALUE',
+                        help='Restrict a dimension, e.g. denomination=20 (repeatable)')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    store = open_store(args.data_dir)
+    if args.action == 'rebuild':
+        cube = DrawDepositCube.from_reports(store.iter_reports())
+        cube.save(args.data_dir)
+        cells = sum(len(cells) for c in cube.cubes.values() for cells in c.cuboids.values())
+        print(f'[SUCCESS] Rebuilt {cells} cube cells in {time.perf_counter() - started:.2f}s')
+    else:
+        cube = load_cube(args.data_dir, store.iter_reports)
+        loaded = time.perf_counter()
+        by = [d for d in args.by.split(',') if d]
+        where = dict(item.split('=', 1) for item in args.where)
+        try:
+            rows = cube.query(args.fact, by, where)
+        except KeyError as e:
+            parser.error(e.args[0])
+        print(json.dumps(rows, indent=2))
+        print(f'[OK] Answered in {(time.perf_counter() - loaded) * 1000:.1f}ms (load {loaded - started:.2f}s)')
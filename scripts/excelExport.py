@@ -0,0 +1,179 @@
+"""Write shift reports back into the daily workbook template.
+
+The inverse of the importer: each day's Day and Night shifts are placed in
+the cells the template reads them from (POS rows 5-12, draws 20-27, lottery
+rows 35-55, the denomination table in columns K and M), with captions in the
+cells the importer ignores, so a printed sheet looks like the stores' own and
+an exported sheet imports back to the same reports.
+
+Two layouts:
+
+* daily    OUT/[location=<id>/]YYYY-MM-DD.xlsx, names the importer parses
+* monthly  OUT/[location=<id>/]YYYY-MM.xlsx with one sheet per day, titled with the date,
+           which the importer reads back as a month workbook
+
+Workbooks are written with openpyxl's write-only mode, which streams rows to
+disk, and every workbook is a separate job for a process pool. Memory stays
+bounded whatever the export's size: the selected reports are streamed once
+into one JSON-lines spill file per output workbook, each job reads back only
+its own workbook's shifts, and jobs are submitted a few at a time as the
+pool finishes them.
+
+The employee name goes in the template's employee cell of each shift
+column, so with the same --location an exported workbook imports back to the
+same report IDs and replaces the shifts instead of adding copies. The sheet
+has no room for the status, submittedAt or comments; re-imported shifts are
+submitted, at noon of their day, with no comments.
+"""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import json
+import os
+import tempfile
+
+from partitionedStore import safe_name
+from sheetTemplate import DEFAULT_TEMPLATE, write_workbook_sheets
+from shiftRecords import to_dicts
+
+# Reports held before the spill files are appended to
+SPILL_BATCH = 20000
+
+
+def select_reports(reports, start=None, end=None, location=None):
+    """The report dicts in [start, end] (and of one location), streamed"""
+    for report in to_dicts(reports):
+        date = report['date']
+        if (start and date < start) or (end and date > end):
+            continue
+        if location is not None and report.get('locationId') != location:
+            continue
+        yield report
+
+
+def group_days(reports):
+    """[(date, [reports])] of one workbook's reports in date order, plus the conflict count
+
+    The sheet has one column per shift, so a second report for the same
+    day and shift (another employee) replaces the first.
+    """
+    days = {}
+    conflicts = 0
+    for report in reports:
+        shifts = days.setdefault(report['date'], {})
+        if report['shiftType'] in shifts:
+            conflicts += 1
+        shifts[report['shiftType']] = report
+    return [(date, list(days[date].values())) for date in sorted(days)], conflicts
+
+
+def workbook_path(out_dir, report, monthly=False):
+    """The daily or monthly workbook a report is written to"""
+    location = report.get('locationId')
+    directory = os.path.join(out_dir, f'location={safe_name(location)}') if location else out_dir
+    return os.path.join(directory, (report['date'][:7] if monthly else report['date']) + '.xlsx')
+
+
+def spill_reports(reports, spill_dir, out_dir, monthly=False):
+    """Stream reports into one JSON-lines file per output workbook; returns {workbook path: spill path}"""
+    spills = {}
+    buffered = {}
+    held = 0
+
+    def flush():
+        for path, lines in buffered.items():
+            with open(spills[path], 'a') as f:
+                f.writelines(lines)
+        buffered.clear()
+
+    for report in reports:
+        path = workbook_path(out_dir, report, monthly)
+        if path not in spills:
+            spills[path] = os.path.join(spill_dir, f'{len(spills)}.jsonl')
+        buffered.setdefault(path, []).append(json.dumps(report) + '\n')
+        held += 1
+        if held >= SPILL_BATCH:
+            flush()
+            held = 0
+    flush()
+    return spills
+
+
+def plan_jobs(spills, template_name=DEFAULT_TEMPLATE, labels=True):
+    """One (path, spill path, template, labels) job per workbook, in path order"""
+    for path in sorted(spills):
+        yield path, spills[path], template_name, labels
+
+
+def write_job(job):
+    """Write one workbook from its spill file (runs inside a pool worker)"""
+    path, spill_path, template_name, labels = job
+    with open(spill_path, 'r') as f:
+        sheets, conflicts = group_days(json.loads(line) for line in f)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp.xlsx'
+    write_workbook_sheets(tmp_path, sheets, template_name, labels)
+    os.replace(tmp_path, path)
+    return path, len(sheets), sum(len(reports) for _, reports in sheets), conflicts
+
+
+def run_jobs(jobs, workers=1):
+    """Yield write_job results in job order, keeping at most a couple of jobs per worker queued"""
+    if workers <= 1:
+        for job in jobs:
+            yield write_job(job)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        queued = deque()
+        for job in jobs:
+            queued.append(pool.submit(write_job, job))
+            if len(queued) >= workers * 2:
+                yield queued.popleft().result()
+        while queued:
+            yield queued.popleft().result()
+
+
+def export_workbooks(reports, out_dir, monthly=False, workers=1, template_name=DEFAULT_TEMPLATE,
+                     labels=True, start=None, end=None, location=None):
+    """Write the selected reports as daily or monthly workbooks; returns counts"""
+    summary = {'workbooks': 0, 'sheets': 0, 'reports': 0, 'conflicts': 0}
+    os.makedirs(out_dir, exist_ok=True)
+    with tempfile.TemporaryDirectory(prefix='.export-', dir=out_dir) as spill_dir:
+        spills = spill_reports(select_reports(reports, start, end, location), spill_dir, out_dir, monthly)
+        for _, sheets, count, conflicts in run_jobs(plan_jobs(spills, template_name, labels), workers):
+            summary['workbooks'] += 1
+            summary['sheets'] += sheets
+            summary['reports'] += count
+            summary['conflicts'] += conflicts
+    return summary
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    from reportStore import open_store
+    from sheetTemplate import TEMPLATES
+
+    parser = argparse.ArgumentParser(description='Write shift reports back into the daily workbook template')
+    parser.add_argument('data_dir', help='Directory holding shiftReports.json')
+    parser.add_argument('out_dir', help='Directory to write the workbooks to')
+    parser.add_argument('--monthly', action='store_true', help='One workbook per month with a sheet per day')
+    parser.add_argument('--from', dest='start', help='First date, inclusive (YYYY-MM-DD)')
+    parser.add_argument('--to', dest='end', help='Last date, inclusive (YYYY-MM-DD)')
+    parser.add_argument('--location', help='Only reports of this location id')
+    parser.add_argument('--template', choices=sorted(TEMPLATES), default=DEFAULT_TEMPLATE)
+    parser.add_argument('--no-labels', action='store_true', help='Values only, no captions')
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    summary = export_workbooks(open_store(args.data_dir).iter_reports(), args.out_dir, args.monthly,
+                               max(args.workers, 1), args.template, not args.no_labels,
+                               args.start, args.end, args.location)
+    elapsed = time.perf_counter() - started
+    if summary['conflicts']:
+        print(f'  [WARN] {summary["conflicts"]} reports share a location, day and shift with another; '
+              f'the later one is on the sheet')
+    print(f'[SUCCESS] Wrote {summary["reports"]} shifts on {summary["sheets"]} sheets in '
+          f'{summary["workbooks"]} workbooks to {args.out_dir} in {elapsed:.2f}s '
+          f'({summary["sheets"] / elapsed if elapsed else 0:.0f} sheets/s)')
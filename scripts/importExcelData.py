@@ -1,7 +1,24 @@
-import pandas as pd
-import json
+from collections import deque
 from datetime import datetime
 import os
+import glob
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from xml.etree import ElementTree
+import zipfile
+
+from derivedFiles import DerivedFiles
+from importJournal import JOURNAL_FILE, ImportJournal
+from importManifest import MANIFEST_FILE, ImportManifest, stable_files
+from importMetrics import Metrics
+from partitionedStore import open_partitions
+from reconcileReports import DEFAULT_RULES, TOLERANCE, print_violations, validate
+from reportKeys import UNASSIGNED_EMPLOYEE, dedupe, plan_upsert, report_id
+from reportStore import STORE_DIR, ReportStore, append_legacy, default_data_dir, open_store
+from sheetTemplate import TEMPLATES, DEFAULT_TEMPLATE, extract_workbook
+from shiftRecords import ShiftReport, to_dicts
+from workbookSheets import extract_sheet, is_period, parse_date, parse_month, read_workbook, sheet_titles
 
 # List of Excel files with their dates
 excel_files = [
@@ -26,211 +43,506 @@ excel_files = [
     ('c:\\Users\\Administrator\\Downloads\\11.10.xlsx', '2025-11-10'),
 ]
 
-def safe_float(val):
-    """Convert value to float, return 0 if invalid"""
-    if pd.isna(val) or val == '' or val is None:
-        return 0.0
+output_dir = default_data_dir()
+
+def date_from_filename(file_path, year):
+    """Derive the report date from a workbook file name (see workbookSheets.parse_date), None if it has no date"""
+    return parse_date(os.path.splitext(os.path.basename(file_path))[0], str(year))
+
+def period_of(file_path, year):
+    """The date of a workbook whose name has no day: its month (2025-05.xlsx) or else the year
+
+    A name such as 2025-05 marks a month workbook even with a single sheet
+    (a month exported with one day); otherwise only workbooks with more than
+    one sheet count, and any other undated file gives None.
+    """
+    month = parse_month(os.path.splitext(os.path.basename(file_path))[0])
+    if month:
+        return month
+    try:
+        if len(sheet_titles(file_path)) < 2:
+            return None
+    except (zipfile.BadZipFile, KeyError, ElementTree.ParseError):
+        # Not readable yet (still being copied) or damaged; extracting it reports why
+        pass
+    return str(year)
+
+def collect_workbooks(inputs, year):
+    """Expand directories and glob patterns into (path, date) pairs ordered by date then path
+
+    A multi-sheet workbook whose name has no day gets a 'YYYY-MM' or 'YYYY'
+    period instead of a date, and each of its sheets is dated on its own.
+    """
+    workbooks = {}
+    for item in inputs:
+        if os.path.isdir(item):
+            paths = glob.glob(os.path.join(item, '*.xlsx'))
+        else:
+            paths = glob.glob(item)
+        for path in paths:
+            # Skip the lock files Excel leaves next to open workbooks
+            if os.path.basename(path).startswith('~$'):
+                continue
+            date = date_from_filename(path, year) or period_of(path, year)
+            if date is None:
+                print(f'Skipping {path} - no date in file name')
+                continue
+            workbooks[os.path.abspath(path)] = date
+    return sorted(((path, date) for path, date in workbooks.items()), key=lambda w: (w[1], w[0]))
+
+def process_workbook(job):
+    """Extract the Day and Night shifts of one workbook as ShiftReport records (runs inside a pool worker)"""
+    file_path, date, template_name = job
+    started = time.perf_counter()
+    cpu = time.process_time()
+    result = {'path': file_path, 'date': date, 'reports': [], 'error': None, 'stats': {}}
+    try:
+        reports = extract_workbook(file_path, date, template_name, result['stats'])
+        result['reports'] = [ShiftReport.from_dict(report) for report in reports]
+    except Exception as e:
+        result['error'] = str(e)
+        result['reports'] = []
+    result['seconds'] = time.perf_counter() - started
+    result['cpuSeconds'] = time.process_time() - cpu
+    return result
+
+def process_sheet(job):
+    """Extract the shifts of one sheet of a month workbook (runs inside a pool worker)"""
+    title, xml, shared_strings, period, template_name = job
+    started = time.perf_counter()
+    cpu = time.process_time()
+    result = {'sheet': title, 'date': None, 'reports': [], 'error': None, 'stats': {}}
+    try:
+        result['date'], reports = extract_sheet(xml, shared_strings, title, period, template_name, result['stats'])
+        result['reports'] = [ShiftReport.from_dict(report) for report in reports]
+    except Exception as e:
+        result['error'] = str(e)
+        result['reports'] = []
+    result['seconds'] = time.perf_counter() - started
+    result['cpuSeconds'] = time.process_time() - cpu
+    return result
+
+def _run(job):
+    task, args = job
+    return task(args)
+
+def plan_workbook(file_path, date, template_name):
+    """The pool jobs of one workbook, and for a month workbook the result its sheets are merged into
+
+    A month workbook is decompressed here, once, and each sheet becomes a
+    job of its own, so the sheets of one file are extracted in parallel.
+    """
+    if not is_period(date):
+        return [(process_workbook, (file_path, date, template_name))], None
+    started = time.perf_counter()
+    cpu = time.process_time()
+    result = {'path': file_path, 'date': date, 'reports': [], 'error': None, 'stats': {},
+              'sheets': [], 'skippedSheets': []}
+    jobs = []
     try:
-        return float(val)
-    except:
-        return 0.0
-
-def extract_shift_data(df, date, shift_type, col_offset):
-    """Extract data for a specific shift from Excel"""
-    # Column indices based on shift (Day=2, Night=7)
-    value_col = col_offset
-    
-    data = {
-        'date': date,
-        'shiftType': shift_type,
-        'employeeName': '',  # Will be extracted
-        'status': 'submitted',
-        'submittedAt': f'{date}T12:00:00.000Z',
-    }
-    
-    # Extract POS data (rows 5-12)
-    data['posShiftData'] = {
-        'amStartTill': safe_float(df.iloc[5, value_col]),
-        'expectedDeposit': safe_float(df.iloc[6, value_col]),
-        'lotteryTillAdded': safe_float(df.iloc[7, value_col]),
-        'totalPosSales': safe_float(df.iloc[8, value_col]),
-        'transferBankShouldHave': safe_float(df.iloc[10, value_col]),
-        'transferBankActuallyHave': safe_float(df.iloc[11, value_col]),
-        'overShort': safe_float(df.iloc[12, value_col]) if str(df.iloc[12, value_col]).lower() != 'even' else 0.0,
-        'comments': ''
-    }
-    
-    # Extract Lottery Draws (Day shift only, rows 20-27)
-    if shift_type == 'day':
-        draws = []
-        for i in range(8):
-            amount = safe_float(df.iloc[20 + i, 1])  # Column B for draws
-            if amount > 0:
-                draws.append({'drawAmount': amount, 'drawNumber': i + 1})
-        if draws:
-            data['lotteryDraws'] = draws
-    
-    # Extract Lottery Till data (rows 35-53)
-    data['lotteryShiftData'] = {
-        'amStartTill': safe_float(df.iloc[35, value_col]),
-        'videoCashIn': safe_float(df.iloc[36, value_col]),
-        'onlineSales': safe_float(df.iloc[37, value_col]),
-        'onlineValidate': safe_float(df.iloc[40, value_col]),
-        'freeTickets': safe_float(df.iloc[41, value_col]),
-        'scratchItValidate': safe_float(df.iloc[42, value_col]),
-        'transferBank': safe_float(df.iloc[50, value_col]),
-        'moneyGivenToPos': safe_float(df.iloc[47, value_col]),
-        'videoValidate': safe_float(df.iloc[48, value_col]),
-        'totalLottery': safe_float(df.iloc[49, value_col]),
-        'overShort': safe_float(df.iloc[53, value_col]) if str(df.iloc[53, value_col]).lower() != 'even' else 0.0,
-        'comments': ''
-    }
-    
-    # Handle extra money added
-    if shift_type == 'day':
-        data['lotteryShiftData']['extraMoneyAdded'] = safe_float(df.iloc[38, value_col])
+        sheets, shared_strings = read_workbook(file_path)
+        jobs = [(process_sheet, (title, xml, shared_strings, date, template_name)) for title, xml in sheets]
+    except Exception as e:
+        result['error'] = str(e)
+    result['stats']['openSeconds'] = time.perf_counter() - started
+    result['seconds'] = result['stats']['openSeconds']
+    result['cpuSeconds'] = time.process_time() - cpu
+    return jobs, result
+
+def merge_sheets(result, outputs):
+    """Fold the per-sheet outputs of a month workbook into its result
+
+    One failed sheet fails the workbook, as a bad cell would a daily one, so
+    the manifest never records a month with days missing.
+    """
+    errors = []
+    for output in outputs:
+        result['seconds'] += output['seconds']
+        result['cpuSeconds'] += output['cpuSeconds']
+        for key, value in output['stats'].items():
+            result['stats'][key] = result['stats'].get(key, 0) + value
+        if output['error']:
+            errors.append(f'sheet {output["sheet"]!r}: {output["error"]}')
+        elif output['date'] is None:
+            result['skippedSheets'].append(output['sheet'])
+        else:
+            result['sheets'].append(output['date'])
+            result['reports'].extend(output['reports'])
+    if not result['error'] and not errors and not result['sheets']:
+        errors.append('no sheet has a date in its name or date cell')
+    if errors:
+        result['error'] = result['error'] or '; '.join(errors)
+        result['reports'] = []
+    return result
+
+def _finish(merged, outputs):
+    return outputs[0] if merged is None else merge_sheets(merged, outputs)
+
+def extract_workbooks(workbooks, workers=1, template_name=DEFAULT_TEMPLATE):
+    """Extract every workbook, in parallel when workers > 1, returning results in input order
+
+    Daily workbooks are one job each, month workbooks one job per sheet.
+    Jobs are submitted a little ahead of the workbook being waited for, which
+    keeps the pool busy across workbook boundaries while holding only a few
+    decompressed month workbooks at a time.
+    """
+    if workers > 1 and (len(workbooks) > 1 or any(is_period(date) for _, date in workbooks)):
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            queued = deque()
+            ahead = 0
+            for file_path, date in workbooks:
+                jobs, merged = plan_workbook(file_path, date, template_name)
+                queued.append((merged, [pool.submit(_run, job) for job in jobs]))
+                ahead += len(jobs)
+                # Results go out in submission order, which keeps the merged output deterministic
+                while len(queued) > 1 and ahead - len(queued[0][1]) >= workers * 2:
+                    merged, futures = queued.popleft()
+                    ahead -= len(futures)
+                    yield _finish(merged, [future.result() for future in futures])
+            while queued:
+                merged, futures = queued.popleft()
+                yield _finish(merged, [future.result() for future in futures])
+    else:
+        for file_path, date in workbooks:
+            jobs, merged = plan_workbook(file_path, date, template_name)
+            yield _finish(merged, [_run(job) for job in jobs])
+
+def import_workbooks(workbooks, workers=1, template_name=DEFAULT_TEMPLATE, metrics=None, location_id=None,
+                     journal=None):
+    """Run the extraction, print per-file throughput and return the successful results
+
+    Reports get location_id when the workbooks all come from one store and an
+    ID derived from their natural key, so re-importing a shift gives it the
+    same ID again. With a journal, every successful workbook is journaled as
+    soon as it is done.
+    """
+    metrics = metrics or Metrics()
+    results = []
+    report_count = 0
+    started = time.perf_counter()
+    busy = cpu_busy = 0.0
+    for result in extract_workbooks(workbooks, workers, template_name):
+        busy += result['seconds']
+        cpu_busy += result['cpuSeconds']
+        metrics.add_file(result)
+        if result['error']:
+            print(f'  [ERROR] Error processing {result["path"]}: {result["error"]}')
+            continue
+        for report in result['reports']:
+            report.employee_name = report.employee_name or UNASSIGNED_EMPLOYEE
+            if location_id is not None:
+                report.location_id = location_id
+            report.id = report_id(report)
+        if journal is not None:
+            journal.record(result)
+        report_count += len(result['reports'])
+        results.append(result)
+        rate = len(result['reports']) / result['seconds'] if result['seconds'] else 0
+        days = result['date']
+        if result.get('sheets'):
+            days = f'{len(result["sheets"])} sheets, {min(result["sheets"])} to {max(result["sheets"])}'
+        print(f'  [OK] {os.path.basename(result["path"])} ({days}): '
+              f'{len(result["reports"])} shifts in {result["seconds"]:.2f}s ({rate:.1f} reports/s)')
+        if result.get('skippedSheets'):
+            print(f'  [WARN] {os.path.basename(result["path"])}: skipped sheets with no date: '
+                  f'{", ".join(result["skippedSheets"])}')
+    elapsed = time.perf_counter() - started
+    metrics.stages['extract'] = {'calls': 1, 'wallSeconds': elapsed, 'cpuSeconds': cpu_busy}
+    if workbooks and elapsed:
+        print(f'\n[THROUGHPUT] {len(workbooks)} workbooks in {elapsed:.2f}s with {workers} worker(s): '
+              f'{len(workbooks) / elapsed:.2f} workbooks/s, {report_count / elapsed:.1f} reports/s, '
+              f'pool utilisation {busy / (elapsed * max(workers, 1)):.0%}')
+    return results
+
+def save_reports(data_dir, store, new_reports, replaced_ids, full=False, metrics=None, export=False):
+    """Write the shift reports to the store and shiftReports.json
+
+    The report store only receives the changed records. shiftReports.json is
+    appended in place when nothing was replaced and re-exported (written to a
+    temp file and renamed) otherwise or with export=True.
+    """
+    metrics = metrics or Metrics()
+    output_path = os.path.join(data_dir, 'shiftReports.json')
+    if full:
+        with metrics.stage('store.write'):
+            store.reset(to_dicts(new_reports))
+        with metrics.stage('legacy.export'):
+            store.export(output_path)
     else:
-        data['lotteryShiftData']['extraMoneyAddedDayshift'] = safe_float(df.iloc[38, value_col])
-        data['lotteryShiftData']['extraMoneyAddedNightshift'] = safe_float(df.iloc[39, value_col])
-    
-    # Handle misc payout
-    if shift_type == 'day':
-        data['lotteryShiftData']['miscPayout'] = safe_float(df.iloc[43, value_col])
+        with metrics.stage('store.write'):
+            # A report replaced under its own ID is superseded by the append, no tombstone needed
+            new_ids = {r.id for r in new_reports}
+            store.delete(rid for rid in replaced_ids if rid not in new_ids)
+            store.append(to_dicts(new_reports))
+        with metrics.stage('legacy.export'):
+            if replaced_ids or export:
+                store.export(output_path)
+            else:
+                append_legacy(output_path, to_dicts(new_reports))
+                store.mark_legacy(output_path)
+    # In the foreground: the next run (or watch poll) opens the store again as soon as this returns
+    store.maybe_compact(background=False)
+
+    print(f'[SUCCESS] Saved to {output_path}')
+
+def save_outputs(data_dir, store, new_reports, replaced_ids, derived, full=False, metrics=None):
+    """Write the shift reports, then every file derived from them (see derivedFiles)"""
+    metrics = metrics or Metrics()
+    save_reports(data_dir, store, new_reports, replaced_ids, full, metrics)
+    derived.save(data_dir, metrics)
+    aggregates = derived.aggregates
+    print(f'[SUCCESS] Saved {len(aggregates.daily)} daily aggregates and {len(aggregates.totals)} employee totals')
+
+def plan_batch(manifest, results, fingerprints):
+    """Record the extracted workbooks in the manifest and merge their reports
+
+    Returns ({natural key: report}, the IDs of the reports the changed
+    workbooks produced last time, the number of reports extracted). Reports
+    from a changed workbook are replaced by its new extraction; a workbook
+    that failed to extract keeps its previous reports.
+    """
+    stale_ids = set()
+    extracted = 0
+    for result in results:
+        stale_ids.update(manifest.report_ids(result['path']))
+        extracted += len(result['reports'])
+        manifest.record(result['path'], fingerprints[os.path.abspath(result['path'])],
+                        result['date'], [r.id for r in result['reports']])
+    # Two workbooks for the same day (5.7.xlsx and 2025-05-07.xlsx) give the same shifts; the later one wins
+    by_key = dedupe(report for result in results for report in result['reports'])
+    return by_key, stale_ids, extracted
+
+def commit_batch(data_dir, store, manifest, journal, by_key, stale_ids, full=False, partitioned=False, workers=1,
+                 metrics=None, recovering=False):
+    """Save a merged batch into every data file, then drop its journal
+
+    The journal is marked first, so an interruption anywhere below is
+    finished by the next run. When recovering that interruption the derived
+    files may be half updated, so they are rebuilt from the store once it
+    holds the batch, and shiftReports.json is re-exported rather than
+    appended to. Returns (reports saved, reports in the store), the total
+    taken from the upsert scan rather than another pass over the store.
+    """
+    metrics = metrics or Metrics()
+    new_reports = list(by_key.values())
+    journal.begin_commit()
+    # One streamed pass over the store finds every report the batch replaces, by natural
+    # key or by the IDs of a changed workbook's previous extraction; only those are held
+    stats = {'total': len(new_reports)}
+    with metrics.stage('store.scan'):
+        replaced = [] if full else plan_upsert(store.iter_reports(), by_key, stale_ids, stats)[1]
+    metrics.count('reportsReplaced', len(replaced))
+    replaced_ids = [r['id'] for r in replaced]
+    if partitioned:
+        partitions = open_partitions(data_dir)
+        # Checked before the reports are saved: partitions that missed earlier writes
+        # (Node edits, append, generate, or imports without --partitioned) are rebuilt
+        covered = partitions.covers(data_dir)
+
+    if recovering:
+        save_reports(data_dir, store, new_reports, replaced_ids, full, metrics, export=True)
+        derived = DerivedFiles.from_reports(store.iter_reports(), metrics)
+        derived.save(data_dir, metrics)
+    else:
+        if full:
+            derived = DerivedFiles.from_reports(new_reports, metrics)
+        else:
+            derived = DerivedFiles.load(data_dir, store.iter_reports, metrics)
+            derived.apply(inserted=new_reports, deleted=replaced, metrics=metrics)
+        save_outputs(data_dir, store, new_reports, replaced_ids, derived, full, metrics)
+    if partitioned:
+        with metrics.stage('partitions.update'):
+            if full or recovering or not covered:
+                refreshed = partitions.reset(store.iter_reports(), workers)
+            else:
+                partitions.delete(replaced)
+                refreshed = partitions.refresh(partitions.write(new_reports), workers)
+            partitions.mark_synced(data_dir)
+        print(f'[SUCCESS] Refreshed {len(refreshed)} location/month partitions')
+    with metrics.stage('manifest.save'):
+        manifest.save()
+    journal.clear()
+    return len(new_reports), stats['total']
+
+def recover(data_dir, journal, workers=1, metrics=None):
+    """Finish the batch of an import that was interrupted while saving, from its journal
+
+    Only the report store is trusted: its appends are fsynced and committed
+    through its index, while shiftReports.json may have been cut off mid-append,
+    so the store is opened without syncing from it. Repeating the upsert is
+    safe because the report IDs come from the natural key.
+    """
+    options = journal.options
+    results = journal.results()
+    print(f'[WARN] The last import stopped while saving; finishing its {len(results)} workbooks from the journal')
+    manifest = ImportManifest(os.path.join(data_dir, MANIFEST_FILE))
+    if options['full']:
+        manifest.clear()
+    store = ReportStore(os.path.join(data_dir, STORE_DIR))
+    by_key, stale_ids, _ = plan_batch(manifest, results, journal.fingerprints)
+    saved, total = commit_batch(data_dir, store, manifest, journal, by_key, stale_ids, options['full'],
+                         options['partitioned'], workers, metrics, recovering=True)
+    print(f'[SUCCESS] Recovered the interrupted import: {saved} reports, {total} in total\n')
+
+def run_import(workbooks, workers=1, template_name=DEFAULT_TEMPLATE, full=False, metrics=None,
+               validate_rules=None, tolerance=TOLERANCE, location_id=None, partitioned=False, data_dir=None):
+    """Extract new or changed workbooks and merge them into the existing data files
+
+    Without a manifest (first run) or with full=True everything is imported
+    from scratch. With validate_rules, a batch that breaks any of the
+    reconciliation rules is reported and nothing is saved. With partitioned,
+    the location/month partitions are updated as well and only the touched
+    ones are refreshed; partitions that are missing or behind the reports
+    are rebuilt from the store instead. data_dir defaults to output_dir.
+
+    Each extracted workbook is journaled (see importJournal), so a run that
+    is interrupted picks up where it stopped and never extracts a finished
+    workbook twice. Returns the number of workbooks extracted.
+    """
+    metrics = metrics or Metrics()
+    data_dir = data_dir or output_dir
+    journal = ImportJournal(os.path.join(data_dir, JOURNAL_FILE))
+    if journal.committing:
+        with metrics.stage('journal.recover'):
+            recover(data_dir, journal, workers, metrics)
+    manifest = ImportManifest(os.path.join(data_dir, MANIFEST_FILE))
+    with metrics.stage('store.load'):
+        store = open_store(data_dir)
+        if full or not manifest.exists:
+            full = True
+            manifest.clear()
+
+    with metrics.stage('manifest.check'):
+        pending, fingerprints = manifest.changed(workbooks)
+    metrics.count('workbooksSkipped', len(workbooks) - len(pending))
+    skipped = len(workbooks) - len(pending)
+    if skipped:
+        print(f'Skipping {skipped} unchanged workbooks')
+    if not pending:
+        manifest.save()
+        print('[COMPLETE] Nothing to import, all workbooks are up to date')
+        return 0
+
+    options = {'template': template_name, 'location': location_id, 'full': full, 'partitioned': partitioned}
+    recovered, todo = journal.resume(options, pending, fingerprints)
+    metrics.count('workbooksResumed', len(recovered))
+    if recovered:
+        print(f'Resuming: {len(recovered)} workbooks already extracted by the interrupted run')
+    if todo:
+        print(f'Processing {len(todo)} workbooks with {workers} worker(s)...')
+    by_path = {os.path.abspath(r['path']): r for r in recovered}
+    by_path.update((os.path.abspath(r['path']), r)
+                   for r in import_workbooks(todo, workers, template_name, metrics, location_id, journal))
+    # Back in input order, so the later of two workbooks for one day still wins
+    results = [by_path[os.path.abspath(path)] for path, _ in pending if os.path.abspath(path) in by_path]
+
+    by_key, stale_ids, extracted = plan_batch(manifest, results, fingerprints)
+    new_reports = list(by_key.values())
+    metrics.count('duplicatesDropped', extracted - len(new_reports))
+
+    print(f'\n[SUCCESS] Successfully extracted {extracted} shift reports from {len(pending)} Excel files')
+    if extracted > len(new_reports):
+        print(f'  [WARN] {extracted - len(new_reports)} duplicate shifts in this batch, keeping the last of each')
+    if not results:
+        print('[COMPLETE] No workbook could be extracted, data files left unchanged')
+        return 0
+    if validate_rules:
+        with metrics.stage('validate'):
+            found = validate(new_reports, validate_rules, tolerance)
+        metrics.count('violations', len(found))
+        if found:
+            print_violations(found)
+            print(f'[ERROR] {len(found)} reconciliation violations, data files left unchanged')
+            return 0
+    _, total = commit_batch(data_dir, store, manifest, journal, by_key, stale_ids, full, partitioned, workers, metrics)
+    print(f'\n[COMPLETE] Import complete! Imported {len(new_reports)} reports, {total} in total')
+    return len(results)
+
+def watch(inputs, year, interval, workers=1, template_name=DEFAULT_TEMPLATE, location_id=None, partitioned=False,
+          data_dir=None):
+    """Poll the inputs and import workbooks as they appear or change, until interrupted"""
+    print(f'Watching {", ".join(inputs)} every {interval}s (Ctrl+C to stop)...')
+    sizes = {}
+    try:
+        while True:
+            workbooks = stable_files(collect_workbooks(inputs, year), sizes)
+            if workbooks:
+                manifest = ImportManifest(os.path.join(data_dir or output_dir, MANIFEST_FILE))
+                pending, _ = manifest.changed(workbooks)
+                if pending:
+                    print(f'\n[WATCH] {len(pending)} new or changed workbooks')
+                    run_import(pending, workers, template_name, location_id=location_id, partitioned=partitioned,
+                               data_dir=data_dir)
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print('\n[WATCH] Stopped')
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description='Import daily shift workbooks into the JSON data files')
+    parser.add_argument('inputs', nargs='*',
+                        help='Workbook directories or glob patterns (default: the built-in file list)')
+    parser.add_argument('--data-dir', default=output_dir,
+                        help='Directory holding the data/*.json files (default: %(default)s)')
+    parser.add_argument('-j', '--workers', type=int, default=1,
+                        help='Number of worker processes (default: 1, serial)')
+    parser.add_argument('--year', type=int, default=datetime.now().year,
+                        help='Year for workbooks and sheets named month.day (default: current year)')
+    parser.add_argument('--template', choices=sorted(TEMPLATES), default=DEFAULT_TEMPLATE,
+                        help='Sheet layout of the workbooks (default: %(default)s)')
+    parser.add_argument('--full', action='store_true',
+                        help='Ignore the import manifest and re-import every workbook from scratch')
+    parser.add_argument('--watch', action='store_true',
+                        help='Keep running and import new or changed workbooks as they arrive')
+    parser.add_argument('--interval', type=float, default=30,
+                        help='Seconds between polls in watch mode (default: %(default)s)')
+    parser.add_argument('--validate', action='store_true',
+                        help='Check the reconciliation rules and refuse to save a batch that breaks them')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+                        help='Largest reconciliation difference accepted, in dollars (default: %(default)s)')
+    parser.add_argument('--location', metavar='ID',
+                        help='Location id to stamp on the imported reports (one store per run)')
+    parser.add_argument('--partitioned', action='store_true',
+                        help='Also maintain the location/month partitions under data/partitions')
+    parser.add_argument('--metrics', metavar='FILE',
+                        help='Write per-stage timings, counters and per-workbook stats to a JSON file')
+    parser.add_argument('--profile', action='store_true',
+                        help='Add a cProfile summary to the metrics file (main process only, use with -j 1)')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='Add tracemalloc peak and top allocations to the metrics file')
+    args = parser.parse_args(argv)
+    if (args.profile or args.trace_memory) and not args.metrics:
+        parser.error('--profile and --trace-memory need --metrics FILE')
+
+    if args.watch:
+        if not args.inputs:
+            parser.error('--watch needs at least one directory or glob pattern')
+        watch(args.inputs, args.year, args.interval, max(args.workers, 1), args.template,
+              args.location, args.partitioned, args.data_dir)
+        return
+
+    if args.inputs:
+        workbooks = collect_workbooks(args.inputs, args.year)
     else:
-        data['lotteryShiftData']['miscPayoutDayshift'] = safe_float(df.iloc[43, value_col])
-        data['lotteryShiftData']['miscPayoutNightshift'] = safe_float(df.iloc[44, value_col])
-    
-    # Extract transfer bank deposits (Night shift only, rows 38-45, cols 10-12)
-    if shift_type == 'night':
-        deposits = []
-        denoms = ['coin', '1', '2', '5', '10', '20', '50', '100']
-        for i, denom in enumerate(denoms):
-            transfer_amt = safe_float(df.iloc[38 + i, 10])
-            deposit_amt = safe_float(df.iloc[38 + i, 12])
-            if transfer_amt > 0 or deposit_amt > 0:
-                deposits.append({
-                    'denominationType': denom,
-                    'transferBankAmount': transfer_amt,
-                    'depositAmount': deposit_amt
-                })
-        if deposits:
-            data['transferBankDeposits'] = deposits
-        
-        # Transfer bank details (Night shift)
-        data['transferBankDetails'] = {
-            'transferBankBlueBag': safe_float(df.iloc[50, value_col]),
-            'depositShouldHave': safe_float(df.iloc[51, value_col]),
-            'actuallyHaveBlackBag': safe_float(df.iloc[52, value_col]),
-            'totalCashDeposit': safe_float(df.iloc[55, value_col])
-        }
-    
-    return data
-
-# Parse all Excel files
-all_reports = []
-report_id_counter = 1
-
-for file_path, date in excel_files:
-    if not os.path.exists(file_path):
-        print(f'Skipping {file_path} - file not found')
-        continue
-    
+        workbooks = []
+        for file_path, date in excel_files:
+            if not os.path.exists(file_path):
+                print(f'Skipping {file_path} - file not found')
+                continue
+            workbooks.append((file_path, date))
+
+    metrics = Metrics(profile=args.profile, trace_memory=args.trace_memory)
+    metrics.start()
     try:
-        print(f'Processing {file_path} for date {date}...')
-        df = pd.read_excel(file_path, header=None)
-        
-        # Extract Day Shift (column 2)
-        day_data = extract_shift_data(df, date, 'day', 2)
-        day_data['id'] = f'import-{report_id_counter:04d}'
-        day_data['employeeName'] = 'Employee ' + str(report_id_counter)
-        all_reports.append(day_data)
-        report_id_counter += 1
-        
-        # Extract Night Shift (column 7)
-        night_data = extract_shift_data(df, date, 'night', 7)
-        night_data['id'] = f'import-{report_id_counter:04d}'
-        night_data['employeeName'] = 'Employee ' + str(report_id_counter)
-        all_reports.append(night_data)
-        report_id_counter += 1
-        
-        print(f'  [OK] Extracted Day and Night shifts')
-    except Exception as e:
-        print(f'  [ERROR] Error processing {file_path}: {e}')
-
-print(f'\n[SUCCESS] Successfully extracted {len(all_reports)} shift reports from {len(excel_files)} Excel files')
-
-# Save to JSON file
-output_path = r'C:\Users\Administrator\Music\sheetPro\backend\data\shiftReports.json'
-with open(output_path, 'w') as f:
-    json.dump(all_reports, f, indent=2)
-
-print(f'[SUCCESS] Saved to {output_path}')
-
-# Calculate aggregates
-aggregates = {}
-for report in all_reports:
-    date = report['date']
-    if date not in aggregates:
-        aggregates[date] = {
-            'date': date,
-            'totalVideoCashIn': 0,
-            'totalPosDeposit': 0,
-            'totalLotteryDeposit': 0
-        }
-    
-    if 'lotteryShiftData' in report:
-        aggregates[date]['totalVideoCashIn'] += report['lotteryShiftData'].get('videoCashIn', 0)
-    if 'posShiftData' in report:
-        aggregates[date]['totalPosDeposit'] += report['posShiftData'].get('expectedDeposit', 0)
-    if 'lotteryShiftData' in report:
-        aggregates[date]['totalLotteryDeposit'] += report['lotteryShiftData'].get('transferBank', 0)
-
-# Save aggregates
-agg_output_path = r'C:\Users\Administrator\Music\sheetPro\backend\data\dailyAggregates.json'
-with open(agg_output_path, 'w') as f:
-    json.dump(list(aggregates.values()), f, indent=2)
-
-print(f'[SUCCESS] Saved aggregates to {agg_output_path}')
-
-# Calculate employee totals
-employee_totals = {}
-for report in all_reports:
-    emp_name = report['employeeName']
-    if emp_name not in employee_totals:
-        employee_totals[emp_name] = {
-            'employeeName': emp_name,
-            'totalShortage': 0,
-            'totalOverage': 0,
-            'lastUpdated': report['submittedAt']
-        }
-    
-    # POS over/short
-    if 'posShiftData' in report:
-        over_short = report['posShiftData'].get('overShort', 0)
-        if over_short < 0:
-            employee_totals[emp_name]['totalShortage'] += abs(over_short)
-        elif over_short > 0:
-            employee_totals[emp_name]['totalOverage'] += over_short
-    
-    # Lottery over/short
-    if 'lotteryShiftData' in report:
-        over_short = report['lotteryShiftData'].get('overShort', 0)
-        if over_short < 0:
-            employee_totals[emp_name]['totalShortage'] += abs(over_short)
-        elif over_short > 0:
-            employee_totals[emp_name]['totalOverage'] += over_short
-    
-    if report['submittedAt'] > employee_totals[emp_name]['lastUpdated']:
-        employee_totals[emp_name]['lastUpdated'] = report['submittedAt']
-
-# Add IDs
-for idx, (name, data) in enumerate(employee_totals.items(), 1):
-    data['id'] = f'emp-{idx:04d}'
-
-# Save employee totals
-emp_output_path = r'C:\Users\Administrator\Music\sheetPro\backend\data\employeeTotals.json'
-with open(emp_output_path, 'w') as f:
-    json.dump(list(employee_totals.values()), f, indent=2)
-
-print(f'[SUCCESS] Saved employee totals to {emp_output_path}')
-print(f'\n[COMPLETE] Import complete! Imported {len(all_reports)} reports from {len(excel_files)} dates')
+        run_import(workbooks, max(args.workers, 1), args.template, args.full, metrics,
+                   DEFAULT_RULES if args.validate else None, args.tolerance, args.location, args.partitioned,
+                   args.data_dir)
+    finally:
+        metrics.stop()
+    if args.metrics:
+        metrics.save(args.metrics)
+        print(f'\n[METRICS] Saved to {args.metrics}')
+        for line in metrics.summary():
+            print(line)
+
+if __name__ == '__main__':
+    main()
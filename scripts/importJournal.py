@@ -0,0 +1,109 @@
+"""Write-ahead journal of an import run.
+
+Every workbook is appended to ``importJournal.jsonl`` as soon as it is
+extracted: its fingerprint, date and the finished report dicts, one JSON line
+flushed and fsynced before the next workbook is counted as done. A run that
+dies half way (a killed backfill, a crashed worker pool) leaves the journal
+behind, and the next run with the same options takes those workbooks from it
+instead of extracting them again, as long as their SHA-256 still matches.
+
+Before the first data file is touched a ``commit`` line is written. Seeing it
+on start-up means the last run stopped while saving, so that batch is
+finished from the journal before anything else. The journal is deleted once
+the manifest, the last file of a batch, has been saved.
+"""
+import json
+import os
+
+from shiftRecords import ShiftReport, to_dicts
+
+JOURNAL_FILE = 'importJournal.jsonl'
+
+
+class ImportJournal:
+    """The journaled workbooks of the import that has not been committed yet"""
+
+    def __init__(self, path):
+        self.path = path
+        self.options = None
+        self.entries = {}
+        self.fingerprints = {}
+        self.committing = False
+        if os.path.exists(path):
+            self._load()
+
+    def _load(self):
+        with open(self.path, 'r') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A torn last line from a crash mid-write; everything before it is intact
+                    break
+                if entry['type'] == 'batch':
+                    self.options = entry['options']
+                elif entry['type'] == 'workbook':
+                    key = os.path.abspath(entry['path'])
+                    self.entries[key] = entry
+                    self.fingerprints[key] = entry['fingerprint']
+                elif entry['type'] == 'commit':
+                    self.committing = True
+
+    def _write(self, entry):
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(entry, separators=(',', ':')) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def resume(self, options, pending, fingerprints):
+        """Split pending (path, date) pairs into results taken from the journal and workbooks to extract
+
+        The journal only counts for a run with the same options; otherwise it
+        is started over. A journaled workbook whose hash or date changed since
+        is extracted again.
+        """
+        if self.options != options:
+            self.clear()
+            self.options = options
+            self._write({'type': 'batch', 'options': options})
+        self.fingerprints.update(fingerprints)
+        recovered, todo = [], []
+        for path, date in pending:
+            entry = self.entries.get(os.path.abspath(path))
+            if entry and entry['date'] == date and \
+                    entry['fingerprint']['sha256'] == fingerprints[os.path.abspath(path)]['sha256']:
+                recovered.append(self._result(entry, path))
+            else:
+                todo.append((path, date))
+        return recovered, todo
+
+    def _result(self, entry, path=None):
+        return {'path': path or entry['path'], 'date': entry['date'], 'error': None, 'stats': {},
+                'reports': [ShiftReport.from_dict(r) for r in entry['reports']],
+                'seconds': 0.0, 'cpuSeconds': 0.0}
+
+    def results(self):
+        """Every journaled workbook as an extraction result, in the order they were journaled"""
+        return [self._result(entry) for entry in self.entries.values()]
+
+    def record(self, result):
+        """Journal one extracted workbook (its reports with their final IDs)"""
+        key = os.path.abspath(result['path'])
+        entry = {'type': 'workbook', 'path': result['path'], 'date': result['date'],
+                 'fingerprint': self.fingerprints[key], 'reports': list(to_dicts(result['reports']))}
+        self._write(entry)
+        self.entries[key] = entry
+
+    def begin_commit(self):
+        """Mark the batch as being saved; from here on an interruption is finished by the next run"""
+        if not self.committing:
+            self._write({'type': 'commit'})
+            self.committing = True
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.options = None
+        self.entries = {}
+        self.fingerprints = {}
+        self.committing = False
@@ -0,0 +1,117 @@
+"""Persistent record of which workbooks have been imported.
+
+Each entry keeps the workbook's size, mtime and SHA-256 along with the IDs of
+the reports extracted from it, so an import run only re-extracts new or
+changed files and knows which old reports a changed file replaces.
+"""
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+
+MANIFEST_FILE = 'importManifest.json'
+MANIFEST_VERSION = 1
+
+
+def file_sha256(file_path, chunk_size=1 << 20):
+    """Hash a file in fixed-size chunks"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_stat(file_path):
+    st = os.stat(file_path)
+    return {'size': st.st_size, 'mtime': st.st_mtime}
+
+
+class ImportManifest:
+    """Workbook fingerprints keyed by absolute path, stored as JSON next to the data files"""
+
+    def __init__(self, path):
+        self.path = path
+        self.exists = os.path.exists(path)
+        self.files = {}
+        if self.exists:
+            with open(path, 'r') as f:
+                self.files = json.load(f).get('files', {})
+
+    def check(self, file_path):
+        """Return (changed, fingerprint) for a workbook
+
+        Size and mtime are compared first; the file is only hashed when they
+        differ, and a matching hash (e.g. a re-copied file) counts as unchanged.
+        """
+        key = os.path.abspath(file_path)
+        fingerprint = file_stat(key)
+        entry = self.files.get(key)
+        if entry and entry['size'] == fingerprint['size'] and entry['mtime'] == fingerprint['mtime']:
+            fingerprint['sha256'] = entry['sha256']
+            return False, fingerprint
+        fingerprint['sha256'] = file_sha256(key)
+        if entry and entry['sha256'] == fingerprint['sha256']:
+            entry['mtime'] = fingerprint['mtime']
+            return False, fingerprint
+        return True, fingerprint
+
+    def changed(self, workbooks):
+        """Split (path, date) pairs into the ones needing extraction and their fingerprints"""
+        pending = []
+        fingerprints = {}
+        for file_path, date in workbooks:
+            is_changed, fingerprint = self.check(file_path)
+            if is_changed:
+                pending.append((file_path, date))
+                fingerprints[os.path.abspath(file_path)] = fingerprint
+        return pending, fingerprints
+
+    def report_ids(self, file_path):
+        entry = self.files.get(os.path.abspath(file_path))
+        return list(entry['reportIds']) if entry else []
+
+    def record(self, file_path, fingerprint, date, report_ids):
+        self.files[os.path.abspath(file_path)] = {
+            'size': fingerprint['size'],
+            'mtime': fingerprint['mtime'],
+            'sha256': fingerprint['sha256'],
+            'date': date,
+            'reportIds': list(report_ids),
+            'importedAt': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+        }
+
+    def clear(self):
+        self.files = {}
+
+    def save(self):
+        """Write the manifest through a temp file so a crash never leaves it half written"""
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': MANIFEST_VERSION, 'files': self.files}, f, indent=2)
+        os.replace(tmp_path, self.path)
+        self.exists = True
+
+
+def stable_files(workbooks, previous_sizes):
+    """Keep only workbooks whose size did not change since the last poll
+
+    Store managers copy files into the watch folder over the network, so a
+    workbook is only picked up once two consecutive polls see the same size.
+    ``previous_sizes`` is updated in place.
+    """
+    stable = []
+    seen = set()
+    for file_path, date in workbooks:
+        try:
+            size = os.path.getsize(file_path)
+        except OSError:
+            continue
+        seen.add(file_path)
+        if previous_sizes.get(file_path) == size:
+            stable.append((file_path, date))
+        previous_sizes[file_path] = size
+    for file_path in list(previous_sizes):
+        if file_path not in seen:
+            del previous_sizes[file_path]
+    return stable
@@ -0,0 +1,131 @@
+"""Per-stage timing and counters for the import pipeline.
+
+A ``Metrics`` object collects wall and CPU time per named stage, global
+counters and one record per workbook, and can wrap a run in cProfile and/or
+tracemalloc. ``save`` writes everything to a JSON metrics file so slow
+workbooks and stages can be picked out after a backfill.
+"""
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import json
+import os
+import time
+
+PROFILE_TOP = 30
+MEMORY_TOP = 15
+
+
+class Metrics:
+    """Stage timers, counters and per-file records for one run"""
+
+    def __init__(self, profile=False, trace_memory=False):
+        self.started_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        self.stages = {}
+        self.counters = {}
+        self.files = []
+        self.profile = profile
+        self.trace_memory = trace_memory
+        self._profiler = None
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        self.profile_stats = None
+        self.memory = None
+
+    @contextmanager
+    def stage(self, name):
+        """Time a block; repeated stages accumulate"""
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            entry = self.stages.setdefault(name, {'calls': 0, 'wallSeconds': 0.0, 'cpuSeconds': 0.0})
+            entry['calls'] += 1
+            entry['wallSeconds'] += time.perf_counter() - wall
+            entry['cpuSeconds'] += time.process_time() - cpu
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def add_file(self, result):
+        """Record one process_workbook result"""
+        stats = result.get('stats') or {}
+        self.files.append({
+            'path': result['path'],
+            'date': result['date'],
+            'reports': len(result['reports']),
+            'error': result['error'],
+            'wallSeconds': result['seconds'],
+            'cpuSeconds': result.get('cpuSeconds'),
+            **stats,
+        })
+        self.count('workbooks')
+        self.count('reports', len(result['reports']))
+        self.count('errors', bool(result['error']))
+        self.count('cellsRead', stats.get('cellsRead', 0))
+        # Worker-side stages are folded into the run totals
+        for key in ('openSeconds', 'readSeconds', 'buildSeconds'):
+            if key in stats:
+                entry = self.stages.setdefault('workbook.' + key[:-len('Seconds')],
+                                               {'calls': 0, 'wallSeconds': 0.0, 'cpuSeconds': None})
+                entry['calls'] += 1
+                entry['wallSeconds'] += stats[key]
+
+    def start(self):
+        """Start the optional profiler and memory tracer"""
+        if self.profile:
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        if self.trace_memory:
+            import tracemalloc
+            tracemalloc.start()
+
+    def stop(self):
+        if self._profiler is not None:
+            import pstats
+            self._profiler.disable()
+            stats = pstats.Stats(self._profiler)
+            rows = []
+            for (filename, line, func), (_, calls, own, total, _) in stats.stats.items():
+                rows.append({'function': f'{os.path.basename(filename)}:{line}({func})',
+                             'calls': calls, 'ownSeconds': own, 'totalSeconds': total})
+            rows.sort(key=lambda r: r['totalSeconds'], reverse=True)
+            self.profile_stats = rows[:PROFILE_TOP]
+        if self.trace_memory:
+            import tracemalloc
+            _, peak = tracemalloc.get_traced_memory()
+            top = tracemalloc.take_snapshot().statistics('lineno')[:MEMORY_TOP]
+            tracemalloc.stop()
+            self.memory = {
+                'peakMb': peak / 2 ** 20,
+                'top': [{'line': str(s.traceback), 'sizeMb': s.size / 2 ** 20, 'blocks': s.count} for s in top],
+            }
+
+    def as_dict(self):
+        data = {
+            'startedAt': self.started_at,
+            'wallSeconds': time.perf_counter() - self._wall,
+            'cpuSeconds': time.process_time() - self._cpu,
+            'stages': self.stages,
+            'counters': self.counters,
+            # Slowest workbooks first
+            'files': sorted(self.files, key=lambda f: f['wallSeconds'], reverse=True),
+        }
+        if self.profile_stats is not None:
+            data['profile'] = self.profile_stats
+        if self.memory is not None:
+            data['memory'] = self.memory
+        return data
+
+    def save(self, path):
+        with open(path + '.tmp', 'w') as f:
+            json.dump(self.as_dict(), f, indent=2)
+        os.replace(path + '.tmp', path)
+
+    def summary(self):
+        """Stage lines for the console, slowest first"""
+        lines = []
+        for name, entry in sorted(self.stages.items(), key=lambda s: s[1]['wallSeconds'], reverse=True):
+            cpu = '' if entry['cpuSeconds'] is None else f', cpu {entry["cpuSeconds"]:.3f}s'
+            lines.append(f'  {name:<24} {entry["wallSeconds"]:8.3f}s{cpu} ({entry["calls"]} calls)')
+        return lines
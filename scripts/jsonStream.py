@@ -0,0 +1,158 @@
+"""Streaming reader and writer for the data/*.json array files.
+
+``iter_array`` parses a top-level JSON array incrementally and yields one item
+at a time, so memory stays bounded by the largest item rather than the file.
+``write_array`` encodes items as they are produced, either laid out exactly
+like ``json.dump(items, f, indent=2)`` (what the Node jsonStorage writes) or
+compact, and ``append_array`` adds items before the closing bracket without
+rewriting the file. Both layouts are plain JSON, so the Node
+``readJsonFile`` reads them unchanged.
+"""
+import json
+import os
+
+CHUNK_SIZE = 1 << 16
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+_DELIMITERS = _WHITESPACE + ',]'
+
+
+def iter_array(path, chunk_size=CHUNK_SIZE):
+    """Yield the items of the JSON array in path one by one"""
+    with open(path, 'r', encoding='utf-8') as f:
+        yield from iter_array_file(f, chunk_size)
+
+
+def iter_array_file(f, chunk_size=CHUNK_SIZE):
+    """Yield the items of a JSON array read from a text file object"""
+    buf = ''
+    pos = 0
+    eof = False
+
+    def fill():
+        nonlocal buf, pos, eof
+        chunk = f.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buf = buf[pos:] + chunk
+        pos = 0
+        return True
+
+    def skip_whitespace():
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buf) or not fill():
+                return
+
+    skip_whitespace()
+    if pos >= len(buf) or buf[pos] != '[':
+        raise ValueError('Expected a JSON array')
+    pos += 1
+    expect_item = None  # None before the first item, then alternating
+    while True:
+        skip_whitespace()
+        if pos >= len(buf):
+            raise ValueError('Unterminated JSON array')
+        ch = buf[pos]
+        if ch == ']' and expect_item is not True:
+            return
+        if expect_item is False:
+            if ch != ',':
+                raise ValueError(f'Expected "," or "]" in JSON array, got {ch!r}')
+            pos += 1
+            expect_item = True
+            continue
+        while True:
+            try:
+                item, end = _decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof or not fill():
+                    raise
+                continue
+            # A number cut off at the end of the buffer would decode as a shorter one,
+            # so only accept an item once the delimiter after it is buffered
+            if (end == len(buf) or buf[end] not in _DELIMITERS) and not eof and fill():
+                continue
+            break
+        pos = end
+        expect_item = False
+        yield item
+
+
+def encode_item(item, indent=2):
+    """Encode one array item as json.dump(list) lays it out, or compact when indent is None"""
+    if indent is None:
+        return json.dumps(item, separators=(',', ':'))
+    pad = ' ' * indent
+    return pad + json.dumps(item, indent=indent).replace('\n', '\n' + pad)
+
+
+def write_array(path, items, indent=2):
+    """Stream items into a JSON array file atomically; returns the number written
+
+    With indent=2 the output is byte-identical to json.dump(items, f, indent=2).
+    """
+    tmp_path = path + '.tmp'
+    count = 0
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        if indent is None:
+            f.write('[')
+            for item in items:
+                if count:
+                    f.write(',')
+                f.write(encode_item(item, None))
+                count += 1
+            f.write(']')
+        else:
+            for item in items:
+                f.write('[\n' if not count else ',\n')
+                f.write(encode_item(item, indent))
+                count += 1
+            f.write('[]' if not count else '\n]')
+    os.replace(tmp_path, path)
+    return count
+
+
+def append_array(path, items, indent=2):
+    """Append items to an existing JSON array file without rewriting it"""
+    items = list(items)
+    if not items:
+        return 0
+    if not os.path.exists(path):
+        return write_array(path, items, indent)
+    with open(path, 'rb+') as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        # Walk back over trailing whitespace to the closing bracket
+        ch = b''
+        while pos > 0:
+            f.seek(pos - 1)
+            ch = f.read(1)
+            if not ch.isspace():
+                break
+            pos -= 1
+        if ch != b']':
+            raise ValueError(f'{path} is not a JSON array')
+        # Find the last non-space character before ']' to tell '[]' from a filled array
+        inner = pos - 1
+        prev = b'['
+        while inner > 0:
+            f.seek(inner - 1)
+            prev = f.read(1)
+            if not prev.isspace():
+                break
+            inner -= 1
+        if indent is None:
+            body = ','.join(encode_item(item, None) for item in items)
+            tail = (',' if prev != b'[' else '') + body + ']'
+        else:
+            body = ',\n'.join(encode_item(item, indent) for item in items)
+            tail = (',\n' if prev != b'[' else '\n') + body + '\n]'
+        f.seek(inner)
+        f.truncate()
+        f.write(tail.encode('utf-8'))
+    return len(items)
@@ -0,0 +1,246 @@
+"""Rolling-window over/short analytics per employee and per shift type.
+
+employeeTotals.json only has lifetime totals. This keeps, for every employee
+and every shift type, the dates that have reports plus prefix sums of the
+shortage, overage and report count up to each date. The sum over any date
+window is then two bisects and a subtraction, so 30/90-day windows, moving
+averages and window-over-window trends never rescan the reports.
+
+Reports arriving in date order (the usual import) extend the arrays in O(1);
+a back-dated or replaced report shifts the prefix sums after its date. The
+sums are whole cents, so a window is exact however it was built up. The
+series are saved next to the aggregates in overShortSeries.json. Drafts
+are left out, as they are of the aggregates.
+"""
+from bisect import bisect_left, bisect_right
+from datetime import date as Date, timedelta
+import json
+import os
+
+from aggregateMaintenance import is_draft, report_contribution
+from cents import from_cents, to_cents
+from reportStore import source_fingerprint
+from shiftRecords import ShiftReport
+
+SERIES_FILE = 'overShortSeries.json'
+# Files from before the sums were kept in cents lack this and are rebuilt
+SERIES_UNIT = 'cents'
+KINDS = ['employee', 'shiftType']
+WINDOWS = [30, 90]
+
+
+def _keys(report):
+    """(date, {kind: key}) of a dict or a ShiftReport"""
+    if isinstance(report, ShiftReport):
+        return report.date, {'employee': report.employee_name, 'shiftType': report.shift_type}
+    return report['date'], {'employee': report['employeeName'], 'shiftType': report['shiftType']}
+
+
+def window_start(end, days):
+    """First date of the days-long window ending on end (ISO strings, inclusive)"""
+    return (Date.fromisoformat(end) - timedelta(days=days - 1)).isoformat()
+
+
+class PrefixSeries:
+    """Sorted dates with running totals in cents; index i of a sum is everything before dates[i]"""
+
+    def __init__(self, dates=None, shortage=None, overage=None, reports=None):
+        self.dates = dates or []
+        self.shortage = shortage or [0]
+        self.overage = overage or [0]
+        self.reports = reports or [0]
+
+    def add(self, date, shortage, overage, count=1):
+        i = bisect_left(self.dates, date)
+        if i == len(self.dates) or self.dates[i] != date:
+            self.dates.insert(i, date)
+            for sums in (self.shortage, self.overage, self.reports):
+                sums.insert(i + 1, sums[i])
+        for sums, delta in ((self.shortage, shortage), (self.overage, overage), (self.reports, count)):
+            for j in range(i + 1, len(sums)):
+                sums[j] += delta
+
+    def window(self, start, end):
+        """(reports, shortage, overage) of the dates start..end inclusive"""
+        lo = bisect_left(self.dates, start) if start else 0
+        hi = bisect_right(self.dates, end) if end else len(self.dates)
+        return (self.reports[hi] - self.reports[lo], self.shortage[hi] - self.shortage[lo],
+                self.overage[hi] - self.overage[lo])
+
+    def to_dict(self):
+        return {'dates': self.dates, 'shortage': self.shortage, 'overage': self.overage,
+                'reports': self.reports}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['dates'], data['shortage'], data['overage'], data['reports'])
+
+
+def _summary(reports, shortage, overage):
+    """Dollar figures of a window from its cent sums"""
+    return {
+        'reports': reports,
+        'shortage': from_cents(shortage),
+        'overage': from_cents(overage),
+        'net': from_cents(overage - shortage),
+        'averageShortage': from_cents(round(shortage / reports)) if reports else 0.0,
+    }
+
+
+class OverShortSeries:
+    """Prefix-sum series for every employee and shift type"""
+
+    def __init__(self, series=None):
+        self.series = {kind: {} for kind in KINDS}
+        for kind, by_key in (series or {}).items():
+            if kind in self.series:
+                self.series[kind] = {key: PrefixSeries.from_dict(data) for key, data in by_key.items()}
+
+    def _add(self, report, sign):
+        # A draft is no report yet, and would pull down the averages
+        if is_draft(report):
+            return
+        date, keys = _keys(report)
+        _, shortage, overage = report_contribution(report)
+        for kind, key in keys.items():
+            series = self.series[kind].get(key)
+            if series is None:
+                series = self.series[kind][key] = PrefixSeries()
+            series.add(date, sign * shortage, sign * overage, sign)
+
+    def insert(self, report):
+        self._add(report, 1)
+
+    def delete(self, report):
+        self._add(report, -1)
+
+    def apply(self, inserted=(), deleted=()):
+        """Delete the old versions first so a replaced report is not counted twice"""
+        for report in deleted:
+            self.delete(report)
+        for report in inserted:
+            self.insert(report)
+
+    def keys(self, kind='employee'):
+        """Keys that still have reports"""
+        return sorted(key for key, series in self.series[kind].items() if series.reports[-1])
+
+    def last_date(self):
+        return max((s.dates[-1] for by_key in self.series.values() for s in by_key.values() if s.dates),
+                   default=None)
+
+    def window(self, key, end, days, kind='employee'):
+        """Totals of the days-long window ending on end"""
+        series = self.series[kind].get(key)
+        if series is None:
+            return _summary(0, 0, 0)
+        return _summary(*series.window(window_start(end, days), end))
+
+    def moving_average(self, key, start, end, days, kind='employee'):
+        """(date, shortage per report over the trailing window) for every date start..end"""
+        points = []
+        day = Date.fromisoformat(start)
+        last = Date.fromisoformat(end)
+        while day <= last:
+            iso = day.isoformat()
+            points.append((iso, self.window(key, iso, days, kind)['averageShortage']))
+            day += timedelta(days=1)
+        return points
+
+    def trend(self, key, end, days, kind='employee'):
+        """The window ending on end against the window just before it; positive change is worse"""
+        current = self.window(key, end, days, kind)
+        previous_end = (Date.fromisoformat(end) - timedelta(days=days)).isoformat()
+        previous = self.window(key, previous_end, days, kind)
+        return {
+            'current': current,
+            'previous': previous,
+            'change': from_cents(to_cents(current['averageShortage']) - to_cents(previous['averageShortage'])),
+        }
+
+    def flag(self, end, days, threshold, kind='employee'):
+        """Keys whose shortage in the window is at least threshold, worst first"""
+        flagged = []
+        for key in self.keys(kind):
+            trend = self.trend(key, end, days, kind)
+            if trend['current']['shortage'] >= threshold:
+                flagged.append({kind: key, **trend['current'], 'previousShortage': trend['previous']['shortage'],
+                                'change': trend['change']})
+        flagged.sort(key=lambda row: -row['shortage'])
+        return flagged
+
+    def to_dict(self):
+        return {kind: {key: series.to_dict() for key, series in by_key.items()}
+                for kind, by_key in self.series.items()}
+
+    def save(self, data_dir):
+        path = os.path.join(data_dir, SERIES_FILE)
+        with open(path + '.tmp', 'w') as f:
+            json.dump({'unit': SERIES_UNIT, 'source': source_fingerprint(data_dir), **self.to_dict()}, f)
+        os.replace(path + '.tmp', path)
+
+
+def rebuild_series(reports):
+    series = OverShortSeries()
+    series.apply(inserted=reports)
+    return series
+
+
+def load_series(data_dir, load_reports=None):
+    """Load the saved series, or build them from the reports returned by load_reports() when missing or stale"""
+    path = os.path.join(data_dir, SERIES_FILE)
+    data = None
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            data = json.load(f)
+    if data is None or data.get('unit') != SERIES_UNIT or data.get('source') != source_fingerprint(data_dir):
+        return rebuild_series(load_reports() if load_reports else [])
+    return OverShortSeries(data)
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    from reportStore import open_store
+
+    parser = argparse.ArgumentParser(description='Windowed over/short per employee or shift type')
+    parser.add_argument('data_dir', help='Directory holding shiftReports.json')
+    parser.add_argument('action', choices=['flag', 'show', 'rebuild'])
+    parser.add_argument('--by', choices=KINDS, default='employee')
+    parser.add_argument('--days', type=int, default=WINDOWS[0], help='Window length (default: %(default)s)')
+    parser.add_argument('--threshold', type=float, default=100.0,
+                        help='Flag windowed shortages of at least this many dollars (default: %(default)s)')
+    parser.add_argument('--as-of', help='Last day of the window (default: the latest report date)')
+    parser.add_argument('--key', help='Employee name or shift type for show')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    store = open_store(args.data_dir)
+    if args.action == 'rebuild':
+        series = rebuild_series(store.iter_reports())
+        series.save(args.data_dir)
+        print(f'[SUCCESS] Rebuilt series for {len(series.series["employee"])} employees '
+              f'in {time.perf_counter() - started:.2f}s')
+        raise SystemExit(0)
+
+    series = load_series(args.data_dir, store.iter_reports)
+    end = args.as_of or series.last_date()
+    if end is None:
+        print('[COMPLETE] No reports')
+        raise SystemExit(0)
+    loaded = time.perf_counter()
+    if args.action == 'show':
+        keys = [args.key] if args.key else series.keys(args.by)
+        output = {key: {f'{days}d': series.trend(key, end, days, args.by) for days in WINDOWS} for key in keys}
+        print(json.dumps(output, indent=2))
+    else:
+        flagged = series.flag(end, args.days, args.threshold, args.by)
+        for row in flagged:
+            direction = 'worse' if row['change'] > 0 else 'better' if row['change'] < 0 else 'flat'
+            print(f'  [WARN] {row[args.by]}: short ${row["shortage"]:.2f} over {row["reports"]} shifts '
+                  f'in the {args.days} days to {end} (avg ${row["averageShortage"]:.2f}/shift, '
+                  f'{direction} by ${abs(row["change"]):.2f} vs the previous {args.days} days)')
+        print(f'[{"WARN" if flagged else "OK"}] {len(flagged)} of {len(series.keys(args.by))} over the '
+              f'${args.threshold:.2f} threshold')
+    print(f'[OK] Answered in {(time.perf_counter() - loaded) * 1000:.1f}ms (load {loaded - started:.2f}s)')
@@ -0,0 +1,280 @@
+"""Quantile sketches of the POS and lottery over/short distributions.
+
+For every employee x shiftType x month x location there is one sketch of the
+POS ``overShort`` values and one of the lottery ``overShort`` values, so the
+median, p90 and p99 of any combination (one employee over a year, a store's
+night shifts in May, everyone ever) is a merge of a few small sketches
+instead of a sort of every shift.
+
+The sketches are relative-error log histograms (the DDSketch scheme) over
+whole cents: a value v lands in bucket ceil(log_gamma |v|), with
+gamma = (1 + a) / (1 - a), and a bucket is read back as the point that is
+within a of everything in it. A quantile is therefore within
+RELATIVE_ACCURACY (1%) of the exact value of that rank before it is rounded
+to the cent for output, and 0 is exact.
+Unlike t-digest or KLL the buckets are plain counts, so a replaced or
+deleted report is subtracted exactly, and merging sketches (partitions,
+workers) is adding counts, with the same bound as one big sketch.
+
+The sketches are saved next to the aggregates in overShortSketches.json.
+Drafts are left out, as they are of the aggregates.
+"""
+import json
+import math
+import os
+
+from aggregateMaintenance import is_draft
+from cents import from_cents, to_cents
+from reportStore import source_fingerprint
+from shiftRecords import ShiftReport
+
+SKETCH_FILE = 'overShortSketches.json'
+# Files written with other units or accuracy lack these and are rebuilt
+SKETCH_UNIT = 'cents'
+RELATIVE_ACCURACY = 0.01
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+LOG_GAMMA = math.log(GAMMA)
+
+FIELDS = {'pos': 'posShiftData', 'lottery': 'lotteryShiftData'}
+DIMS = ['employee', 'shiftType', 'month', 'location']
+QUANTILES = [0.5, 0.9, 0.99]
+
+
+def _bucket(magnitude):
+    return math.ceil(math.log(magnitude) / LOG_GAMMA)
+
+
+def _bucket_value(index):
+    return 2 * GAMMA ** index / (GAMMA + 1)
+
+
+class QuantileSketch:
+    """Counts per log bucket of positive and negative values, plus the zeros"""
+
+    def __init__(self, positive=None, negative=None, zero=0):
+        self.positive = positive or {}
+        self.negative = negative or {}
+        self.zero = zero
+
+    @property
+    def count(self):
+        return self.zero + sum(self.positive.values()) + sum(self.negative.values())
+
+    def add(self, value, count=1):
+        """Add (or with a negative count remove) a value in cents"""
+        if value == 0:
+            self.zero += count
+            return
+        buckets = self.positive if value > 0 else self.negative
+        index = _bucket(abs(value))
+        total = buckets.get(index, 0) + count
+        if total:
+            buckets[index] = total
+        else:
+            del buckets[index]
+
+    def merge(self, other, sign=1):
+        """Add (or with sign=-1 subtract) another sketch"""
+        for mine, theirs in ((self.positive, other.positive), (self.negative, other.negative)):
+            for index, count in theirs.items():
+                total = mine.get(index, 0) + sign * count
+                if total:
+                    mine[index] = total
+                else:
+                    mine.pop(index, None)
+        self.zero += sign * other.zero
+
+    def quantile(self, q):
+        """Value in cents of rank floor(q * (count - 1)) in sorted order, within the relative accuracy"""
+        count = self.count
+        if not count:
+            return None
+        rank = int(q * (count - 1))
+        seen = 0
+        for index in sorted(self.negative, reverse=True):
+            seen += self.negative[index]
+            if seen > rank:
+                return -_bucket_value(index)
+        seen += self.zero
+        if seen > rank:
+            return 0
+        for index in sorted(self.positive):
+            seen += self.positive[index]
+            if seen > rank:
+                return _bucket_value(index)
+        return None
+
+    def to_dict(self):
+        return {'p': self.positive, 'n': self.negative, 'z': self.zero}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls({int(i): c for i, c in data['p'].items()}, {int(i): c for i, c in data['n'].items()}, data['z'])
+
+
+def _values(report):
+    """((employee, shiftType, month, location), {field: over/short in cents}) of a dict or ShiftReport"""
+    if isinstance(report, ShiftReport):
+        key = (report.employee_name, report.shift_type, report.date[:7], report.location_id)
+        sections = {'pos': report.pos_shift_data, 'lottery': report.lottery_shift_data}
+        return key, {field: to_cents(s.over_short) for field, s in sections.items() if s is not None}
+    key = (report['employeeName'], report['shiftType'], report['date'][:7], report.get('locationId'))
+    return key, {field: to_cents(report[section].get('overShort'))
+                 for field, section in FIELDS.items() if report.get(section) is not None}
+
+
+class OverShortSketches:
+    """One sketch per field and employee x shiftType x month x location"""
+
+    def __init__(self, sketches=None):
+        self.sketches = sketches if sketches is not None else {field: {} for field in FIELDS}
+
+    def _add(self, report, sign):
+        if is_draft(report):
+            return
+        key, values = _values(report)
+        for field, value in values.items():
+            sketch = self.sketches[field].get(key)
+            if sketch is None:
+                sketch = self.sketches[field][key] = QuantileSketch()
+            sketch.add(value, sign)
+            if not sketch.count:
+                del self.sketches[field][key]
+
+    def insert(self, report):
+        self._add(report, 1)
+
+    def delete(self, report):
+        self._add(report, -1)
+
+    def apply(self, inserted=(), deleted=()):
+        """Remove the old versions first so a replaced report is not counted twice"""
+        for report in deleted:
+            self.delete(report)
+        for report in inserted:
+            self.insert(report)
+
+    def query(self, field, by, where=None, quantiles=QUANTILES):
+        """Rows grouped by the dimensions in by, restricted to where {dimension: value}
+
+        Each row has the group's count and the quantiles as p50, p90, ... in dollars.
+        """
+        where = where or {}
+        unknown = (set(by) | set(where)) - set(DIMS)
+        if unknown:
+            raise KeyError(f'Unknown dimensions: {", ".join(sorted(unknown))} (known: {", ".join(DIMS)})')
+        if field not in FIELDS:
+            raise KeyError(f'Unknown field {field!r} (known: {", ".join(FIELDS)})')
+        checks = [(DIMS.index(d), str(v)) for d, v in where.items()]
+        positions = [DIMS.index(d) for d in by]
+        groups = {}
+        for key, sketch in self.sketches[field].items():
+            if all(str(key[i]) == v for i, v in checks):
+                group = tuple(key[i] for i in positions)
+                merged = groups.get(group)
+                if merged is None:
+                    merged = groups[group] = QuantileSketch()
+                merged.merge(sketch)
+        rows = []
+        for group in sorted(groups, key=lambda k: tuple('' if v is None else str(v) for v in k)):
+            sketch = groups[group]
+            row = dict(zip(by, group))
+            row['count'] = sketch.count
+            for q in quantiles:
+                row[f'p{q * 100:g}'] = from_cents(round(sketch.quantile(q)))
+            rows.append(row)
+        return rows
+
+    def to_dict(self):
+        return {'unit': SKETCH_UNIT, 'relativeAccuracy': RELATIVE_ACCURACY,
+                'sketches': {field: [list(key) + [sketch.to_dict()] for key, sketch in by_key.items()]
+                             for field, by_key in self.sketches.items()}}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls({field: {tuple(row[:-1]): QuantileSketch.from_dict(row[-1]) for row in data['sketches'][field]}
+                    for field in FIELDS})
+
+    def save(self, data_dir, filename=SKETCH_FILE):
+        path = os.path.join(data_dir, filename)
+        with open(path + '.tmp', 'w') as f:
+            json.dump({**self.to_dict(), 'source': source_fingerprint(data_dir)}, f)
+        os.replace(path + '.tmp', path)
+
+
+def merge_sketches(sketch_sets):
+    """Combine the sketches of disjoint sets of reports, such as partitions or worker batches"""
+    merged = OverShortSketches()
+    for sketches in sketch_sets:
+        for field, by_key in sketches.sketches.items():
+            target = merged.sketches[field]
+            for key, sketch in by_key.items():
+                if key not in target:
+                    target[key] = QuantileSketch()
+                target[key].merge(sketch)
+    return merged
+
+
+def rebuild_sketches(reports):
+    sketches = OverShortSketches()
+    sketches.apply(inserted=reports)
+    return sketches
+
+
+def _read(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        data = json.load(f)
+    if data.get('unit') != SKETCH_UNIT or data.get('relativeAccuracy') != RELATIVE_ACCURACY:
+        return None
+    return data
+
+
+def read_sketches(path):
+    """The sketches saved at path, or None when missing or written with another unit or accuracy"""
+    data = _read(path)
+    return None if data is None else OverShortSketches.from_dict(data)
+
+
+def load_sketches(data_dir, load_reports=None):
+    """Load the saved sketches, or build them from the reports returned by load_reports() when missing or stale"""
+    data = _read(os.path.join(data_dir, SKETCH_FILE))
+    if data is None or data.get('source') != source_fingerprint(data_dir):
+        return rebuild_sketches(load_reports() if load_reports else [])
+    return OverShortSketches.from_dict(data)
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    from reportStore import open_store
+
+    parser = argparse.ArgumentParser(description='Median, p90 and p99 of the over/short per employee, shift and month')
+    parser.add_argument('data_dir', help='Directory holding shiftReports.json')
+    parser.add_argument('action', choices=['query', 'rebuild'])
+    parser.add_argument('--field', choices=sorted(FIELDS), default='pos')
+    parser.add_argument('--by', default='employee', help=f'Comma separated dimensions from: {", ".join(DIMS)}')
+    parser.add_argument('--where', action='append', default=[], metavar='DIM=VALUE',
+                        help='Restrict a dimension, e.g. month=2025-05 (repeatable)')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    store = open_store(args.data_dir)
+    if args.action == 'rebuild':
+        sketches = rebuild_sketches(store.iter_reports())
+        sketches.save(args.data_dir)
+        print(f'[SUCCESS] Rebuilt {sum(len(s) for s in sketches.sketches.values())} sketches '
+              f'in {time.perf_counter() - started:.2f}s')
+    else:
+        sketches = load_sketches(args.data_dir, store.iter_reports)
+        loaded = time.perf_counter()
+        where = dict(item.split('=', 1) for item in args.where)
+        try:
+            rows = sketches.query(args.field, [d for d in args.by.split(',') if d], where)
+        except KeyError as e:
+            parser.error(e.args[0])
+        print(json.dumps(rows, indent=2))
+        print(f'[OK] Answered in {(time.perf_counter() - loaded) * 1000:.1f}ms (load {loaded - started:.2f}s), '
+              f'quantiles within {RELATIVE_ACCURACY:.0%} of the exact values')
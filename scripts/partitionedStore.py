@@ -0,0 +1,289 @@
+"""Shift reports partitioned by location and year-month.
+
+Layout under ``data/partitions/``::
+
+    catalog.json
+    location=<locationId>/month=2025-05/   a ReportStore of that store's month
+                                           plus aggregates.json and sketches.json for it
+
+Reports without a location go to ``location=unassigned``. The catalog lists
+every partition with its report count, date range and whether its aggregates
+are fresh, so jobs can pick the partitions they need without opening the
+others. Writes mark the touched partitions stale; ``refresh`` rebuilds the
+aggregates and reconciliation counts of just those partitions, in parallel,
+and the global daily aggregates, employee totals and over/short quantile
+sketches are a merge of the small per-partition results.
+
+The catalog also records the fingerprint of the shiftReports.json the
+partitions were last brought in step with (reportStore.source_fingerprint).
+When the reports change without the partitions, through the Node backend,
+``sheetpro append`` or ``generate``, ``covers`` turns false: the importer then
+repartitions from the store, and the global aggregates are not saved from
+the partitions until they are rebuilt.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+import json
+import os
+
+from aggregateMaintenance import AggregateState, merge, rebuild
+from overShortSketches import merge_sketches, read_sketches, rebuild_sketches
+from reportStore import ReportStore, source_fingerprint
+from shiftRecords import ShiftReport, to_dicts
+
+PARTITIONS_DIR = 'partitions'
+CATALOG_FILE = 'catalog.json'
+PARTITION_AGGREGATES = 'aggregates.json'
+PARTITION_SKETCHES = 'sketches.json'
+UNASSIGNED = 'unassigned'
+WRITE_BATCH = 50000
+
+
+def partition_of(report):
+    """(location, month) partition key of a report dict or record"""
+    if isinstance(report, ShiftReport):
+        location, date = report.location_id, report.date
+    else:
+        location, date = report.get('locationId'), report['date']
+    return location or UNASSIGNED, date[:7]
+
+
+def safe_name(location):
+    # Location ids are cuids/uuids, but keep directory names safe whatever they are
+    return ''.join(c if c.isalnum() or c in '-_.' else '_' for c in location)
+
+
+def partition_name(key):
+    location, month = key
+    return f'location={safe_name(location)}/month={month}'
+
+
+def _write_json(path, data, indent=None):
+    with open(path + '.tmp', 'w') as f:
+        json.dump(data, f, indent=indent)
+    os.replace(path + '.tmp', path)
+
+
+def refresh_partition(path):
+    """Rebuild one partition's aggregates, sketches and reconciliation count (runs inside a pool worker)"""
+    from reconcileReports import validate
+
+    reports = list(ReportStore(path).iter_reports())
+    state = rebuild(reports)
+    _write_json(os.path.join(path, PARTITION_AGGREGATES), state.to_dict())
+    rebuild_sketches(reports).save(path, PARTITION_SKETCHES)
+    dates = [r['date'] for r in reports]
+    return {
+        'reports': len(reports),
+        'minDate': min(dates, default=None),
+        'maxDate': max(dates, default=None),
+        'violations': len(validate(reports)),
+    }
+
+
+def _load_partition_state(path):
+    with open(os.path.join(path, PARTITION_AGGREGATES), 'r') as f:
+        return AggregateState.from_dict(json.load(f))
+
+
+class PartitionedStore:
+    """Partition directories plus the catalog that describes them"""
+
+    def __init__(self, root):
+        self.root = root
+        self.catalog_path = os.path.join(root, CATALOG_FILE)
+        os.makedirs(root, exist_ok=True)
+        if os.path.exists(self.catalog_path):
+            with open(self.catalog_path, 'r') as f:
+                self.catalog = json.load(f)
+        else:
+            self.catalog = {'partitions': {}}
+
+    def _path(self, name):
+        return os.path.join(self.root, *name.split('/'))
+
+    def _entry(self, key):
+        name = partition_name(key)
+        entry = self.catalog['partitions'].get(name)
+        if entry is None:
+            entry = self.catalog['partitions'][name] = {
+                'location': key[0], 'month': key[1], 'reports': 0,
+                'minDate': None, 'maxDate': None, 'violations': None, 'fresh': False,
+            }
+        return name, entry
+
+    def covers(self, data_dir):
+        """True when the partitions hold exactly the reports of data_dir's shiftReports.json"""
+        source = self.catalog.get('source')
+        return source is not None and source == source_fingerprint(data_dir)
+
+    def mark_synced(self, data_dir):
+        """Record that the partitions now match data_dir's reports; call after shiftReports.json is written"""
+        self.catalog['source'] = source_fingerprint(data_dir)
+        self.save_catalog()
+
+    def save_catalog(self):
+        _write_json(self.catalog_path, self.catalog, indent=2)
+
+    def _group(self, reports):
+        groups = {}
+        for report in reports:
+            groups.setdefault(partition_of(report), []).append(report)
+        return groups
+
+    def write(self, reports):
+        """Append new or replacement reports to their partitions; returns the touched partition names"""
+        touched = []
+        for key, group in self._group(reports).items():
+            name, entry = self._entry(key)
+            ReportStore(self._path(name)).append(to_dicts(group))
+            entry['fresh'] = False
+            touched.append(name)
+        self.save_catalog()
+        return touched
+
+    def delete(self, reports):
+        """Tombstone reports (dicts or records) in the partitions they were stored in"""
+        touched = []
+        for key, group in self._group(reports).items():
+            name, entry = self._entry(key)
+            ReportStore(self._path(name)).delete(
+                r.id if isinstance(r, ShiftReport) else r['id'] for r in group)
+            entry['fresh'] = False
+            touched.append(name)
+        self.save_catalog()
+        return touched
+
+    def partitions(self, location=None, months=None, stale_only=False):
+        """Catalog names matching a location and/or a (first, last) month range"""
+        names = []
+        for name, entry in sorted(self.catalog['partitions'].items(), key=lambda e: (e[1]['month'], e[0])):
+            if location is not None and entry['location'] != location:
+                continue
+            if months and not (months[0] <= entry['month'] <= months[1]):
+                continue
+            if stale_only and entry['fresh']:
+                continue
+            names.append(name)
+        return names
+
+    def iter_reports(self, names=None):
+        for name in self.partitions() if names is None else names:
+            yield from ReportStore(self._path(name)).iter_reports()
+
+    def refresh(self, names=None, workers=1):
+        """Rebuild the aggregates of the given (default: stale) partitions, in parallel"""
+        names = self.partitions(stale_only=True) if names is None else list(names)
+        paths = [self._path(name) for name in names]
+        if workers > 1 and len(paths) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(refresh_partition, paths, chunksize=4))
+        else:
+            results = [refresh_partition(path) for path in paths]
+        now = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        for name, result in zip(names, results):
+            entry = self.catalog['partitions'][name]
+            entry.update(result, fresh=True, refreshedAt=now)
+        self.save_catalog()
+        return dict(zip(names, results))
+
+    def aggregates(self, names=None, workers=1):
+        """Merged AggregateState of the given partitions, refreshing stale ones first"""
+        names = self.partitions() if names is None else list(names)
+        stale = [name for name in names if not self.catalog['partitions'][name]['fresh']]
+        if stale:
+            self.refresh(stale, workers)
+        return merge(_load_partition_state(self._path(name)) for name in names
+                     if self.catalog['partitions'][name]['reports'])
+
+    def sketches(self, names=None, workers=1):
+        """Merged over/short sketches of the given partitions, refreshing stale ones first"""
+        names = self.partitions() if names is None else list(names)
+        # Partitions refreshed before the sketches existed have none yet
+        stale = [name for name in names if not self.catalog['partitions'][name]['fresh']
+                 or not os.path.exists(os.path.join(self._path(name), PARTITION_SKETCHES))]
+        if stale:
+            self.refresh(stale, workers)
+        return merge_sketches(read_sketches(os.path.join(self._path(name), PARTITION_SKETCHES)) for name in names
+                              if self.catalog['partitions'][name]['reports'])
+
+    def reset(self, reports, workers=1):
+        """Repartition from scratch, e.g. from the legacy shiftReports.json"""
+        import shutil
+
+        for entry in os.listdir(self.root):
+            if entry.startswith('location='):
+                shutil.rmtree(os.path.join(self.root, entry), ignore_errors=True)
+        self.catalog = {'partitions': {}}
+        batch = []
+        for report in reports:
+            batch.append(report)
+            if len(batch) >= WRITE_BATCH:
+                self.write(batch)
+                batch = []
+        self.write(batch)
+        return self.refresh(workers=workers)
+
+
+def open_partitions(data_dir):
+    return PartitionedStore(os.path.join(data_dir, PARTITIONS_DIR))
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description='Maintain the location/month partitioned report layout')
+    parser.add_argument('data_dir', help='Directory holding shiftReports.json')
+    parser.add_argument('action', choices=['build', 'refresh', 'aggregate', 'validate', 'stats'])
+    parser.add_argument('--location', help='Only partitions of this location id')
+    parser.add_argument('--months', help='Only partitions in FIRST:LAST (YYYY-MM:YYYY-MM)')
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    store = open_partitions(args.data_dir)
+    months = tuple(args.months.split(':')) if args.months else None
+    started = time.perf_counter()
+    if args.action == 'build':
+        from reportStore import open_store
+        results = store.reset(open_store(args.data_dir).iter_reports(), args.workers)
+        store.mark_synced(args.data_dir)
+        print(f'[SUCCESS] Partitioned {sum(r["reports"] for r in results.values())} reports '
+              f'into {len(results)} partitions in {time.perf_counter() - started:.2f}s')
+    elif args.action == 'refresh':
+        names = store.partitions(args.location, months, stale_only=True)
+        store.refresh(names, args.workers)
+        print(f'[SUCCESS] Refreshed {len(names)} stale partitions in {time.perf_counter() - started:.2f}s')
+    elif args.action == 'aggregate':
+        covered = store.covers(args.data_dir)
+        if not covered and not (args.location or months):
+            # Saving would replace the global files with the totals of an older or partial layout
+            print('[ERROR] The partitions do not cover the current shiftReports.json; '
+                  'run "partitionedStore.py DATA build" first')
+            raise SystemExit(1)
+        if not covered:
+            print('[WARN] The partitions are behind shiftReports.json; rebuild them for current totals')
+        state = store.aggregates(store.partitions(args.location, months), args.workers)
+        if args.location or months:
+            print(json.dumps(state.aggregates(), indent=2))
+        else:
+            state.save(args.data_dir)
+            sketches = store.sketches(workers=args.workers)
+            sketches.save(args.data_dir)
+            print(f'[SUCCESS] Saved {len(state.daily)} daily aggregates, {len(state.totals)} employee totals '
+                  f'and {sum(len(s) for s in sketches.sketches.values())} over/short sketches')
+        print(f'[OK] Merged in {time.perf_counter() - started:.2f}s')
+    elif args.action == 'validate':
+        names = store.partitions(args.location, months)
+        results = store.refresh(names, args.workers)
+        bad = {name: r['violations'] for name, r in results.items() if r['violations']}
+        for name, count in bad.items():
+            print(f'  [VIOLATION] {name}: {count} violations (reconcileReports.py for details)')
+        print(f'[{"ERROR" if bad else "OK"}] Checked {len(names)} partitions in {time.perf_counter() - started:.2f}s')
+    else:
+        if not store.covers(args.data_dir):
+            print('[WARN] The partitions are behind shiftReports.json (partitionedStore.py DATA build)')
+        for name in store.partitions(args.location, months):
+            entry = store.catalog['partitions'][name]
+            state = 'fresh' if entry['fresh'] else 'stale'
+            print(f'  {name}: {entry["reports"]} reports, {entry["minDate"]}..{entry["maxDate"]}, {state}')
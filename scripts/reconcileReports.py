@@ -0,0 +1,226 @@
+"""Vectorized reconciliation of the arithmetic inside every shift report.
+
+Each rule says that one stored field equals a signed sum of other fields of
+the same report. All the fields the rules need are pulled into int64 cent
+columns in one pass, then every rule is checked across all reports at once,
+in exact integer arithmetic. Absent terms count as 0; a report without the
+rule's target field is not checked.
+
+The default rules are the three relationships every sheet must satisfy. The
+``extended`` rules also hold for the generated data and for most stores'
+workbooks, but some sheets fill those cells by hand.
+"""
+import numpy as np
+
+from cents import from_cents, to_cents
+from shiftRecords import ShiftReport
+
+# The sums are exact, but workbooks filled by hand or by Excel formulas on
+# unrounded values can be a few cents off
+TOLERANCE = 0.05
+
+POS = 'posShiftData'
+LOTTERY = 'lotteryShiftData'
+DETAILS = 'transferBankDetails'
+DEPOSITS = 'transferBankDeposits'
+
+RULES = {
+    'totalLottery': {
+        'target': (LOTTERY, 'totalLottery'),
+        'terms': [(1, LOTTERY, 'amStartTill'), (1, LOTTERY, 'videoCashIn'), (1, LOTTERY, 'onlineSales'),
+                  (1, LOTTERY, 'extraMoneyAdded'), (1, LOTTERY, 'extraMoneyAddedDayshift'),
+                  (1, LOTTERY, 'extraMoneyAddedNightshift'), (-1, LOTTERY, 'moneyGivenToPos')],
+    },
+    'posOverShort': {
+        'target': (POS, 'overShort'),
+        'terms': [(1, POS, 'transferBankActuallyHave'), (-1, POS, 'transferBankShouldHave')],
+    },
+    'totalCashDeposit': {
+        'target': (DETAILS, 'totalCashDeposit'),
+        'terms': [(1, DEPOSITS, 'depositAmount')],
+    },
+    # Extended rules
+    'moneyGivenToPos': {
+        'target': (LOTTERY, 'moneyGivenToPos'),
+        'terms': [(1, LOTTERY, 'onlineValidate'), (1, LOTTERY, 'freeTickets'), (1, LOTTERY, 'scratchItValidate'),
+                  (1, LOTTERY, 'miscPayout'), (1, LOTTERY, 'miscPayoutDayshift'),
+                  (1, LOTTERY, 'miscPayoutNightshift')],
+    },
+    'lotteryOverShort': {
+        'target': (LOTTERY, 'overShort'),
+        'terms': [(1, LOTTERY, 'totalLottery'), (-1, LOTTERY, 'transferBank')],
+    },
+    'totalPosSales': {
+        'target': (POS, 'totalPosSales'),
+        'terms': [(1, POS, 'expectedDeposit'), (-1, POS, 'amStartTill'), (-1, POS, 'lotteryTillAdded')],
+    },
+}
+DEFAULT_RULES = ['totalLottery', 'posOverShort', 'totalCashDeposit']
+EXTENDED_RULES = list(RULES)
+
+
+def _fields(rules):
+    """Every (section, key) the given rules read, in a stable order"""
+    fields = []
+    for name in rules:
+        rule = RULES[name]
+        for field in [rule['target']] + [(section, key) for _, section, key in rule['terms']]:
+            if field not in fields:
+                fields.append(field)
+    return fields
+
+
+def _snake(key):
+    return ''.join('_' + c.lower() if c.isupper() else c for c in key)
+
+
+def _getter(section, key):
+    """Read one field in cents (None when absent) from a dict or a ShiftReport; lists (deposits) are summed"""
+    attr_section, attr_key = _snake(section), _snake(key)
+
+    def get(report):
+        if isinstance(report, ShiftReport):
+            value = getattr(report, attr_section)
+            if value is None:
+                return None
+            if isinstance(value, list):
+                return sum(to_cents(getattr(item, attr_key)) for item in value)
+            value = getattr(value, attr_key)
+            return None if value is None else to_cents(value)
+        value = report.get(section)
+        if value is None:
+            return None
+        if isinstance(value, list):
+            return sum(to_cents(item.get(key)) for item in value)
+        value = value.get(key)
+        return None if value is None else to_cents(value)
+    return get
+
+
+class ReconciliationColumns:
+    """Report ids plus one int64 cents column (0 when absent) and presence mask per field the rules read"""
+
+    def __init__(self, ids, dates, shift_types, columns, present):
+        self.ids = ids
+        self.dates = dates
+        self.shift_types = shift_types
+        self.columns = columns
+        self.present = present
+
+    @classmethod
+    def from_reports(cls, reports, rules=DEFAULT_RULES):
+        fields = _fields(rules)
+        getters = [_getter(section, key) for section, key in fields]
+        ids, dates, shift_types = [], [], []
+        values = [[] for _ in fields]
+        for report in reports:
+            if isinstance(report, ShiftReport):
+                ids.append(report.id)
+                dates.append(report.date)
+                shift_types.append(report.shift_type)
+            else:
+                ids.append(report.get('id'))
+                dates.append(report.get('date'))
+                shift_types.append(report.get('shiftType'))
+            for column, get in zip(values, getters):
+                column.append(get(report))
+        columns, present = {}, {}
+        for field, column in zip(fields, values):
+            present[field] = np.fromiter((v is not None for v in column), dtype=bool, count=len(column))
+            columns[field] = np.fromiter((v or 0 for v in column), dtype=np.int64, count=len(column))
+        return cls(ids, dates, shift_types, columns, present)
+
+    def __len__(self):
+        return len(self.ids)
+
+
+def check(cols, rules=DEFAULT_RULES, tolerance=TOLERANCE):
+    """Vectorized check of every rule: {rule: (row indices, expected, actual)} in cents for the violations
+
+    The tolerance is in dollars.
+    """
+    results = {}
+    n = len(cols)
+    limit = to_cents(tolerance)
+    for name in rules:
+        rule = RULES[name]
+        actual = cols.columns[rule['target']]
+        expected = np.zeros(n, dtype=np.int64)
+        for sign, section, key in rule['terms']:
+            expected += sign * cols.columns[(section, key)]
+        bad = cols.present[rule['target']] & (np.abs(actual - expected) > limit)
+        rows = np.flatnonzero(bad)
+        results[name] = (rows, expected[rows], actual[rows])
+    return results
+
+
+def violations(cols, rules=DEFAULT_RULES, tolerance=TOLERANCE):
+    """The violations as dicts: id, date, shiftType, rule, field, expected, actual, delta"""
+    found = []
+    for name, (rows, expected, actual) in check(cols, rules, tolerance).items():
+        section, key = RULES[name]['target']
+        for row, want, got in zip(rows.tolist(), expected.tolist(), actual.tolist()):
+            found.append({
+                'id': cols.ids[row],
+                'date': cols.dates[row],
+                'shiftType': cols.shift_types[row],
+                'rule': name,
+                'field': f'{section}.{key}',
+                'expected': from_cents(want),
+                'actual': from_cents(got),
+                'delta': from_cents(got - want),
+            })
+    found.sort(key=lambda v: (v['date'] or '', str(v['id']), v['rule']))
+    return found
+
+
+def validate(reports, rules=DEFAULT_RULES, tolerance=TOLERANCE):
+    """Check a batch of report dicts or records; returns the list of violations"""
+    return violations(ReconciliationColumns.from_reports(reports, rules), rules, tolerance)
+
+
+def print_violations(found, limit=None):
+    """Print one line per violation, at most limit of them"""
+    for v in found[:limit]:
+        print(f'  [VIOLATION] {v["date"]} {v["shiftType"]} {v["id"]}: {v["field"]} is {v["actual"]:.2f}, '
+              f'expected {v["expected"]:.2f} (delta {v["delta"]:+.2f})')
+    if limit is not None and len(found) > limit:
+        print(f'  ... {len(found) - limit} more')
+
+
+if __name__ == '__main__':
+    import argparse
+    import json
+    import sys
+    import time
+
+    from reportStore import open_store
+
+    parser = argparse.ArgumentParser(description='Check the arithmetic invariants of every shift report')
+    parser.add_argument('data_dir', help='Directory holding shiftReports.json')
+    parser.add_argument('--rules', default=','.join(DEFAULT_RULES),
+                        help=f'Comma separated rules, or "extended" for all of: {", ".join(RULES)}')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+                        help='Largest difference accepted, in dollars (default: %(default)s)')
+    parser.add_argument('--output', help='Write every violation to this JSON file')
+    parser.add_argument('--limit', type=int, default=20, help='Violations to print')
+    args = parser.parse_args()
+
+    rules = EXTENDED_RULES if args.rules == 'extended' else args.rules.split(',')
+    unknown = [r for r in rules if r not in RULES]
+    if unknown:
+        parser.error(f'unknown rules: {", ".join(unknown)}')
+
+    started = time.perf_counter()
+    cols = ReconciliationColumns.from_reports(open_store(args.data_dir).iter_reports(), rules)
+    loaded = time.perf_counter()
+    found = violations(cols, rules, args.tolerance)
+    checked = time.perf_counter()
+
+    print_violations(found, args.limit)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(found, f, indent=2)
+    print(f'[{"ERROR" if found else "OK"}] {len(found)} violations of {len(rules)} rules in {len(cols)} reports '
+          f'(load {loaded - started:.2f}s, check {(checked - loaded) * 1000:.1f}ms)')
+    sys.exit(1 if found else 0)
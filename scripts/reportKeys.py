@@ -0,0 +1,70 @@
+"""Content-derived report IDs and natural-key dedupe.
+
+A shift report is identified by its natural key (date, shiftType,
+employeeName, locationId), the schema's unique constraint on
+daily_shift_reports plus the location, so the same shift imported twice gets
+the same ID. IDs are UUIDv5 strings of that key, which fit the String IDs
+the Node backend and Prisma already use.
+
+``plan_upsert`` makes the merge of a large incoming batch into the store a
+single pass: the batch is deduplicated into a dict on the natural key, then
+the existing reports are streamed once and every one whose key (or ID) is in
+the batch is returned as replaced.
+"""
+import uuid
+
+from shiftRecords import ShiftReport
+
+REPORT_NAMESPACE = uuid.UUID('0b7e4a52-8f1d-4c3a-9e26-5d8f0c1a7b34')
+# Shifts whose workbook leaves the employee cell blank (the stores' own sheets) are filed under this one
+UNASSIGNED_EMPLOYEE = 'Unassigned'
+
+
+def natural_key(report):
+    """(date, shiftType, employeeName, locationId) of a dict or ShiftReport; no location is ''"""
+    if isinstance(report, ShiftReport):
+        return report.date, report.shift_type, report.employee_name or '', report.location_id or ''
+    return (report['date'], report['shiftType'], report.get('employeeName') or '',
+            report.get('locationId') or '')
+
+
+def report_id(report):
+    """Deterministic ID of a report (dict or ShiftReport) or of a natural key tuple"""
+    key = report if isinstance(report, tuple) else natural_key(report)
+    return str(uuid.uuid5(REPORT_NAMESPACE, '\x1f'.join(key)))
+
+
+def dedupe(reports):
+    """{natural key: report} with the last report of each key winning, in first-seen key order"""
+    by_key = {}
+    for report in reports:
+        by_key[natural_key(report)] = report
+    return by_key
+
+
+def plan_upsert(existing, incoming, stale_ids=(), stats=None):
+    """Merge plan for an incoming batch against the existing reports, in one pass over each
+
+    Returns (the deduplicated incoming reports, the existing reports they
+    replace). An existing report is replaced when it has the natural key of an
+    incoming report, whatever ID it was stored under, or its ID is in
+    stale_ids (e.g. the previous extraction of a changed workbook).
+
+    When a stats dict is given it receives existing (the number of reports
+    scanned) and total (how many there are once the plan is applied), so
+    callers need no second pass to count the store.
+    """
+    by_key = incoming if isinstance(incoming, dict) else dedupe(incoming)
+    ids = {(r.id if isinstance(r, ShiftReport) else r['id']) for r in by_key.values()}
+    stale_ids = set(stale_ids)
+    replaced = []
+    scanned = 0
+    for report in existing:
+        scanned += 1
+        rid = report.id if isinstance(report, ShiftReport) else report.get('id')
+        if rid in ids or rid in stale_ids or natural_key(report) in by_key:
+            replaced.append(report)
+    if stats is not None:
+        stats['existing'] = scanned
+        stats['total'] = scanned - len(replaced) + len(by_key)
+    return list(by_key.values()), replaced
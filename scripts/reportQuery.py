@@ -0,0 +1,183 @@
+"""Indexed in-process queries over shift reports.
+
+The reports are loaded once as ShiftReport records and indexed:
+
+* a date-sorted position array, so a date range is two bisects
+* hash indexes on id, employeeName and shiftType
+* sorted over/short indexes (POS, lottery or both combined), built on first use
+
+``select`` intersects the index hits, smallest first, and ``aggregate`` rolls
+the selected reports up by date, month, shift type, employee or location.
+"""
+from bisect import bisect_left, bisect_right
+import time
+
+from aggregateMaintenance import report_contribution
+from cents import from_cents, to_cents
+from shiftRecords import ShiftReport
+
+OVER_SHORT_FIELDS = ['pos', 'lottery', 'total']
+GROUP_KEYS = {
+    'date': ('date', lambda r: r.date),
+    'month': ('month', lambda r: r.date[:7]),
+    'shiftType': ('shiftType', lambda r: r.shift_type),
+    'employee': ('employeeName', lambda r: r.employee_name),
+    'location': ('locationId', lambda r: r.location_id),
+}
+
+
+def over_short_of(report, field='total'):
+    """POS, lottery or combined over/short of one record, in cents"""
+    pos = to_cents(report.pos_shift_data.over_short) if report.pos_shift_data else 0
+    lottery = to_cents(report.lottery_shift_data.over_short) if report.lottery_shift_data else 0
+    if field == 'pos':
+        return pos
+    if field == 'lottery':
+        return lottery
+    return pos + lottery
+
+
+class ReportIndex:
+    """Shift reports plus the indexes that answer filters without a full scan"""
+
+    def __init__(self, reports):
+        self.reports = [r if isinstance(r, ShiftReport) else ShiftReport.from_dict(r) for r in reports]
+        # Positions ordered by date (stable, so same-date reports keep file order)
+        self.date_order = sorted(range(len(self.reports)), key=lambda i: self.reports[i].date)
+        self.dates = [self.reports[i].date for i in self.date_order]
+        self.rank = [0] * len(self.reports)
+        for rank, pos in enumerate(self.date_order):
+            self.rank[pos] = rank
+        self.by_id = {}
+        self.by_employee = {}
+        self.by_shift = {}
+        for pos, report in enumerate(self.reports):
+            self.by_id[report.id] = pos
+            self.by_employee.setdefault(report.employee_name, []).append(pos)
+            self.by_shift.setdefault(report.shift_type, []).append(pos)
+        self._over_short = {}
+
+    @classmethod
+    def load(cls, data_dir):
+        from reportStore import open_store
+
+        return cls(open_store(data_dir).iter_reports())
+
+    def __len__(self):
+        return len(self.reports)
+
+    def get(self, report_id):
+        pos = self.by_id.get(report_id)
+        return None if pos is None else self.reports[pos]
+
+    def date_range(self, start=None, end=None):
+        """Positions of the reports dated start..end inclusive (ISO strings, either may be None)"""
+        lo = bisect_left(self.dates, start) if start else 0
+        hi = bisect_right(self.dates, end) if end else len(self.dates)
+        return self.date_order[lo:hi]
+
+    def over_short_index(self, field='total'):
+        """(sorted values, positions) for one over/short field, built once"""
+        if field not in OVER_SHORT_FIELDS:
+            raise KeyError(f'Unknown over/short field {field!r} (known: {", ".join(OVER_SHORT_FIELDS)})')
+        if field not in self._over_short:
+            pairs = sorted((over_short_of(r, field), pos) for pos, r in enumerate(self.reports))
+            self._over_short[field] = ([v for v, _ in pairs], [p for _, p in pairs])
+        return self._over_short[field]
+
+    def over_short_range(self, low=None, high=None, field='total'):
+        """Positions with low <= over/short <= high (dollars); a shortage of 50 or more is high=-50"""
+        values, positions = self.over_short_index(field)
+        lo = bisect_left(values, to_cents(low)) if low is not None else 0
+        hi = bisect_right(values, to_cents(high)) if high is not None else len(values)
+        return positions[lo:hi]
+
+    def select(self, start=None, end=None, employee=None, shift_type=None, ids=None,
+               min_over_short=None, max_over_short=None, over_short_field='total'):
+        """Positions matching every given filter, in date order"""
+        hits = []
+        if start or end:
+            hits.append(self.date_range(start, end))
+        if employee is not None:
+            hits.append(self.by_employee.get(employee, []))
+        if shift_type is not None:
+            hits.append(self.by_shift.get(shift_type, []))
+        if ids is not None:
+            hits.append([self.by_id[i] for i in ids if i in self.by_id])
+        if min_over_short is not None or max_over_short is not None:
+            hits.append(self.over_short_range(min_over_short, max_over_short, over_short_field))
+        if not hits:
+            return list(self.date_order)
+        hits.sort(key=len)
+        selected = set(hits[0])
+        for other in hits[1:]:
+            if not selected:
+                break
+            selected.intersection_update(other)
+        return sorted(selected, key=self.rank.__getitem__)
+
+    def filter(self, **filters):
+        """The matching ShiftReport records, in date order"""
+        return [self.reports[pos] for pos in self.select(**filters)]
+
+    def aggregate(self, positions, by=('employee',)):
+        """Totals per group over the given positions, groups sorted by key"""
+        by = [by] if isinstance(by, str) else list(by)
+        keys = [GROUP_KEYS[name] for name in by]
+        groups = {}
+        for pos in positions:
+            report = self.reports[pos]
+            key = tuple(getter(report) for _, getter in keys)
+            row = groups.get(key)
+            if row is None:
+                row = groups[key] = {field: value for (field, _), value in zip(keys, key)}
+                row.update(reportCount=0, totalVideoCashIn=0, totalPosDeposit=0,
+                           totalLotteryDeposit=0, totalShortage=0, totalOverage=0)
+            daily, shortage, overage = report_contribution(report)
+            row['reportCount'] += 1
+            for field, amount in daily.items():
+                row[field] += amount
+            row['totalShortage'] += shortage
+            row['totalOverage'] += overage
+        rows = [groups[key] for key in sorted(groups, key=lambda k: tuple('' if v is None else v for v in k))]
+        for row in rows:
+            for field in ('totalVideoCashIn', 'totalPosDeposit', 'totalLotteryDeposit',
+                          'totalShortage', 'totalOverage'):
+                row[field] = from_cents(row[field])
+        return rows
+
+
+if __name__ == '__main__':
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description='Query shift reports through in-memory indexes')
+    parser.add_argument('data_dir', help='Directory holding shiftReports.json')
+    parser.add_argument('--from', dest='start', help='First date, inclusive (YYYY-MM-DD)')
+    parser.add_argument('--to', dest='end', help='Last date, inclusive (YYYY-MM-DD)')
+    parser.add_argument('--employee', help='Exact employee name')
+    parser.add_argument('--shift', choices=['day', 'night'], help='Shift type')
+    parser.add_argument('--id', action='append', dest='ids', help='Report id (repeatable)')
+    parser.add_argument('--min-over-short', type=float, help='Lowest over/short to include')
+    parser.add_argument('--max-over-short', type=float,
+                        help='Highest over/short to include, e.g. -50 for shortages of $50 or more')
+    parser.add_argument('--over-short-field', choices=OVER_SHORT_FIELDS, default='total')
+    parser.add_argument('--by', help=f'Aggregate by comma separated keys from: {", ".join(GROUP_KEYS)}')
+    parser.add_argument('--limit', type=int, default=20, help='Reports to list when not aggregating')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    index = ReportIndex.load(args.data_dir)
+    loaded = time.perf_counter()
+    positions = index.select(args.start, args.end, args.employee, args.shift, args.ids,
+                             args.min_over_short, args.max_over_short, args.over_short_field)
+    if args.by:
+        output = index.aggregate(positions, args.by.split(','))
+    else:
+        output = [{'id': r.id, 'date': r.date, 'shiftType': r.shift_type, 'employeeName': r.employee_name,
+                   'overShort': from_cents(over_short_of(r, args.over_short_field))}
+                  for r in (index.reports[pos] for pos in positions[:args.limit])]
+    queried = time.perf_counter()
+    print(json.dumps(output, indent=2))
+    print(f'[OK] {len(positions)} of {len(index)} reports matched in {(queried - loaded) * 1000:.1f}ms '
+          f'(load and index {loaded - started:.2f}s)')
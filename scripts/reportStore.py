@@ -0,0 +1,363 @@
+"""Append-only, segmented shift-report store.
+
+Reports are written as JSON Lines into numbered segment files under
+``data/shiftReports.store/``. ``index.json`` lists the segments and how many
+lines of each are committed, so an append writes only the new records and a
+torn write past the committed count is ignored. A later record with the same
+``id`` supersedes an earlier one and ``{"id": ..., "_deleted": true}`` is a
+tombstone. Compaction merges sealed segments and drops superseded records.
+
+Readers work on a snapshot of the segment list and pin its files, so a
+compaction or reset that swaps the segments (from a background thread, say)
+only deletes the old files once the last reader of them is done.
+
+Every change to the index is made holding ``index.lock`` (an flock, so
+other ReportStore instances and processes on the same directory wait) after
+re-reading ``index.json``, so no writer works from a stale copy of it. A
+compaction seals its segments up front and only swaps in the merged one if
+they are all still there; after a reset in the meantime it gives up.
+
+The Node backend still reads and writes ``shiftReports.json``, so the store
+remembers the size and mtime of the legacy file it last wrote and reloads
+from it when someone else has changed it.
+"""
+from collections import Counter
+from contextlib import contextmanager
+from itertools import islice
+import json
+import os
+import threading
+import time
+
+from jsonStream import append_array, iter_array, write_array
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: only the threads of one process are serialized
+    fcntl = None
+
+STORE_DIR = 'shiftReports.store'
+INDEX_FILE = 'index.json'
+LOCK_FILE = 'index.lock'
+SEGMENT_RECORDS = 50000
+COMPACT_SEGMENTS = 8
+TOMBSTONE = '_deleted'
+# Where the backend keeps its data files, unless SHEETPRO_DATA_DIR or --data-dir says otherwise
+DATA_DIR_ENV = 'SHEETPRO_DATA_DIR'
+
+
+def _fingerprint(path):
+    if not os.path.exists(path):
+        return None
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _write_json(path, data, indent=None):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=indent)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def write_legacy(path, reports):
+    """Stream reports into a shiftReports.json array, byte-identical to json.dump(indent=2)"""
+    write_array(path, reports)
+
+
+def append_legacy(path, reports):
+    """Append reports to an existing shiftReports.json array without rewriting it"""
+    append_array(path, reports)
+
+
+class ReportStore:
+    """Segments of JSON Lines shift reports plus a small index"""
+
+    def __init__(self, root, segment_records=SEGMENT_RECORDS):
+        self.root = root
+        self.segment_records = segment_records
+        self.index_path = os.path.join(root, INDEX_FILE)
+        self.lock_path = os.path.join(root, LOCK_FILE)
+        # Reentrant: a reader pinning segments may be pulled from inside _write_records
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._lock_file = None
+        # Segment files in use by readers, and retired ones to delete when their readers finish
+        self._readers = Counter()
+        self._retired = set()
+        os.makedirs(root, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'r') as f:
+                self.index = json.load(f)
+        else:
+            self.index = {'segments': [], 'nextSegment': 1, 'legacy': None}
+
+    @contextmanager
+    def _locked(self):
+        """Hold the thread lock and index.lock; the outermost holder re-reads index.json first"""
+        with self._lock:
+            if not self._depth:
+                self._lock_file = open(self.lock_path, 'a')
+                if fcntl:
+                    fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+                self._load_index()
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+                if not self._depth:
+                    # Closing the file releases the flock
+                    self._lock_file.close()
+                    self._lock_file = None
+
+    def _segment_path(self, name):
+        return os.path.join(self.root, name)
+
+    def _save_index(self):
+        _write_json(self.index_path, self.index, indent=2)
+
+    def _new_segment(self):
+        name = f'segment-{self.index["nextSegment"]:06d}.jsonl'
+        self.index['nextSegment'] += 1
+        segment = {'name': name, 'records': 0}
+        self.index['segments'].append(segment)
+        return segment
+
+    def _write_records(self, records):
+        """Append records to the active segment, rolling over to new segments as they fill"""
+        records = iter(records)
+        with self._locked():
+            segments = self.index['segments']
+            while True:
+                open_segment = segments and segments[-1]['records'] < self.segment_records \
+                    and not segments[-1].get('sealed')
+                room = self.segment_records - segments[-1]['records'] if open_segment else self.segment_records
+                # Pull one segment's worth at a time so huge inputs are never held in memory
+                batch = list(islice(records, room))
+                if not batch:
+                    break
+                if not open_segment:
+                    self._new_segment()
+                segment = segments[-1]
+                path = self._segment_path(segment['name'])
+                with open(path, 'a') as f:
+                    # Drop any torn tail beyond the committed records first
+                    f.truncate(self._committed_bytes(segment))
+                    f.write(''.join(json.dumps(r, separators=(',', ':')) + '\n' for r in batch))
+                    f.flush()
+                    os.fsync(f.fileno())
+                segment['records'] += len(batch)
+                segment['bytes'] = os.path.getsize(path)
+            self._save_index()
+
+    def _committed_bytes(self, segment):
+        return segment.get('bytes', 0)
+
+    def append(self, reports):
+        """Store new or replacement reports"""
+        self._write_records(reports)
+
+    def delete(self, report_ids):
+        self._write_records({'id': rid, TOMBSTONE: True} for rid in report_ids)
+
+    def _pin(self, segments=None):
+        """Snapshot the segment list (or the given segments) and pin their files for reading"""
+        with self._locked():
+            snapshot = [dict(s) for s in (self.index['segments'] if segments is None else segments)]
+            self._readers.update(s['name'] for s in snapshot)
+        return snapshot
+
+    def _unpin(self, snapshot):
+        with self._lock:
+            self._readers.subtract(s['name'] for s in snapshot)
+            self._remove([name for name in self._retired if not self._readers[name]])
+
+    def _retire(self, names):
+        """Delete replaced segment files now, or when the readers still using them finish (lock held)"""
+        self._retired.update(names)
+        self._remove([name for name in names if not self._readers[name]])
+
+    def _remove(self, names):
+        for name in names:
+            self._retired.discard(name)
+            try:
+                os.remove(self._segment_path(name))
+            except OSError:
+                pass
+
+    def _iter_segment(self, segment):
+        with open(self._segment_path(segment['name']), 'r') as f:
+            for line_no, line in enumerate(f):
+                if line_no >= segment['records']:
+                    break
+                yield json.loads(line)
+
+    def _iter_records(self, segments):
+        for seg_no, segment in enumerate(segments):
+            for line_no, record in enumerate(self._iter_segment(segment)):
+                yield (seg_no, line_no), record
+
+    def iter_reports(self, segments=None):
+        """Yield the current version of every live report
+
+        Two passes keep memory bounded by the number of IDs rather than the
+        size of the reports. A replaced report moves to where its latest
+        version was written, like the importer's kept + new ordering. Both
+        passes read the same pinned snapshot, so a compaction in between
+        changes nothing.
+        """
+        snapshot = self._pin(segments)
+        try:
+            latest = self._latest_positions(snapshot)
+            wanted = {pos for pos, deleted in latest.values() if not deleted}
+            del latest
+            for pos, record in self._iter_records(snapshot):
+                if pos in wanted:
+                    yield record
+        finally:
+            self._unpin(snapshot)
+
+    def _latest_positions(self, segments):
+        """Map each id to the position of its latest record and whether it is a tombstone"""
+        latest = {}
+        for pos, record in self._iter_records(segments):
+            latest[record['id']] = (pos, record.get(TOMBSTONE, False))
+        return latest
+
+    def count(self):
+        snapshot = self._pin()
+        try:
+            return sum(1 for _, deleted in self._latest_positions(snapshot).values() if not deleted)
+        finally:
+            self._unpin(snapshot)
+
+    def is_empty(self):
+        return not any(s['records'] for s in self.index['segments'])
+
+    def reset(self, reports):
+        """Replace the whole store with the given reports"""
+        with self._locked():
+            old = [s['name'] for s in self.index['segments']]
+            self.index['segments'] = []
+            self._write_records(reports)
+            self._retire(old)
+
+    def compact(self):
+        """Merge every sealed segment into one, dropping superseded records and tombstones
+
+        Segments appended while compaction runs are left untouched, so this is
+        safe to run from a background thread. If the compacted segments are
+        gone by the time the merged one is ready (a reset ran meanwhile), the
+        merge is thrown away and nothing is dropped.
+        """
+        with self._locked():
+            snapshot = [dict(s) for s in self.index['segments']]
+            if len(snapshot) < 2:
+                return 0
+            # Sealed in index.json too, so no writer appends to them meanwhile
+            for segment in self.index['segments']:
+                segment['sealed'] = True
+            name = f'segment-{self.index["nextSegment"]:06d}.jsonl'
+            self.index['nextSegment'] += 1
+            self._save_index()
+        before = sum(s['records'] for s in snapshot)
+        path = self._segment_path(name)
+        records = 0
+        with open(path, 'w') as f:
+            for report in self.iter_reports(snapshot):
+                f.write(json.dumps(report, separators=(',', ':')) + '\n')
+                records += 1
+            f.flush()
+            os.fsync(f.fileno())
+        merged = {'name': name, 'records': records, 'bytes': os.path.getsize(path), 'sealed': True}
+        with self._locked():
+            names = {s['name'] for s in snapshot}
+            if not names <= {s['name'] for s in self.index['segments']}:
+                self._remove([name])
+                return 0
+            rest = [s for s in self.index['segments'] if s['name'] not in names]
+            self.index['segments'] = [merged] + rest
+            self._save_index()
+            self._retire(names)
+        return before - records
+
+    def maybe_compact(self, max_segments=COMPACT_SEGMENTS, background=True):
+        """Compact once the store has more than max_segments segments"""
+        if len(self.index['segments']) <= max_segments:
+            return None
+        if not background:
+            return self.compact()
+        thread = threading.Thread(target=self.compact, name='report-store-compaction')
+        thread.start()
+        return thread
+
+    def export(self, legacy_path):
+        """Write the legacy shiftReports.json array for the Node jsonStorage readers"""
+        write_legacy(legacy_path, self.iter_reports())
+        self.mark_legacy(legacy_path)
+
+    def mark_legacy(self, legacy_path):
+        """Remember the legacy file as written by us"""
+        with self._locked():
+            self.index['legacy'] = _fingerprint(legacy_path)
+            self._save_index()
+
+    def sync_from_legacy(self, legacy_path):
+        """Reload from shiftReports.json if it was changed outside the store (or the store is new)"""
+        fingerprint = _fingerprint(legacy_path)
+        if fingerprint is None or fingerprint == self.index.get('legacy'):
+            return False
+        self.reset(iter_array(legacy_path))
+        self.mark_legacy(legacy_path)
+        return True
+
+
+def source_fingerprint(data_dir):
+    """[size, mtime] of shiftReports.json, None when there is none
+
+    Every writer of the reports, the Node backend included, finishes by
+    writing that file, so the derived files (aggregates, series, cube,
+    sketches) save this next to their data and are rebuilt on load when it
+    no longer matches.
+    """
+    return _fingerprint(os.path.join(data_dir, 'shiftReports.json'))
+
+
+def default_data_dir():
+    """$SHEETPRO_DATA_DIR, or the backend's data/ directory next to scripts/"""
+    return os.environ.get(DATA_DIR_ENV) or os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+
+def open_store(data_dir):
+    """Open the store next to shiftReports.json, in sync with it"""
+    store = ReportStore(os.path.join(data_dir, STORE_DIR))
+    store.sync_from_legacy(os.path.join(data_dir, 'shiftReports.json'))
+    return store
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Maintain the segmented shift-report store')
+    parser.add_argument('data_dir', help='Directory holding shiftReports.json')
+    parser.add_argument('action', choices=['compact', 'export', 'stats'])
+    args = parser.parse_args()
+
+    store = open_store(args.data_dir)
+    if args.action == 'compact':
+        started = time.perf_counter()
+        dropped = store.compact()
+        print(f'[SUCCESS] Compacted store, dropped {dropped} superseded records in {time.perf_counter() - started:.2f}s')
+    elif args.action == 'export':
+        store.export(os.path.join(args.data_dir, 'shiftReports.json'))
+        print(f'[SUCCESS] Exported {store.count()} reports to shiftReports.json')
+    else:
+        records = sum(s['records'] for s in store.index['segments'])
+        print(f'{len(store.index["segments"])} segments, {records} records, {store.count()} live reports')
@@ -0,0 +1,363 @@
+"""Declarative cell maps for the daily shift workbook.
+
+A template lists which cells of the sheet hold which report fields. It is
+compiled once into flat cell lists per shift, then every workbook is read with
+a read-only, streaming openpyxl reader that stops at the last referenced row
+and converts the referenced cells to whole cents in one batch; the report
+dicts get dollars back only when they are assembled.
+
+Rows and columns are 0-based, the same offsets the importer used with
+``df.iloc[row, col]`` on ``pd.read_excel(file_path, header=None)``.
+"""
+from functools import lru_cache
+import time
+
+from cents import from_cents, to_cents
+
+DENOMINATIONS = ['coin', '1', '2', '5', '10', '20', '50', '100']
+
+# Layout of the workbooks the stores have used since 2024
+LEGACY_TEMPLATE = {
+    'name': 'legacy',
+    # Day values live in column C, night values in column H
+    'shiftColumns': {'day': 2, 'night': 7},
+    # A1 holds the sheet's date on the month workbooks' day sheets
+    'dateCell': (0, 0),
+    # Employee name above each shift column; the stores' sheets leave it blank, exported ones fill it in
+    'employeeRow': 3,
+    'layout': [
+        {'section': 'posShiftData', 'fields': [
+            {'key': 'amStartTill', 'row': 5},
+            {'key': 'expectedDeposit', 'row': 6},
+            {'key': 'lotteryTillAdded', 'row': 7},
+            {'key': 'totalPosSales', 'row': 8},
+            {'key': 'transferBankShouldHave', 'row': 10},
+            {'key': 'transferBankActuallyHave', 'row': 11},
+            {'key': 'overShort', 'row': 12},
+            {'key': 'comments', 'value': ''},
+        ]},
+        # Draws 1-8 in column B, only kept when non-zero
+        {'section': 'lotteryDraws', 'shifts': ['day'], 'list': {
+            'firstRow': 20, 'count': 8, 'col': 1,
+            'amountKey': 'drawAmount', 'numberKey': 'drawNumber', 'label': 'Draw',
+        }},
+        {'section': 'lotteryShiftData', 'fields': [
+            {'key': 'amStartTill', 'row': 35},
+            {'key': 'videoCashIn', 'row': 36},
+            {'key': 'onlineSales', 'row': 37},
+            {'key': 'onlineValidate', 'row': 40},
+            {'key': 'freeTickets', 'row': 41},
+            {'key': 'scratchItValidate', 'row': 42},
+            {'key': 'transferBank', 'row': 50},
+            {'key': 'moneyGivenToPos', 'row': 47},
+            {'key': 'videoValidate', 'row': 48},
+            {'key': 'totalLottery', 'row': 49},
+            {'key': 'overShort', 'row': 53},
+            {'key': 'comments', 'value': ''},
+            {'key': 'extraMoneyAdded', 'row': 38, 'shifts': ['day']},
+            {'key': 'extraMoneyAddedDayshift', 'row': 38, 'shifts': ['night']},
+            {'key': 'extraMoneyAddedNightshift', 'row': 39, 'shifts': ['night']},
+            {'key': 'miscPayout', 'row': 43, 'shifts': ['day']},
+            {'key': 'miscPayoutDayshift', 'row': 43, 'shifts': ['night']},
+            {'key': 'miscPayoutNightshift', 'row': 44, 'shifts': ['night']},
+        ]},
+        # Denomination table, transfer amounts in column K and deposits in column M
+        {'section': 'transferBankDeposits', 'shifts': ['night'], 'table': {
+            'firstRow': 38, 'labels': DENOMINATIONS, 'labelKey': 'denominationType',
+            'columns': [('transferBankAmount', 10), ('depositAmount', 12)],
+        }},
+        {'section': 'transferBankDetails', 'shifts': ['night'], 'fields': [
+            {'key': 'transferBankBlueBag', 'row': 50},
+            {'key': 'depositShouldHave', 'row': 51},
+            {'key': 'actuallyHaveBlackBag', 'row': 52},
+            {'key': 'totalCashDeposit', 'row': 55},
+        ]},
+    ],
+}
+
+TEMPLATES = {
+    'legacy': LEGACY_TEMPLATE,
+}
+
+DEFAULT_TEMPLATE = 'legacy'
+
+
+def employee_name(value):
+    """The text of an employee cell: '' when blank, numbers without a trailing .0"""
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def _caption(key):
+    """'transferBankAmount' -> 'Transfer Bank Amount'"""
+    return ''.join(' ' + c if c.isupper() else c for c in key).strip().title()
+
+
+class CompiledTemplate:
+    """A template flattened into per-shift cell lists and build steps"""
+
+    def __init__(self, spec):
+        self.name = spec['name']
+        self.shift_columns = dict(spec['shiftColumns'])
+        self.date_cell = tuple(spec.get('dateCell', (0, 0)))
+        # Text cells, read as they are rather than as amounts
+        self.employee_cells = {shift: (spec['employeeRow'], col) for shift, col in self.shift_columns.items()} \
+            if 'employeeRow' in spec else {}
+        self.cells = []
+        self._cell_index = {}
+        self.steps = {shift: self._compile_shift(spec['layout'], shift) for shift in self.shift_columns}
+        self.max_row = max(row for row, _ in self.cells + list(self.employee_cells.values()))
+        self.max_col = max(col for _, col in self.cells + list(self.employee_cells.values()))
+        # Cells grouped by row so the reader can pick them out of each streamed row
+        self.cells_by_row = {}
+        for idx, (row, col) in enumerate(self.cells):
+            self.cells_by_row.setdefault(row, []).append((col, idx))
+        self.employees_by_row = {}
+        for shift, (row, col) in self.employee_cells.items():
+            self.employees_by_row.setdefault(row, []).append((col, shift))
+        self.labels = self._compile_labels(spec['layout'])
+
+    def _cell(self, row, col):
+        key = (row, col)
+        if key not in self._cell_index:
+            self._cell_index[key] = len(self.cells)
+            self.cells.append(key)
+        return self._cell_index[key]
+
+    def _compile_shift(self, layout, shift):
+        value_col = self.shift_columns[shift]
+        steps = []
+        for block in layout:
+            if shift not in block.get('shifts', [shift]):
+                continue
+            section = block['section']
+            if 'fields' in block:
+                fields = []
+                for field in block['fields']:
+                    if shift not in field.get('shifts', [shift]):
+                        continue
+                    if 'value' in field:
+                        fields.append((field['key'], None, field['value']))
+                    else:
+                        idx = self._cell(field['row'], field.get('col', value_col))
+                        fields.append((field['key'], idx, None))
+                steps.append(('fields', section, fields))
+            elif 'list' in block:
+                spec = block['list']
+                cells = [self._cell(spec['firstRow'] + i, spec['col']) for i in range(spec['count'])]
+                steps.append(('list', section, (spec['amountKey'], spec['numberKey'], cells)))
+            elif 'table' in block:
+                spec = block['table']
+                rows = []
+                for i, label in enumerate(spec['labels']):
+                    cols = [(key, self._cell(spec['firstRow'] + i, col)) for key, col in spec['columns']]
+                    rows.append((label, cols))
+                steps.append(('table', section, (spec['labelKey'], rows)))
+        return steps
+
+    def _compile_labels(self, layout):
+        """Caption cells for printed sheets, placed where the reader never looks"""
+        labels = {}
+        first_row = min(row for row, _ in self.cells)
+        for shift, col in self.shift_columns.items():
+            labels[(first_row - 1, col)] = shift.title()
+        for row, _ in self.employee_cells.values():
+            labels[(row, 0)] = 'Employee'
+        for block in layout:
+            if 'fields' in block:
+                for field in block['fields']:
+                    if 'row' in field:
+                        labels.setdefault((field['row'], 0), _caption(field['key']))
+            elif 'list' in block:
+                spec = block['list']
+                for i in range(spec['count']):
+                    labels.setdefault((spec['firstRow'] + i, 0), f'{spec.get("label") or _caption(spec["numberKey"])} {i + 1}')
+            elif 'table' in block:
+                spec = block['table']
+                label_col = min(col for _, col in spec['columns']) - 1
+                for i, label in enumerate(spec['labels']):
+                    labels.setdefault((spec['firstRow'] + i, label_col), label)
+                for key, col in spec['columns']:
+                    labels.setdefault((spec['firstRow'] - 1, col), _caption(key))
+        # Never cover a value cell, even if a layout puts one in the caption column
+        return {cell: text for cell, text in labels.items() if cell not in self._cell_index}
+
+    def read_values(self, rows, employees=None):
+        """Pick the referenced cells out of an iterator of row tuples and convert them to cents in one batch
+
+        When an employees dict is given it receives {shift: employee cell value}.
+        """
+        raw = [None] * len(self.cells)
+        for row_idx, row in enumerate(rows):
+            wanted = self.cells_by_row.get(row_idx)
+            if wanted:
+                for col, idx in wanted:
+                    if col < len(row):
+                        raw[idx] = row[col]
+            if employees is not None and row_idx in self.employees_by_row:
+                for col, shift in self.employees_by_row[row_idx]:
+                    if col < len(row):
+                        employees[shift] = row[col]
+            if row_idx >= self.max_row:
+                break
+        return [to_cents(v) for v in raw]
+
+    def build_report(self, values, date, shift_type, employee=None):
+        """Assemble one shift report dict from cell values in cents and the shift's employee cell"""
+        data = {
+            'date': date,
+            'shiftType': shift_type,
+            'employeeName': employee_name(employee),
+            'status': 'submitted',
+            'submittedAt': f'{date}T12:00:00.000Z',
+        }
+        for kind, section, spec in self.steps[shift_type]:
+            if kind == 'fields':
+                data[section] = {key: (const if idx is None else from_cents(values[idx])) for key, idx, const in spec}
+            elif kind == 'list':
+                amount_key, number_key, cells = spec
+                items = [{amount_key: from_cents(values[idx]), number_key: i + 1}
+                         for i, idx in enumerate(cells) if values[idx] > 0]
+                if items:
+                    data[section] = items
+            elif kind == 'table':
+                label_key, rows = spec
+                items = []
+                for label, cols in rows:
+                    amounts = [(key, values[idx]) for key, idx in cols]
+                    if any(amount > 0 for _, amount in amounts):
+                        item = {label_key: label}
+                        item.update((key, from_cents(amount)) for key, amount in amounts)
+                        items.append(item)
+                if items:
+                    data[section] = items
+        return data
+
+    def cells_for(self, report):
+        """The (row, col, value) cells that hold one report, the inverse of build_report"""
+        cells = []
+        if report['shiftType'] in self.employee_cells and report.get('employeeName'):
+            cells.append((*self.employee_cells[report['shiftType']], report['employeeName']))
+        for kind, section, spec in self.steps[report['shiftType']]:
+            data = report.get(section)
+            if not data:
+                continue
+            if kind == 'fields':
+                cells.extend((*self.cells[idx], data[key]) for key, idx, _ in spec
+                             if idx is not None and key in data)
+            elif kind == 'list':
+                amount_key, number_key, list_cells = spec
+                for item in data:
+                    if 1 <= item[number_key] <= len(list_cells):
+                        cells.append((*self.cells[list_cells[item[number_key] - 1]], item[amount_key]))
+            elif kind == 'table':
+                label_key, rows = spec
+                by_label = {str(item[label_key]): item for item in data}
+                for label, cols in rows:
+                    if label in by_label:
+                        cells.extend((*self.cells[idx], by_label[label].get(key, 0)) for key, idx in cols)
+        return cells
+
+    def extract_rows(self, rows, date):
+        """Extract every shift from an iterator of 0-based row tuples"""
+        employees = {}
+        values = self.read_values(rows, employees)
+        return [self.build_report(values, date, shift, employees.get(shift)) for shift in self.shift_columns]
+
+
+@lru_cache(maxsize=None)
+def get_template(name=DEFAULT_TEMPLATE):
+    """Compile a registered template once per process"""
+    if name not in TEMPLATES:
+        raise KeyError(f'Unknown sheet template {name!r} (known: {", ".join(sorted(TEMPLATES))})')
+    return CompiledTemplate(TEMPLATES[name])
+
+
+def iter_sheet_rows(ws, template):
+    """Stream the rows of a worksheet down to the last row the template needs"""
+    return ws.iter_rows(min_row=1, max_row=template.max_row + 1,
+                        min_col=1, max_col=template.max_col + 1, values_only=True)
+
+
+def _counted(rows, stats):
+    for row in rows:
+        stats['cellsRead'] += len(row)
+        yield row
+
+
+def extract_workbook(file_path, date, template_name=DEFAULT_TEMPLATE, stats=None):
+    """Extract the Day and Night shifts from the first sheet of a workbook
+
+    When a stats dict is given it receives openSeconds, readSeconds,
+    buildSeconds and cellsRead.
+    """
+    from openpyxl import load_workbook
+
+    template = get_template(template_name)
+    if stats is None:
+        wb = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            return template.extract_rows(iter_sheet_rows(wb.worksheets[0], template), date)
+        finally:
+            wb.close()
+
+    stats['cellsRead'] = 0
+    started = time.perf_counter()
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        opened = time.perf_counter()
+        employees = {}
+        values = template.read_values(_counted(iter_sheet_rows(wb.worksheets[0], template), stats), employees)
+        read = time.perf_counter()
+        reports = [template.build_report(values, date, shift, employees.get(shift)) for shift in template.shift_columns]
+        stats['openSeconds'] = opened - started
+        stats['readSeconds'] = read - opened
+        stats['buildSeconds'] = time.perf_counter() - read
+        return reports
+    finally:
+        wb.close()
+
+
+def sheet_rows(reports, template, date=None, labels=False):
+    """The rows of one day's sheet, top to bottom, as lists ready for ws.append"""
+    grid = {}
+    if labels:
+        for (row, col), text in template.labels.items():
+            grid.setdefault(row, {})[col] = text
+        if date:
+            row, col = template.date_cell
+            grid.setdefault(row, {})[col] = date
+    for report in reports:
+        for row, col, value in template.cells_for(report):
+            grid.setdefault(row, {})[col] = value
+    for row in range(template.max_row + 1):
+        values = grid.get(row, {})
+        yield [values.get(col) for col in range(template.max_col + 1)]
+
+
+def write_workbook(file_path, reports, template_name=DEFAULT_TEMPLATE, labels=False):
+    """Write the shifts of one day into a workbook laid out like the template"""
+    write_workbook_sheets(file_path, [(None, reports)], template_name, labels)
+
+
+def write_workbook_sheets(file_path, days, template_name=DEFAULT_TEMPLATE, labels=False):
+    """Write one sheet per (date, reports) day, titled with the date, in a write-only workbook
+
+    Write-only sheets stream their rows to disk, so a month of days costs no
+    more memory than one.
+    """
+    from openpyxl import Workbook
+
+    template = get_template(template_name)
+    wb = Workbook(write_only=True)
+    for date, reports in days:
+        if not date:
+            reports = list(reports)
+            date = reports[0]['date'] if reports else None
+        ws = wb.create_sheet(title=date)
+        for row in sheet_rows(reports, template, date, labels):
+            ws.append(row)
+    wb.save(file_path)
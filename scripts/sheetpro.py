@@ -0,0 +1,222 @@
+"""One command line for the data scripts: sheetpro.py <command> [options],
+or ``sheetpro <command>`` once installed with ``pip install -e scripts``.
+
+    import     extract workbooks into the data files (importExcelData options)
+    generate   replace the data files with the sample dataset
+    append     add generated shifts for extra dates (the January top-up)
+    aggregate  verify or rebuild the aggregate files from shiftReports.json
+    cube       query the lottery draw / deposit denomination roll-ups
+    quantiles  median, p90 and p99 of the over/short per employee, shift, month or store
+    validate   check the reconciliation rules of every stored report
+    export     write the reports as Parquet datasets or template workbooks
+
+Every command works on --data-dir (default: $SHEETPRO_DATA_DIR or the
+backend's data/ directory). Only argparse and the small path helper are
+imported up front; each command imports what it needs when it runs, so the
+cron jobs (aggregate, validate) do not pay for openpyxl or pyarrow.
+"""
+import argparse
+import os
+import sys
+import time
+
+from reportStore import default_data_dir
+
+# 'sheetpro' when run as the installed command, 'sheetpro.py' as a script
+PROG = os.path.basename(sys.argv[0]) if sys.argv[0] else 'sheetpro'
+
+
+def _legacy_reports(data_dir):
+    """Stream shiftReports.json without touching the report store"""
+    from jsonStream import iter_array
+
+    return iter_array(os.path.join(data_dir, 'shiftReports.json'))
+
+
+def cmd_import(args):
+    from importExcelData import main
+
+    main(['--data-dir', args.data_dir] + args.rest, prog=f'{PROG} import')
+    return 0
+
+
+def cmd_generate(args):
+    from generateSampleData import generate_sample_data, print_summary
+
+    print_summary(*generate_sample_data(args.data_dir, args.seed))
+    return 0
+
+
+def cmd_append(args):
+    from addJanuaryData import JANUARY_DATES, append_generated, print_summary
+
+    dates = args.dates.split(',') if args.dates else JANUARY_DATES
+    new_reports, aggregates, total = append_generated(args.data_dir, dates, args.seed)
+    print_summary(new_reports, aggregates, total, dates[0][:7])
+    return 0
+
+
+def cmd_aggregate(args):
+    from aggregateMaintenance import check
+
+    started = time.perf_counter()
+    if args.rebuild:
+        from derivedFiles import DerivedFiles
+
+        derived = DerivedFiles()
+        count = sum(1 for _ in derived.building(_legacy_reports(args.data_dir)))
+        derived.save(args.data_dir)
+        print(f'[SUCCESS] Rebuilt aggregates, over/short series and sketches, and the draw/deposit cube '
+              f'from {count} reports in {time.perf_counter() - started:.2f}s')
+        return 0
+    problems = check(args.data_dir, _legacy_reports(args.data_dir))
+    for problem in problems:
+        print(f'  [MISMATCH] {problem}')
+    print(f'[{"ERROR" if problems else "OK"}] {len(problems)} mismatches against a full rebuild '
+          f'in {time.perf_counter() - started:.2f}s')
+    return 1 if problems else 0
+
+
+def cmd_validate(args):
+    import json
+
+    from reconcileReports import DEFAULT_RULES, EXTENDED_RULES, RULES, TOLERANCE, print_violations, validate
+
+    rules = EXTENDED_RULES if args.rules == 'extended' else args.rules.split(',') if args.rules else DEFAULT_RULES
+    unknown = [r for r in rules if r not in RULES]
+    if unknown:
+        print(f'[ERROR] Unknown rules: {", ".join(unknown)} (known: {", ".join(RULES)})')
+        return 2
+    started = time.perf_counter()
+    tolerance = TOLERANCE if args.tolerance is None else args.tolerance
+    found = validate(_legacy_reports(args.data_dir), rules, tolerance)
+    print_violations(found, args.limit)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(found, f, indent=2)
+    print(f'[{"ERROR" if found else "OK"}] {len(found)} violations of {len(rules)} rules '
+          f'in {time.perf_counter() - started:.2f}s')
+    return 1 if found else 0
+
+
+def cmd_cube(args):
+    import json
+
+    from drawDepositCube import load_cube
+
+    cube = load_cube(args.data_dir, lambda: _legacy_reports(args.data_dir))
+    where = dict(item.split('=', 1) for item in args.where)
+    try:
+        rows = cube.query(args.fact, [d for d in args.by.split(',') if d], where)
+    except KeyError as e:
+        print(f'[ERROR] {e.args[0]}')
+        return 2
+    print(json.dumps(rows, indent=2))
+    return 0
+
+
+def cmd_quantiles(args):
+    import json
+
+    from overShortSketches import RELATIVE_ACCURACY, load_sketches
+
+    sketches = load_sketches(args.data_dir, lambda: _legacy_reports(args.data_dir))
+    where = dict(item.split('=', 1) for item in args.where)
+    try:
+        rows = sketches.query(args.field, [d for d in args.by.split(',') if d], where)
+    except KeyError as e:
+        print(f'[ERROR] {e.args[0]}')
+        return 2
+    print(json.dumps(rows, indent=2))
+    print(f'[OK] {len(rows)} groups, quantiles within {RELATIVE_ACCURACY:.0%} of the exact values')
+    return 0
+
+
+def cmd_export(args):
+    started = time.perf_counter()
+    if args.format == 'xlsx':
+        from excelExport import export_workbooks
+
+        summary = export_workbooks(_legacy_reports(args.data_dir), args.out_dir, args.monthly,
+                                   max(args.workers, 1), start=args.start, end=args.end)
+        print(f'[SUCCESS] Wrote {summary["reports"]} shifts on {summary["sheets"]} sheets in '
+              f'{summary["workbooks"]} workbooks to {args.out_dir} in {time.perf_counter() - started:.2f}s')
+        return 0
+
+    from columnarExport import BATCH_SIZE, export_parquet
+
+    counts = export_parquet(_legacy_reports(args.data_dir), args.out_dir, args.batch_size or BATCH_SIZE)
+    print(f'[SUCCESS] Exported {counts["shifts"]} shifts, {counts["draws"]} draws and '
+          f'{counts["deposits"]} deposits to {args.out_dir} in {time.perf_counter() - started:.2f}s')
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog=PROG, description='SheetPro data tools')
+    parser.add_argument('--data-dir', default=default_data_dir(),
+                        help='Directory holding the data/*.json files (default: %(default)s)')
+    commands = parser.add_subparsers(dest='command', required=True, metavar='command')
+
+    # The importer keeps its own option parser; everything after "import" goes to it
+    p = commands.add_parser('import', add_help=False, help='Import shift workbooks (sheetpro.py import -h)')
+    p.set_defaults(run=cmd_import)
+
+    p = commands.add_parser('generate', help='Replace the data files with the sample dataset')
+    p.add_argument('--seed', type=int, help='Seed for reproducible data')
+    p.set_defaults(run=cmd_generate)
+
+    p = commands.add_parser('append', help='Append generated shifts for more dates')
+    p.add_argument('--dates', help='Comma separated YYYY-MM-DD dates (default: the January 2026 dates)')
+    p.add_argument('--seed', type=int, help='Seed for reproducible data')
+    p.set_defaults(run=cmd_append)
+
+    p = commands.add_parser('aggregate', help='Verify the aggregate files, or rebuild them')
+    p.add_argument('--rebuild', action='store_true',
+                   help='Rewrite the aggregates, over/short series and sketches, and the draw/deposit cube '
+                        'from shiftReports.json')
+    p.set_defaults(run=cmd_aggregate)
+
+    p = commands.add_parser('cube', help='Query the lottery draw and deposit denomination roll-ups')
+    p.add_argument('--fact', choices=['deposits', 'draws'], default='deposits')
+    p.add_argument('--by', default='month', help='Comma separated dimensions (default: %(default)s)')
+    p.add_argument('--where', action='append', default=[], metavar='DIM=VALUE',
+                   help='Restrict a dimension, e.g. denomination=20 (repeatable)')
+    p.set_defaults(run=cmd_cube)
+
+    p = commands.add_parser('quantiles', help='Median, p90 and p99 of the POS or lottery over/short')
+    p.add_argument('--field', choices=['pos', 'lottery'], default='pos')
+    p.add_argument('--by', default='employee',
+                   help='Comma separated dimensions: employee, shiftType, month, location (default: %(default)s)')
+    p.add_argument('--where', action='append', default=[], metavar='DIM=VALUE',
+                   help='Restrict a dimension, e.g. month=2025-05 (repeatable)')
+    p.set_defaults(run=cmd_quantiles)
+
+    p = commands.add_parser('validate', help='Check the reconciliation rules of every report')
+    p.add_argument('--rules', help='Comma separated rules, or "extended" (default: the three core rules)')
+    p.add_argument('--tolerance', type=float, help='Largest difference accepted, in dollars (default: 0.05)')
+    p.add_argument('--output', help='Write every violation to this JSON file')
+    p.add_argument('--limit', type=int, default=20, help='Violations to print')
+    p.set_defaults(run=cmd_validate)
+
+    p = commands.add_parser('export', help='Export the reports as Parquet datasets or template workbooks')
+    p.add_argument('out_dir', help='Directory to write the datasets or workbooks to')
+    p.add_argument('--format', choices=['parquet', 'xlsx'], default='parquet')
+    p.add_argument('--batch-size', type=int, help='Reports per Parquet write (default: 50000)')
+    p.add_argument('--monthly', action='store_true', help='xlsx: one workbook per month with a sheet per day')
+    p.add_argument('--from', dest='start', help='xlsx: first date, inclusive (YYYY-MM-DD)')
+    p.add_argument('--to', dest='end', help='xlsx: last date, inclusive (YYYY-MM-DD)')
+    p.add_argument('-j', '--workers', type=int, default=os.cpu_count() or 1)
+    p.set_defaults(run=cmd_export)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args, args.rest = parser.parse_known_args(argv)
+    if args.rest and args.run is not cmd_import:
+        parser.error(f'unrecognized arguments: {" ".join(args.rest)}')
+    return args.run(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
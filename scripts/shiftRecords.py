@@ -0,0 +1,171 @@
+"""Compact typed records for shift reports.
+
+The JSON files keep the nested dict layout the Node backend expects, but the
+scripts hold reports as ``__slots__`` records while they work on them: a
+lottery section is one small fixed-size object instead of a dict with up to
+18 keys, and the generator fills records positionally from its column lists.
+``from_dict`` / ``to_dict`` convert at the file boundary. Absent fields are
+stored as None and left out again by ``to_dict``; keys the records do not
+know about are kept in ``extra`` so nothing is lost on a round trip.
+"""
+from operator import attrgetter
+import json
+import re
+
+POS_KEYS = (
+    'amStartTill', 'expectedDeposit', 'lotteryTillAdded', 'totalPosSales',
+    'transferBankShouldHave', 'transferBankActuallyHave', 'overShort', 'comments',
+)
+# Day shifts use extraMoneyAdded/miscPayout, night shifts the Dayshift/Nightshift pairs
+LOTTERY_KEYS = (
+    'amStartTill', 'videoCashIn', 'onlineSales',
+    'extraMoneyAdded', 'extraMoneyAddedDayshift', 'extraMoneyAddedNightshift',
+    'onlineValidate', 'freeTickets', 'scratchItValidate',
+    'miscPayout', 'miscPayoutDayshift', 'miscPayoutNightshift',
+    'transferBank', 'moneyGivenToPos', 'videoValidate', 'totalLottery', 'overShort', 'comments',
+)
+DRAW_KEYS = ('drawAmount', 'drawNumber')
+DEPOSIT_KEYS = ('denominationType', 'transferBankAmount', 'depositAmount')
+DETAIL_KEYS = ('transferBankBlueBag', 'depositShouldHave', 'actuallyHaveBlackBag', 'totalCashDeposit')
+REPORT_KEYS = (
+    'id', 'date', 'shiftType', 'employeeName', 'status', 'submittedAt', 'locationId',
+    'posShiftData', 'lotteryShiftData', 'lotteryDraws', 'transferBankDeposits', 'transferBankDetails',
+)
+
+
+def _slots(keys):
+    """snake_case attribute names for camelCase JSON keys"""
+    return tuple(re.sub(r'([A-Z])', lambda m: '_' + m.group(1).lower(), key) for key in keys)
+
+
+class _Record:
+    """Fixed set of JSON keys stored in slots, in JSON key order"""
+
+    __slots__ = ('extra',)
+    KEYS = ()
+
+    def __init_subclass__(cls):
+        super().__init_subclass__()
+        cls._key_set = frozenset(cls.KEYS)
+        cls._values = attrgetter(*cls.__slots__)
+        cls._fields = tuple(zip(cls.__slots__, cls.KEYS))
+
+    def __init__(self, *values, **named):
+        """Positional values in KEYS order and/or snake_case keyword values"""
+        for attr, value in zip(self.__slots__, values):
+            setattr(self, attr, value)
+        for attr in self.__slots__[len(values):]:
+            setattr(self, attr, named.pop(attr, None))
+        if named:
+            raise TypeError(f'{type(self).__name__} got unexpected fields: {", ".join(named)}')
+        self.extra = None
+
+    @classmethod
+    def from_dict(cls, data):
+        record = cls.__new__(cls)
+        get = data.get
+        for attr, key in cls._fields:
+            setattr(record, attr, get(key))
+        if cls._key_set.issuperset(data):
+            record.extra = None
+        else:
+            record.extra = {key: value for key, value in data.items() if key not in cls._key_set}
+        return record
+
+    def to_dict(self):
+        data = {key: value for key, value in zip(self.KEYS, self._values(self)) if value is not None}
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def __eq__(self, other):
+        return type(other) is type(self) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.to_dict()!r})'
+
+
+class PosShiftData(_Record):
+    KEYS = POS_KEYS
+    __slots__ = _slots(POS_KEYS)
+
+
+class LotteryShiftData(_Record):
+    KEYS = LOTTERY_KEYS
+    __slots__ = _slots(LOTTERY_KEYS)
+
+
+class LotteryDraw(_Record):
+    KEYS = DRAW_KEYS
+    __slots__ = _slots(DRAW_KEYS)
+
+
+class TransferBankDeposit(_Record):
+    KEYS = DEPOSIT_KEYS
+    __slots__ = _slots(DEPOSIT_KEYS)
+
+
+class TransferBankDetails(_Record):
+    KEYS = DETAIL_KEYS
+    __slots__ = _slots(DETAIL_KEYS)
+
+
+def _list_from(cls, items):
+    return None if items is None else [cls.from_dict(item) for item in items]
+
+
+def _list_to(records):
+    return [record.to_dict() for record in records]
+
+
+class ShiftReport(_Record):
+    """One shift report with its POS, lottery, draw and deposit sections"""
+
+    KEYS = REPORT_KEYS
+    __slots__ = _slots(REPORT_KEYS)
+
+    @classmethod
+    def from_dict(cls, data):
+        record = super().from_dict(data)
+        if record.pos_shift_data is not None:
+            record.pos_shift_data = PosShiftData.from_dict(record.pos_shift_data)
+        if record.lottery_shift_data is not None:
+            record.lottery_shift_data = LotteryShiftData.from_dict(record.lottery_shift_data)
+        record.lottery_draws = _list_from(LotteryDraw, record.lottery_draws)
+        record.transfer_bank_deposits = _list_from(TransferBankDeposit, record.transfer_bank_deposits)
+        if record.transfer_bank_details is not None:
+            record.transfer_bank_details = TransferBankDetails.from_dict(record.transfer_bank_details)
+        return record
+
+    def to_dict(self):
+        data = {}
+        for key, value in zip(self.KEYS, self._values(self)):
+            if value is None:
+                continue
+            if isinstance(value, _Record):
+                value = value.to_dict()
+            elif isinstance(value, list):
+                value = _list_to(value)
+            data[key] = value
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+
+def from_dicts(reports):
+    return [ShiftReport.from_dict(report) for report in reports]
+
+
+def to_dicts(records):
+    """Report dicts for the JSON writers; accepts records or dicts"""
+    for record in records:
+        yield record.to_dict() if isinstance(record, ShiftReport) else record
+
+
+def loads(text):
+    """A ShiftReport from one JSON document (a JSON Lines row or an array item)"""
+    return ShiftReport.from_dict(json.loads(text))
+
+
+def dumps(record, indent=None):
+    return json.dumps(record.to_dict(), indent=indent, separators=None if indent else (',', ':'))
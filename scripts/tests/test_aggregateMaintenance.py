@@ -0,0 +1,54 @@
+from aggregateMaintenance import AggregateState, compare, rebuild, report_contribution
+from shiftRecords import ShiftReport
+
+
+def _report(rid, employee='Ann', date='2024-05-01', over_short=-2.5, **fields):
+    report = {
+        'id': rid, 'date': date, 'shiftType': 'day', 'employeeName': employee,
+        'status': 'submitted', 'submittedAt': f'{date}T12:00:00.000Z',
+        'posShiftData': {'expectedDeposit': 100.1, 'overShort': over_short},
+        'lotteryShiftData': {'videoCashIn': 20.2, 'transferBank': 30.3, 'overShort': 1.25},
+    }
+    report.update(fields)
+    return report
+
+
+def _draft(rid, **fields):
+    draft = _report(rid, **fields)
+    draft['status'] = 'draft'
+    del draft['submittedAt']
+    return draft
+
+
+def test_totals_in_cents():
+    state = rebuild([_report('a'), _report('b', over_short=0.1)])
+    [day] = state.aggregates()
+    assert day == {'date': '2024-05-01', 'totalVideoCashIn': 40.4, 'totalPosDeposit': 200.2,
+                   'totalLotteryDeposit': 60.6}
+    [total] = state.employee_totals()
+    assert (total['totalShortage'], total['totalOverage']) == (2.5, 2.6)
+
+
+def test_draft_counts_for_nothing():
+    draft = _draft('d', employee='Drafty', date='2024-05-02')
+    assert report_contribution(draft) == report_contribution(ShiftReport.from_dict(draft)) == \
+        ({'totalVideoCashIn': 0, 'totalPosDeposit': 0, 'totalLotteryDeposit': 0}, 0, 0)
+    state = rebuild([_report('a'), draft, ShiftReport.from_dict(_draft('e'))])
+    assert not compare(state, rebuild([_report('a')]))
+    assert [a['date'] for a in state.aggregates()] == ['2024-05-01']
+    assert [t['employeeName'] for t in state.employee_totals()] == ['Ann']
+
+
+def test_submitting_a_draft_replaces_nothing_and_adds_the_report():
+    draft = _draft('a')
+    state = rebuild([draft, _report('b', employee='Bo')])
+    state.apply(inserted=[_report('a')], deleted=[draft])
+    assert not compare(state, rebuild([_report('a'), _report('b', employee='Bo')]))
+
+
+def test_delete_undoes_insert():
+    reports = [_report('a'), _report('b', date='2024-05-02'), _report('c', employee='Bo', over_short=3)]
+    state = rebuild(reports)
+    state.apply(deleted=reports[1:])
+    assert not compare(state, rebuild(reports[:1]))
+    assert [a['date'] for a in state.aggregates()] == ['2024-05-01']
@@ -0,0 +1,44 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from cents import cents_array, from_cents, to_cents
+
+HALVES = [
+    (1.005, 101), (2.675, 268), (0.125, 13), (0.005, 1), (1.015, 102), (12.345, 1235),
+    (-1.005, -101), (-2.675, -268), (-0.005, -1), (-12.345, -1235),
+]
+
+
+@pytest.mark.parametrize('dollars, cents', HALVES)
+def test_half_cents_round_away_from_zero(dollars, cents):
+    assert to_cents(dollars) == cents
+    assert to_cents(str(dollars)) == cents
+
+
+def test_batch_rounding_matches_to_cents():
+    dollars = [d for d, _ in HALVES] + [1.0049999, -1.0049999, 19.99, -0.01, 1e6 + 0.005]
+    assert cents_array(dollars).tolist() == [to_cents(d) for d in dollars]
+
+
+def test_batch_counts_non_finite_amounts_as_zero():
+    values = [1.5, float('inf'), float('-inf'), float('nan'), None, -2.25]
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        assert cents_array(values).tolist() == [150, 0, 0, 0, 0, -225]
+        assert cents_array(np.array([float('inf'), -0.5])).tolist() == [0, -50]
+    assert [to_cents(v) for v in values] == [150, 0, 0, 0, 0, -225]
+
+
+@pytest.mark.parametrize('value, cents', [
+    (-3, -300), (-0.1, -10), (-19.99, -1999), ('-7.5', -750), (' -2.30 ', -230),
+    (None, 0), ('', 0), ('even', 0), ('Even ', 0), ('n/a', 0), (float('nan'), 0), (float('-inf'), 0),
+])
+def test_negative_and_blank_amounts(value, cents):
+    assert to_cents(value) == cents
+
+
+def test_two_decimal_amounts_round_trip():
+    for cents in range(-100000, 100000, 7):
+        assert to_cents(from_cents(cents)) == cents
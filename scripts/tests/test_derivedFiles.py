@@ -0,0 +1,73 @@
+import json
+
+from addJanuaryData import append_generated
+from aggregateMaintenance import compare
+from derivedFiles import DerivedFiles
+from generateSampleData import generate_sample_data
+from reportStore import open_store
+
+
+def _canonical(derived):
+    cube = {fact: {name: sorted(map(json.dumps, rows)) for name, rows in cube.to_dict().items()}
+            for fact, cube in derived.cube.cubes.items()}
+    sketches = {field: sorted(json.dumps(row, sort_keys=True) for row in rows)
+                for field, rows in derived.sketches.to_dict()['sketches'].items()}
+    return json.dumps([derived.series.to_dict(), cube, sketches], sort_keys=True)
+
+
+def _assert_fresh(data_dir):
+    """The saved files load without a rebuild and equal one"""
+    def stale():
+        raise AssertionError('a derived file was stale')
+
+    saved = DerivedFiles.load(data_dir, stale)
+    built = DerivedFiles.from_reports(open_store(data_dir).iter_reports())
+    assert not compare(saved.aggregates, built.aggregates)
+    assert _canonical(saved) == _canonical(built)
+    return saved
+
+
+def test_generate_and_append_keep_every_file_fresh(tmp_path):
+    data_dir = str(tmp_path)
+    generate_sample_data(data_dir, seed=1)
+    _assert_fresh(data_dir)
+    append_generated(data_dir, ['2026-01-05', '2026-01-10'], seed=2)
+    saved = _assert_fresh(data_dir)
+    assert '2026-01' in [row['month'] for row in saved.cube.query('deposits', ['month'])]
+    # Appending the same dates again replaces those shifts
+    append_generated(data_dir, ['2026-01-10', '2026-01-15'], seed=3)
+    _assert_fresh(data_dir)
+
+
+def test_files_are_rebuilt_after_an_outside_edit(tmp_path):
+    data_dir = str(tmp_path)
+    generate_sample_data(data_dir, seed=1)
+    path = tmp_path / 'shiftReports.json'
+    # The Node backend deleting a report rewrites shiftReports.json
+    reports = json.loads(path.read_text())[1:]
+    path.write_text(json.dumps(reports, indent=2))
+    rebuilt = []
+    loaded = DerivedFiles.load(data_dir, lambda: rebuilt.append(1) or reports)
+    assert len(rebuilt) == 4
+    assert _canonical(loaded) == _canonical(DerivedFiles.from_reports(reports))
+
+
+def test_drafts_count_in_none_of_the_files(tmp_path):
+    data_dir = str(tmp_path)
+    generate_sample_data(data_dir, seed=1)
+    reports = list(open_store(data_dir).iter_reports())
+    submitted = DerivedFiles.from_reports(reports)
+    # A draft for a day that has submitted shifts, with draws, deposits and over/short
+    draft = dict(reports[-1], id='draft-1', employeeName='Sarah Johnson', status='draft')
+    assert draft.get('lotteryDraws') or draft.get('transferBankDeposits')
+
+    with_draft = DerivedFiles.from_reports(reports + [draft])
+    assert _canonical(with_draft) == _canonical(submitted)
+    assert not compare(with_draft.aggregates, submitted.aggregates)
+
+    # Saving a draft, then submitting it, counts it once
+    maintained = DerivedFiles.from_reports(reports)
+    maintained.apply(inserted=[draft])
+    assert _canonical(maintained) == _canonical(submitted)
+    maintained.apply(inserted=[dict(draft, status='submitted')], deleted=[draft])
+    assert _canonical(maintained) == _canonical(DerivedFiles.from_reports(reports + [dict(draft, status='submitted')]))
@@ -0,0 +1,42 @@
+import excelExport
+from aggregateMaintenance import compare, load_state
+from excelExport import export_workbooks
+from generateSampleData import generate_sample_data
+from importExcelData import collect_workbooks, run_import
+from reportStore import open_store
+
+
+def _shifts(data_dir):
+    return sorted((r['date'], r['shiftType'], r['employeeName']) for r in open_store(data_dir).iter_reports())
+
+
+def _import(out_dir, data_dir):
+    run_import(collect_workbooks([out_dir], 2025), data_dir=data_dir)
+
+
+def test_exported_workbooks_import_back_to_the_same_shifts(tmp_path, monkeypatch):
+    source, copy = tmp_path / 'source', tmp_path / 'copy'
+    source.mkdir()
+    copy.mkdir()
+    generate_sample_data(str(source), seed=1)
+    # Spill in several small batches
+    monkeypatch.setattr(excelExport, 'SPILL_BATCH', 7)
+
+    monthly = export_workbooks(open_store(str(source)).iter_reports(), str(tmp_path / 'monthly'), monthly=True)
+    daily = export_workbooks(open_store(str(source)).iter_reports(), str(tmp_path / 'daily'), workers=2)
+    count = open_store(str(source)).count()
+    assert monthly['reports'] == daily['reports'] == count
+    assert daily['workbooks'] == daily['sheets'] == count // 2
+    assert not list((tmp_path / 'monthly').glob('.export-*'))
+
+    # Months with a single day are still month workbooks
+    _import(str(tmp_path / 'monthly'), str(copy))
+    assert _shifts(str(copy)) == _shifts(str(source))
+    # Every amount survives; submittedAt is not on the sheet
+    mismatches = compare(load_state(str(copy)), load_state(str(source)))
+    assert mismatches and all('lastUpdated' in line for line in mismatches)
+
+    # The same shifts from the daily layout replace the imported ones rather than adding copies
+    _import(str(tmp_path / 'daily'), str(copy))
+    assert open_store(str(copy)).count() == count
+    assert _shifts(str(copy)) == _shifts(str(source))
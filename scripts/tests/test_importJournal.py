@@ -0,0 +1,109 @@
+import json
+import os
+
+import pytest
+
+import importExcelData
+from aggregateMaintenance import compare
+from derivedFiles import DerivedFiles
+from excelExport import export_workbooks
+from generateSampleData import generate_sample_data
+from importExcelData import collect_workbooks, run_import
+from importJournal import JOURNAL_FILE, ImportJournal
+from reportStore import open_store
+
+
+class Crash(Exception):
+    pass
+
+
+@pytest.fixture
+def workbooks(tmp_path):
+    """The sample data's daily workbooks, in date order"""
+    source = tmp_path / 'source'
+    source.mkdir()
+    generate_sample_data(str(source), seed=1)
+    export_workbooks(open_store(str(source)).iter_reports(), str(tmp_path / 'workbooks'))
+    return collect_workbooks([str(tmp_path / 'workbooks')], 2025)
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    path = tmp_path / 'data'
+    path.mkdir()
+    return str(path)
+
+
+def _reports(data_dir):
+    with open(os.path.join(data_dir, 'shiftReports.json'), 'r') as f:
+        return json.load(f)
+
+
+def test_a_crash_mid_commit_is_finished_by_the_next_run(workbooks, data_dir, monkeypatch):
+    run_import(workbooks[:10], data_dir=data_dir)
+    saved = DerivedFiles.save
+
+    def crash(self, data_dir, metrics=None):
+        # The store and shiftReports.json are written, the derived files only half
+        self.aggregates.save(data_dir)
+        raise Crash()
+
+    monkeypatch.setattr(DerivedFiles, 'save', crash)
+    with pytest.raises(Crash):
+        run_import(workbooks, data_dir=data_dir)
+    assert ImportJournal(os.path.join(data_dir, JOURNAL_FILE)).committing
+    # shiftReports.json may be cut off mid-append; only the store is trusted
+    with open(os.path.join(data_dir, 'shiftReports.json'), 'r+') as f:
+        f.truncate(os.path.getsize(f.name) // 2)
+
+    monkeypatch.setattr(DerivedFiles, 'save', saved)
+    extract = importExcelData.extract_workbooks
+    monkeypatch.setattr(importExcelData, 'extract_workbooks',
+                        lambda todo, *args: iter(()) if not todo else pytest.fail(f'extracted {todo} again'))
+    # The recovery commits the batch and records it in the manifest, so nothing is left to extract
+    assert run_import(workbooks, data_dir=data_dir) == 0
+    monkeypatch.setattr(importExcelData, 'extract_workbooks', extract)
+
+    assert not os.path.exists(os.path.join(data_dir, JOURNAL_FILE))
+    store = open_store(data_dir)
+    assert store.count() == len(_reports(data_dir)) == 2 * len(workbooks)
+    assert len({r['id'] for r in _reports(data_dir)}) == 2 * len(workbooks)
+    loaded = DerivedFiles.load(data_dir, lambda: pytest.fail('a derived file was stale after the recovery'))
+    assert not compare(loaded.aggregates, DerivedFiles.from_reports(store.iter_reports()).aggregates)
+
+
+def test_an_interrupted_extraction_resumes_from_the_journal(workbooks, data_dir, monkeypatch):
+    def crash(*args, **kwargs):
+        raise Crash()
+
+    monkeypatch.setattr(importExcelData, 'commit_batch', crash)
+    with pytest.raises(Crash):
+        run_import(workbooks, data_dir=data_dir)
+    journal = ImportJournal(os.path.join(data_dir, JOURNAL_FILE))
+    assert not journal.committing and len(journal.entries) == len(workbooks)
+    # A torn last line is ignored
+    with open(journal.path, 'a') as f:
+        f.write('{"type": "workbook", "pa')
+    monkeypatch.undo()
+
+    extracted = []
+    extract = importExcelData.extract_workbooks
+    monkeypatch.setattr(importExcelData, 'extract_workbooks',
+                        lambda todo, *args: extracted.extend(todo) or extract(todo, *args))
+    assert run_import(workbooks, data_dir=data_dir) == len(workbooks)
+    assert extracted == []
+    assert open_store(data_dir).count() == 2 * len(workbooks)
+    assert not os.path.exists(journal.path)
+
+
+def test_a_journal_of_other_options_is_started_over(workbooks, data_dir):
+    journal = ImportJournal(os.path.join(data_dir, JOURNAL_FILE))
+    options = {'template': 'legacy', 'location': None, 'full': True, 'partitioned': False}
+    fingerprints = {os.path.abspath(path): {'sha256': 'x'} for path, _ in workbooks}
+    journal.resume(options, workbooks, fingerprints)
+    journal.record({'path': workbooks[0][0], 'date': workbooks[0][1], 'reports': []})
+
+    recovered, todo = ImportJournal(journal.path).resume(options, workbooks, fingerprints)
+    assert len(recovered) == 1 and len(todo) == len(workbooks) - 1
+    recovered, todo = ImportJournal(journal.path).resume(dict(options, location='loc-1'), workbooks, fingerprints)
+    assert recovered == [] and todo == workbooks
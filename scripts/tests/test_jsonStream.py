@@ -0,0 +1,81 @@
+import io
+import json
+
+import pytest
+
+from jsonStream import append_array, iter_array, iter_array_file, write_array
+
+ITEMS = [
+    {'id': 'r1', 'date': '2025-05-07', 'posShiftData': {'overShort': -1.25, 'comments': ''}, 'tags': []},
+    {'id': 'r2', 'employeeName': 'Zoë "Z" O\'Neil', 'note': 'tab\there, slash \\ and ] , [ in a string',
+     'lotteryDraws': [{'drawAmount': 20.0, 'drawNumber': 1}], 'extra': {}},
+    123456789012, -0.5, 1e-07, None, True, 'a string ending in ]',
+    {'nested': [[1, 2], {'deep': ['x', {}]}], 'unicode': 'é中\U0001f600'},
+]
+
+
+def _iter(text, chunk_size):
+    return list(iter_array_file(io.StringIO(text), chunk_size))
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 5, 7, 64, 1 << 16])
+def test_buffer_boundaries_anywhere(chunk_size):
+    for text in (json.dumps(ITEMS, indent=2), json.dumps(ITEMS), json.dumps(ITEMS, ensure_ascii=False)):
+        assert _iter(text, chunk_size) == ITEMS
+
+
+@pytest.mark.parametrize('text', ['[]', ' [ ] \n', '[\n]', '\n\n[\n\n]\n\n'])
+def test_empty_arrays(text):
+    assert _iter(text, 1) == [] and _iter(text, 64) == []
+
+
+@pytest.mark.parametrize('text', ['', '{}', '[1, 2', '[1 2]', '[1,]', '["open]'])
+def test_malformed_input_raises(text):
+    with pytest.raises(ValueError):
+        _iter(text, 4)
+
+
+def test_numbers_split_across_chunks_are_not_truncated():
+    numbers = [1234567, -98765.4321, 1e+300, 0]
+    for chunk_size in range(1, 12):
+        assert _iter(json.dumps(numbers), chunk_size) == numbers
+
+
+def test_write_array_is_byte_identical_to_json_dump(tmp_path):
+    path = tmp_path / 'a.json'
+    for items in (ITEMS, ITEMS[:1], []):
+        assert write_array(str(path), iter(items)) == len(items)
+        assert path.read_bytes() == json.dumps(items, indent=2).encode('utf-8')
+        assert list(iter_array(str(path))) == items
+    write_array(str(path), ITEMS, indent=None)
+    assert json.loads(path.read_text()) == ITEMS
+
+
+@pytest.mark.parametrize('split', [0, 1, 4, len(ITEMS)])
+def test_append_in_place_matches_writing_everything(tmp_path, split):
+    path = tmp_path / 'a.json'
+    write_array(str(path), ITEMS[:split])
+    assert append_array(str(path), ITEMS[split:]) == len(ITEMS) - split
+    assert path.read_bytes() == json.dumps(ITEMS, indent=2).encode('utf-8')
+
+    write_array(str(path), ITEMS[:split], indent=None)
+    append_array(str(path), ITEMS[split:], indent=None)
+    assert path.read_bytes() == json.dumps(ITEMS, separators=(',', ':')).encode('utf-8')
+
+
+def test_append_to_files_written_elsewhere(tmp_path):
+    path = tmp_path / 'a.json'
+    # The Node backend may leave a trailing newline, or an empty array with whitespace inside
+    for text in ('[]\n', '[\n]\n', json.dumps(ITEMS[:2], indent=2) + '\n'):
+        path.write_text(text)
+        before = json.loads(text)
+        append_array(str(path), ITEMS[2:4])
+        assert json.loads(path.read_text()) == before + ITEMS[2:4]
+    # Appending nothing leaves the file alone; a missing file is created
+    assert append_array(str(path), []) == 0
+    missing = tmp_path / 'new.json'
+    append_array(str(missing), ITEMS[:1])
+    assert missing.read_bytes() == json.dumps(ITEMS[:1], indent=2).encode('utf-8')
+    path.write_text('{"not": "an array"}')
+    with pytest.raises(ValueError):
+        append_array(str(path), ITEMS[:1])
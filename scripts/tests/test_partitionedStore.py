@@ -0,0 +1,22 @@
+from addJanuaryData import append_generated
+from generateSampleData import generate_sample_data
+from partitionedStore import open_partitions
+from reportStore import open_store
+
+
+def test_partitions_cover_the_reports_until_they_change_elsewhere(tmp_path):
+    data_dir = str(tmp_path)
+    generate_sample_data(data_dir, seed=1)
+    partitions = open_partitions(data_dir)
+    # A catalog that was never built covers nothing
+    assert not partitions.covers(data_dir)
+
+    store = open_store(data_dir)
+    partitions.reset(store.iter_reports())
+    partitions.mark_synced(data_dir)
+    assert open_partitions(data_dir).covers(data_dir)
+    assert sum(1 for _ in partitions.iter_reports()) == store.count()
+
+    # Writers that do not maintain the partitions leave them behind
+    append_generated(data_dir, ['2026-01-05'], seed=2)
+    assert not open_partitions(data_dir).covers(data_dir)
@@ -0,0 +1,70 @@
+import pytest
+
+from generateSampleData import generate_sample_data
+from reconcileReports import DEFAULT_RULES, EXTENDED_RULES, TOLERANCE, validate
+from reportStore import open_store
+from shiftRecords import ShiftReport
+
+# One consistent report per default rule, and the field that breaks it
+PASSING = {
+    'totalLottery': {'lotteryShiftData': {'amStartTill': 150.0, 'videoCashIn': 800.25, 'onlineSales': 420.0,
+                                          'extraMoneyAdded': 40.0, 'moneyGivenToPos': 110.0,
+                                          'totalLottery': 1300.25}},
+    'posOverShort': {'posShiftData': {'transferBankShouldHave': 2510.0, 'transferBankActuallyHave': 2508.75,
+                                      'overShort': -1.25}},
+    'totalCashDeposit': {'transferBankDeposits': [{'denominationType': '20', 'depositAmount': 1380.0},
+                                                  {'denominationType': 'coin', 'depositAmount': 12.35}],
+                         'transferBankDetails': {'totalCashDeposit': 1392.35}},
+}
+TARGETS = {
+    'totalLottery': ('lotteryShiftData', 'totalLottery'),
+    'posOverShort': ('posShiftData', 'overShort'),
+    'totalCashDeposit': ('transferBankDetails', 'totalCashDeposit'),
+}
+
+
+def _report(sections, rid='r1'):
+    return dict({'id': rid, 'date': '2025-05-07', 'shiftType': 'night'}, **sections)
+
+
+def _off_by(rule, dollars):
+    section, key = TARGETS[rule]
+    report = _report({name: dict(value) if isinstance(value, dict) else value
+                      for name, value in PASSING[rule].items()})
+    report[section][key] = round(report[section][key] + dollars, 2)
+    return report
+
+
+@pytest.mark.parametrize('rule', DEFAULT_RULES)
+def test_each_default_rule_passes_and_fails(rule):
+    assert validate([_report(PASSING[rule])]) == []
+    assert validate([ShiftReport.from_dict(_report(PASSING[rule]))]) == []
+
+    found = validate([_report(PASSING[rule], 'ok'), _off_by(rule, 2.0)])
+    section, key = TARGETS[rule]
+    expected = PASSING[rule][section][key]
+    assert found == [{'id': 'r1', 'date': '2025-05-07', 'shiftType': 'night', 'rule': rule,
+                      'field': f'{section}.{key}', 'expected': expected, 'actual': round(expected + 2.0, 2),
+                      'delta': 2.0}]
+    assert [v['rule'] for v in validate([ShiftReport.from_dict(_off_by(rule, -2.0))])] == [rule]
+
+
+@pytest.mark.parametrize('rule', DEFAULT_RULES)
+def test_tolerance(rule):
+    assert TOLERANCE == 0.05
+    assert validate([_off_by(rule, 0.05)]) == validate([_off_by(rule, -0.05)]) == []
+    assert len(validate([_off_by(rule, 0.06)])) == len(validate([_off_by(rule, -0.06)])) == 1
+    assert validate([_off_by(rule, 0.06)], tolerance=0.1) == []
+    assert len(validate([_off_by(rule, 0.01)], tolerance=0)) == 1
+
+
+def test_reports_without_the_target_are_not_checked():
+    # No totalCashDeposit: deposits alone are not a violation, and absent terms count as 0
+    assert validate([_report({'transferBankDeposits': [{'depositAmount': 20.0}]})]) == []
+    assert validate([_report({'posShiftData': {'overShort': 0.0}})]) == []
+    assert [v['rule'] for v in validate([_report({'posShiftData': {'overShort': 1.0}})])] == ['posOverShort']
+
+
+def test_generated_reports_satisfy_every_rule(tmp_path):
+    generate_sample_data(str(tmp_path), seed=3)
+    assert validate(open_store(str(tmp_path)).iter_reports(), EXTENDED_RULES) == []
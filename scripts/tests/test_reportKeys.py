@@ -0,0 +1,82 @@
+from reportKeys import dedupe, natural_key, plan_upsert, report_id
+from shiftRecords import ShiftReport
+
+
+def _report(date='2025-05-07', shift='day', employee='Sarah Johnson', location=None, amount=0.0, rid=None):
+    report = {'date': date, 'shiftType': shift, 'employeeName': employee,
+              'posShiftData': {'overShort': amount}}
+    if location is not None:
+        report['locationId'] = location
+    report['id'] = rid or report_id(report)
+    return report
+
+
+def _upsert(existing, incoming, stale_ids=()):
+    """The store after merging a batch, the way the importer applies a plan"""
+    kept, replaced = plan_upsert(existing, incoming, stale_ids)
+    replaced_ids = {r['id'] for r in replaced}
+    return [r for r in existing if r['id'] not in replaced_ids] + kept, replaced
+
+
+def test_ids_come_from_the_natural_key():
+    report = _report(location='loc-1')
+    assert report_id(report) == report_id(ShiftReport.from_dict(report)) == report_id(natural_key(report))
+    assert report_id(report) == report_id(_report(location='loc-1', amount=12.5, rid='anything'))
+    # Every part of the key counts; no location is the same as an empty one
+    others = [_report(date='2025-05-08'), _report(shift='night'), _report(employee='Mike Davis'),
+              _report(location='loc-2')]
+    assert len({report_id(r) for r in others + [report]}) == 5
+    assert report_id(_report()) == report_id(_report(location=''))
+
+
+def test_natural_key_collisions_keep_the_last_report():
+    first, second = _report(amount=1.0), _report(amount=2.0)
+    night = _report(shift='night')
+    by_key = dedupe([first, night, second])
+    assert list(by_key.values()) == [second, night]
+    assert plan_upsert([], [first, night, second])[0] == [second, night]
+
+
+def test_reimporting_a_batch_is_idempotent():
+    batch = [_report(), _report(shift='night'), _report(date='2025-05-08')]
+    store, replaced = _upsert([], batch)
+    assert replaced == []
+    again, replaced = _upsert(store, [dict(r) for r in batch])
+    assert sorted(r['id'] for r in replaced) == sorted(r['id'] for r in batch)
+    assert sorted(again, key=lambda r: r['id']) == sorted(store, key=lambda r: r['id'])
+
+
+def test_reports_under_legacy_ids_are_replaced_by_natural_key():
+    # Reports the Node backend created carry its own IDs
+    legacy = [_report(rid='cm1legacy0001'), _report(shift='night', rid='cm1legacy0002'),
+              _report(date='2025-05-08', rid='cm1legacy0003')]
+    store, replaced = _upsert(legacy, [_report(amount=5.0), _report(shift='night', amount=-2.0)])
+    assert sorted(r['id'] for r in replaced) == ['cm1legacy0001', 'cm1legacy0002']
+    assert len(store) == 3
+    assert {r['id'] for r in store} == {'cm1legacy0003', report_id(_report()), report_id(_report(shift='night'))}
+
+
+def test_stale_ids_drop_the_previous_extraction_of_a_changed_workbook():
+    # The employee was corrected in the workbook, so the natural key changed
+    old = _report(employee='Unassigned')
+    other = _report(date='2025-05-08')
+    store, replaced = _upsert([old, other], [_report()], stale_ids=[old['id']])
+    assert replaced == [old]
+    assert sorted(r['employeeName'] for r in store) == ['Sarah Johnson', 'Sarah Johnson']
+
+
+def test_shift_records_are_planned_like_dicts():
+    existing = [ShiftReport.from_dict(_report(rid='cm1legacy0001')), ShiftReport.from_dict(_report(shift='night'))]
+    incoming = [ShiftReport.from_dict(_report())]
+    kept, replaced = plan_upsert(existing, incoming)
+    assert kept == incoming
+    assert [r.id for r in replaced] == ['cm1legacy0001']
+
+
+def test_stats_count_the_store_from_the_scan():
+    legacy = [_report(rid='cm1legacy0001'), _report(date='2025-05-08'), _report(date='2025-05-09')]
+    incoming = [_report(amount=1.0), _report(shift='night'), _report(shift='night', amount=2.0)]
+    stats = {}
+    store, _ = _upsert(legacy, incoming, stale_ids=[legacy[2]['id']])
+    plan_upsert(legacy, incoming, [legacy[2]['id']], stats)
+    assert stats == {'existing': 3, 'total': len(store)} and len(store) == 3
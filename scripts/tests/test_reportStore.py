@@ -0,0 +1,105 @@
+import os
+import threading
+
+from reportStore import ReportStore
+
+
+def _report(i, version=0):
+    return {'id': f'r{i}', 'date': '2024-05-01', 'version': version}
+
+
+def _store(tmp_path, segments=10, per_segment=5):
+    store = ReportStore(str(tmp_path / 'store'), segment_records=per_segment)
+    for seg in range(segments):
+        store.append(_report(seg * per_segment + i) for i in range(per_segment))
+    # Replace every other report so compaction has something to drop
+    store.append(_report(i, version=1) for i in range(0, segments * per_segment, 2))
+    return store
+
+
+def test_iter_reports_returns_latest_versions(tmp_path):
+    store = _store(tmp_path)
+    reports = {r['id']: r for r in store.iter_reports()}
+    assert len(reports) == 50
+    assert reports['r0']['version'] == 1 and reports['r1']['version'] == 0
+
+
+def test_compact_between_passes_of_iter_reports(tmp_path):
+    store = _store(tmp_path)
+    expected = list(store.iter_reports())
+    reader = store.iter_reports()
+    # The first record comes after the first pass, so the segment list is pinned by now
+    first = next(reader)
+    old_files = {s['name'] for s in store.index['segments']}
+    dropped = store.compact()
+    assert dropped == 25
+    # The files are still there for the reader and only go once it finishes
+    assert all(os.path.exists(os.path.join(store.root, name)) for name in old_files)
+    assert [first] + list(reader) == expected
+    assert not any(os.path.exists(os.path.join(store.root, name)) for name in old_files)
+    assert sorted(r['id'] for r in store.iter_reports()) == sorted(r['id'] for r in expected)
+
+
+def test_background_compaction_with_concurrent_readers(tmp_path):
+    store = _store(tmp_path)
+    expected = sorted((r['id'], r['version']) for r in store.iter_reports())
+    results = []
+
+    def read():
+        for _ in range(20):
+            results.append(sorted((r['id'], r['version']) for r in store.iter_reports()))
+
+    readers = [threading.Thread(target=read) for _ in range(3)]
+    for thread in readers:
+        thread.start()
+    store.maybe_compact(max_segments=8).join()
+    for thread in readers:
+        thread.join()
+    assert len(results) == 60 and all(r == expected for r in results)
+    assert store.count() == 50
+    assert len(store.index['segments']) == 1
+    assert sorted(os.listdir(store.root)) == sorted([s['name'] for s in store.index['segments']] + ['index.json', 'index.lock'])
+
+
+def test_reset_while_reading(tmp_path):
+    store = _store(tmp_path)
+    reader = store.iter_reports()
+    first = next(reader)
+    store.reset([_report(100)])
+    assert len([first] + list(reader)) == 50
+    assert [r['id'] for r in store.iter_reports()] == ['r100']
+
+
+def _interrupted(store, action):
+    """Make store's next compaction run action once it has merged its first report"""
+    iter_reports = store.iter_reports
+
+    def merging(segments=None):
+        for n, report in enumerate(iter_reports(segments)):
+            if n == 1:
+                action()
+            yield report
+
+    store.iter_reports = merging
+
+
+def test_reset_during_compaction_is_not_undone(tmp_path):
+    store = _store(tmp_path)
+    _interrupted(store, lambda: store.reset([_report(100)]))
+    assert store.compact() == 0
+    del store.iter_reports
+    assert [r['id'] for r in store.iter_reports()] == ['r100']
+    assert [r['id'] for r in ReportStore(store.root).iter_reports()] == ['r100']
+
+
+def test_compaction_keeps_another_instances_appends(tmp_path):
+    store = _store(tmp_path)
+    other = ReportStore(store.root, segment_records=5)
+    _interrupted(store, lambda: other.append([_report(200), _report(1, version=2)]))
+    assert store.compact() == 25
+    for reader in (store, other, ReportStore(store.root)):
+        reports = {r['id']: r for r in reader.iter_reports()}
+        assert len(reports) == 51
+        assert reports['r200']['version'] == 0 and reports['r1']['version'] == 2
+    # The other instance appended after the sealed segments, not into them
+    assert store.index['segments'][0]['records'] == 50
@@ -0,0 +1,92 @@
+from openpyxl import load_workbook
+
+from sheetTemplate import extract_workbook, get_template, write_workbook_sheets
+
+DATE = '2025-05-07'
+
+
+def _meta(shift, employee):
+    return {'date': DATE, 'shiftType': shift, 'employeeName': employee, 'status': 'submitted',
+            'submittedAt': f'{DATE}T12:00:00.000Z'}
+
+
+DAY = dict(
+    _meta('day', 'Sarah Johnson'),
+    posShiftData={'amStartTill': 200.0, 'expectedDeposit': 1523.45, 'lotteryTillAdded': 100.0,
+                  'totalPosSales': 2000.5, 'transferBankShouldHave': 0.0, 'transferBankActuallyHave': 0.0,
+                  'overShort': -1.25, 'comments': ''},
+    lotteryDraws=[{'drawAmount': 20.0, 'drawNumber': 1}, {'drawAmount': 35.5, 'drawNumber': 3}],
+    lotteryShiftData={'amStartTill': 150.0, 'videoCashIn': 812.3, 'onlineSales': 420.0, 'onlineValidate': 55.0,
+                      'freeTickets': 4.0, 'scratchItValidate': 61.0, 'transferBank': 900.0,
+                      'moneyGivenToPos': 0.0, 'videoValidate': 12.75, 'totalLottery': 1310.0, 'overShort': 0.5,
+                      'comments': '', 'extraMoneyAdded': 40.0, 'miscPayout': 7.5},
+)
+NIGHT = dict(
+    _meta('night', 'Mike Davis'),
+    posShiftData={'amStartTill': 180.0, 'expectedDeposit': 990.0, 'lotteryTillAdded': 0.0, 'totalPosSales': 1200.0,
+                  'transferBankShouldHave': 2510.0, 'transferBankActuallyHave': 2508.0, 'overShort': 3.0,
+                  'comments': ''},
+    # On the night column the lottery transfer and the blue bag are the same cell, H51
+    lotteryShiftData={'amStartTill': 140.0, 'videoCashIn': 300.0, 'onlineSales': 210.0, 'onlineValidate': 0.0,
+                      'freeTickets': 0.0, 'scratchItValidate': 15.0, 'transferBank': 2510.0,
+                      'moneyGivenToPos': 25.0, 'videoValidate': 0.0, 'totalLottery': 640.0, 'overShort': -0.25,
+                      'comments': '', 'extraMoneyAddedDayshift': 40.0, 'extraMoneyAddedNightshift': 10.0,
+                      'miscPayoutDayshift': 7.5, 'miscPayoutNightshift': 0.0},
+    transferBankDeposits=[
+        {'denominationType': 'coin', 'transferBankAmount': 12.35, 'depositAmount': 0.0},
+        {'denominationType': '20', 'transferBankAmount': 400.0, 'depositAmount': 1380.0},
+        {'denominationType': '100', 'transferBankAmount': 0.0, 'depositAmount': 500.0},
+    ],
+    transferBankDetails={'transferBankBlueBag': 2510.0, 'depositShouldHave': 1880.0,
+                         'actuallyHaveBlackBag': 1880.0, 'totalCashDeposit': 1880.0},
+)
+
+
+def test_written_sheet_reads_back_field_for_field(tmp_path):
+    path = str(tmp_path / f'{DATE}.xlsx')
+    write_workbook_sheets(path, [(DATE, [DAY, NIGHT])], labels=True)
+    assert extract_workbook(path, DATE) == [DAY, NIGHT]
+
+
+def test_fields_are_in_the_template_cells(tmp_path):
+    path = str(tmp_path / f'{DATE}.xlsx')
+    write_workbook_sheets(path, [(DATE, [DAY, NIGHT])], labels=True)
+    ws = load_workbook(path).active
+    assert ws['A1'].value == DATE
+    assert (ws['C4'].value, ws['H4'].value) == ('Sarah Johnson', 'Mike Davis')
+    # POS rows 6-13, day in column C and night in column H
+    assert (ws['C6'].value, ws['C7'].value, ws['C13'].value) == (200, 1523.45, -1.25)
+    assert (ws['H12'].value, ws['H13'].value) == (2508, 3)
+    # Draws 1-8 in B21:B28, the unused ones blank
+    assert (ws['B21'].value, ws['B22'].value, ws['B23'].value) == (20, None, 35.5)
+    # Lottery rows 36-56
+    assert (ws['C37'].value, ws['C39'].value, ws['C44'].value) == (812.3, 40, 7.5)
+    assert (ws['H39'].value, ws['H40'].value, ws['H51'].value) == (40, 10, 2510)
+    # Denominations from row 39: transfer amounts in K, deposits in M
+    assert (ws['K39'].value, ws['M39'].value, ws['M44'].value, ws['M46'].value) == (12.35, 0, 1380, 500)
+    assert (ws['H52'].value, ws['H56'].value) == (1880, 1880)
+
+
+def test_blank_and_text_cells():
+    template = get_template()
+    rows = [[None] * (template.max_col + 1) for _ in range(template.max_row + 1)]
+    rows[5][2] = '125.10'
+    rows[12][2] = 'even'
+    rows[12][7] = ''
+    rows[20][1] = 'n/a'
+    rows[38][10] = 5
+    rows[3][2] = 1042.0
+    # Rows may be shorter than the template's last column
+    rows[49] = rows[49][:3]
+    day, night = template.extract_rows(iter(map(tuple, rows)), DATE)
+
+    assert day['employeeName'] == '1042' and night['employeeName'] == ''
+    assert day['posShiftData']['amStartTill'] == 125.1
+    assert day['posShiftData']['overShort'] == 0.0 and night['posShiftData']['overShort'] == 0.0
+    assert set(day['lotteryShiftData'].values()) == {0.0, ''}
+    # Empty lists and tables are left out altogether
+    assert 'lotteryDraws' not in day and 'transferBankDeposits' not in day
+    assert night['transferBankDeposits'] == [{'denominationType': 'coin', 'transferBankAmount': 5.0,
+                                              'depositAmount': 0.0}]
+    assert night['transferBankDetails'] == dict.fromkeys(
+        ['transferBankBlueBag', 'depositShouldHave', 'actuallyHaveBlackBag', 'totalCashDeposit'], 0.0)
@@ -0,0 +1,43 @@
+import pytest
+
+from aggregateMaintenance import rebuild
+from generateSampleData import generate_sample_data
+from reportStore import open_store
+from vectorAggregates import ReportColumns, daily_aggregates, employee_totals
+
+
+@pytest.fixture
+def reports(tmp_path):
+    """The sample data with some drafts and a report with a null submittedAt"""
+    generate_sample_data(str(tmp_path), seed=1)
+    reports = list(open_store(str(tmp_path)).iter_reports())
+    for report in reports[::7]:
+        report['status'] = 'draft'
+    reports[3]['submittedAt'] = None
+    # A draft of a day and an employee nothing else has
+    reports.append(dict(reports[0], id='draft-only', date='2026-03-01', employeeName='New Hire', status='draft'))
+    return reports
+
+
+def _by(rows, key):
+    return {row[key]: {k: v for k, v in row.items() if k != 'id'} for row in rows}
+
+
+def _check(cols, reports):
+    state = rebuild(reports)
+    assert _by(daily_aggregates(cols), 'date') == _by(state.aggregates(), 'date')
+    assert _by(employee_totals(cols), 'employeeName') == _by(state.employee_totals(), 'employeeName')
+
+
+def test_report_columns_match_the_maintained_aggregates(reports):
+    cols = ReportColumns.from_reports(reports)
+    assert len(cols) == sum(1 for r in reports if r.get('status') != 'draft')
+    assert 'None' not in list(cols.submitted_labels)
+    _check(cols, reports)
+
+
+def test_arrow_columns_match_the_maintained_aggregates(reports):
+    pytest.importorskip('pyarrow')
+    from columnarExport import to_arrow
+
+    _check(ReportColumns.from_arrow(to_arrow(reports)['shifts']), reports)
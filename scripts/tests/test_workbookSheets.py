@@ -0,0 +1,71 @@
+from datetime import datetime
+
+import pytest
+
+from sheetTemplate import write_workbook_sheets
+from workbookSheets import MAIN_NS, extract_sheet, header_date, parse_date, parse_month, read_cells, read_workbook
+
+NS = MAIN_NS[1:-1]
+
+
+@pytest.mark.parametrize('name, period, date', [
+    ('2025-05-07', None, '2025-05-07'),
+    ('2025-5-7', None, '2025-05-07'),
+    (' 5.7.2025 ', None, '2025-05-07'),
+    ('5.7', '2025', '2025-05-07'),
+    ('5.7', '2025-05', '2025-05-07'),
+    ('7', '2025-05', '2025-05-07'),
+    ('5.7', None, None),
+    ('7', '2025', None),
+    ('2.30', '2025', None),
+    ('2025-02-29', None, None),
+    ('2024-02-29', None, '2024-02-29'),
+    ('Summary', '2025-05', None),
+    ('2025-05', None, None),
+])
+def test_parse_date(name, period, date):
+    assert parse_date(name, period) == date
+
+
+def test_parse_month_and_header_date():
+    assert parse_month('2025-05') == parse_month('5.2025') == '2025-05'
+    assert parse_month('2025-13') is None and parse_month('5.7') is None
+    assert header_date(datetime(2025, 5, 7, 9, 30)) == '2025-05-07'
+    assert header_date(45784) == '2025-05-07'
+    assert header_date('2025-05-07T00:00:00') == '2025-05-07'
+    # An amount in the date cell is not a date
+    assert header_date(125.5) is None and header_date(None) is None
+
+
+def _sheet(rows):
+    return f'<worksheet xmlns="{NS}"><sheetData>{rows}</sheetData></worksheet>'.encode()
+
+
+def test_read_cells_without_r_attributes():
+    xml = _sheet('<row><c t="inlineStr"><is><t>May 7</t></is></c></row>'
+                 '<row><c><v>1</v></c><c><v>2.5</v></c><c t="s"><v>0</v></c></row>'
+                 '<row r="5"><c r="B5"><v>7</v></c><c><v>8</v></c></row>'
+                 '<row><c/><c t="b"><v>1</v></c></row>')
+    wanted = {(0, 0), (1, 1), (1, 2), (4, 1), (4, 2), (5, 1), (3, 0)}
+    assert read_cells(xml, ['shared'], wanted, 10) == {
+        (0, 0): 'May 7', (1, 1): 2.5, (1, 2): 'shared', (4, 1): 7, (4, 2): 8, (5, 1): True,
+    }
+    # Rows past max_row are not read
+    assert read_cells(xml, ['shared'], wanted, 1) == {(0, 0): 'May 7', (1, 1): 2.5, (1, 2): 'shared'}
+
+
+def test_extract_sheet_reads_back_written_sheets(tmp_path):
+    report = {'date': '2025-05-07', 'shiftType': 'day', 'employeeName': 'Sarah Johnson',
+              'posShiftData': {'amStartTill': 200.0, 'overShort': -1.25}}
+    path = str(tmp_path / '2025-05.xlsx')
+    write_workbook_sheets(path, [('2025-05-07', [report]), ('Notes', [])], labels=True)
+    [(title, xml), (notes, notes_xml)], strings = read_workbook(path)
+
+    date, reports = extract_sheet(xml, strings, title, '2025-05')
+    day = next(r for r in reports if r['shiftType'] == 'day')
+    assert date == '2025-05-07'
+    assert day['employeeName'] == 'Sarah Johnson'
+    assert day['posShiftData']['amStartTill'] == 200.0 and day['posShiftData']['overShort'] == -1.25
+    # Without a date in its title the sheet is dated by its date cell, if it has one
+    assert extract_sheet(xml, strings, 'Sheet1', '2025-05')[0] == '2025-05-07'
+    assert extract_sheet(notes_xml, strings, notes, '2025-05') == (None, [])
@@ -0,0 +1,236 @@
+"""Month workbooks: one file with a sheet per day, read in one pass.
+
+Some stores keep a whole month in one workbook (2025-05.xlsx, or any name
+without a day) with one sheet per day. Each sheet is dated by its title
+(2025-05-07, 5.7, 5.7.2025, or just 7 when the file name gives the month),
+or else by the template's date cell, A1 on the sheets excelExport writes.
+The employee cells are read as text, like the daily workbooks'.
+Sheets with no date at all (a summary, notes) are skipped.
+
+An .xlsx file is a zip of XML parts, so the workbook is opened once: the
+sheet list, the shared strings and every sheet's XML are decompressed in
+one go by read_workbook, and the sheets are then parsed independently by
+extract_sheet, which the importer runs as one pool job per sheet. The parser
+only keeps the cells the template references, with the cached results of
+formulas, the same values openpyxl returns with data_only=True.
+"""
+from datetime import datetime, timedelta
+import io
+import os
+import posixpath
+import re
+import time
+from xml.etree import ElementTree
+import zipfile
+
+from cents import to_cents
+from sheetTemplate import DEFAULT_TEMPLATE, get_template
+
+# Day names look like 5.7 (month.day), 5.7.2025 or 2025-05-07; month names like 2025-05 or 5.2025
+ISO_NAME = re.compile(r'^(\d{4})-(\d{1,2})-(\d{1,2})$')
+DOTTED_NAME = re.compile(r'^(\d{1,2})\.(\d{1,2})(?:\.(\d{4}))?$')
+MONTH_NAME = re.compile(r'^(?:(\d{4})-(\d{1,2})|(\d{1,2})\.(\d{4}))$')
+DAY_NUMBER = re.compile(r'^\d{1,2}$')
+
+MAIN_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+PACKAGE_REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+WORKSHEET_TYPE = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet'
+# Excel's day 0; date cells hold days since then
+EXCEL_EPOCH = datetime(1899, 12, 30)
+
+
+def _date(y, m, d):
+    try:
+        return datetime(y, m, d).strftime('%Y-%m-%d')
+    except ValueError:
+        return None
+
+
+def parse_date(name, period=None):
+    """The YYYY-MM-DD date a file or sheet name stands for, None if it has no day
+
+    period ('YYYY' or 'YYYY-MM') supplies the year of a month.day name and
+    the month of a bare day number.
+    """
+    name = name.strip()
+    match = ISO_NAME.match(name)
+    if match:
+        return _date(*(int(g) for g in match.groups()))
+    match = DOTTED_NAME.match(name)
+    if match:
+        if match.group(3):
+            year = int(match.group(3))
+        elif period:
+            year = int(period[:4])
+        else:
+            return None
+        return _date(year, int(match.group(1)), int(match.group(2)))
+    if period and len(period) == 7 and DAY_NUMBER.match(name):
+        return _date(int(period[:4]), int(period[5:7]), int(name))
+    return None
+
+
+def parse_month(name):
+    """'YYYY-MM' for a month name such as 2025-05 or 5.2025, else None"""
+    match = MONTH_NAME.match(name.strip())
+    if not match:
+        return None
+    year, month = (int(match.group(1)), int(match.group(2))) if match.group(1) else \
+        (int(match.group(4)), int(match.group(3)))
+    return f'{year:04d}-{month:02d}' if 1 <= month <= 12 else None
+
+
+def is_period(date):
+    """True for the 'YYYY' or 'YYYY-MM' the importer gives a workbook whose name has no day"""
+    return date is not None and len(date) < 10
+
+
+def header_date(value, period=None):
+    """The date in a sheet's date cell: a date string, a datetime or an Excel day number"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d')
+    if isinstance(value, (int, float)):
+        # Plausible Excel date numbers only (1982-2119), not an amount that happens to be there
+        if 30000 <= value < 80000:
+            return (EXCEL_EPOCH + timedelta(days=int(value))).strftime('%Y-%m-%d')
+        return None
+    return parse_date(str(value).split('T')[0].split(' ')[0], period)
+
+
+def _rels_target(target):
+    # Targets are relative to xl/ unless they start at the package root
+    return target.lstrip('/') if target.startswith('/') else posixpath.normpath(posixpath.join('xl', target))
+
+
+def _sheet_parts(zf):
+    """[(title, part name)] of the worksheets in tab order"""
+    rels = ElementTree.fromstring(zf.read('xl/_rels/workbook.xml.rels'))
+    targets = {rel.get('Id'): _rels_target(rel.get('Target'))
+               for rel in rels.iter(PACKAGE_REL_NS + 'Relationship') if rel.get('Type') == WORKSHEET_TYPE}
+    workbook = ElementTree.fromstring(zf.read('xl/workbook.xml'))
+    return [(sheet.get('name'), targets[sheet.get(REL_NS + 'id')])
+            for sheet in workbook.iter(MAIN_NS + 'sheet') if sheet.get(REL_NS + 'id') in targets]
+
+
+def sheet_titles(file_path):
+    """The worksheet titles of a workbook, read from its sheet list only"""
+    with zipfile.ZipFile(file_path) as zf:
+        return [title for title, _ in _sheet_parts(zf)]
+
+
+def _shared_strings(zf):
+    if 'xl/sharedStrings.xml' not in zf.namelist():
+        return []
+    strings = []
+    for _, item in ElementTree.iterparse(io.BytesIO(zf.read('xl/sharedStrings.xml'))):
+        if item.tag == MAIN_NS + 'si':
+            # Plain text, or rich text runs; phonetic hints (rPh) are not part of the value
+            runs = item.findall(MAIN_NS + 't') + item.findall(f'{MAIN_NS}r/{MAIN_NS}t')
+            strings.append(''.join(t.text or '' for t in runs))
+            item.clear()
+    return strings
+
+
+def read_workbook(file_path):
+    """Decompress a workbook once: ([(title, sheet XML)], shared strings)"""
+    with zipfile.ZipFile(file_path) as zf:
+        sheets = [(title, zf.read(part)) for title, part in _sheet_parts(zf)]
+        return sheets, _shared_strings(zf)
+
+
+def _cell_position(ref):
+    """'AB12' -> (11, 27), 0-based (row, col)"""
+    col = 0
+    for i, char in enumerate(ref):
+        if char.isdigit():
+            return int(ref[i:]) - 1, col - 1
+        col = col * 26 + ord(char.upper()) - 64
+    raise ValueError(f'Bad cell reference {ref!r}')
+
+
+def _cell_value(cell, shared_strings):
+    kind = cell.get('t', 'n')
+    if kind == 'inlineStr':
+        return ''.join(t.text or '' for t in cell.iter(MAIN_NS + 't'))
+    value = cell.findtext(MAIN_NS + 'v')
+    # A formula that was never calculated has no (or an empty) cached value
+    if not value:
+        return None
+    if kind == 'n':
+        number = float(value)
+        return int(number) if number.is_integer() and '.' not in value and 'E' not in value.upper() else number
+    if kind == 's':
+        return shared_strings[int(value)]
+    if kind == 'b':
+        return value == '1'
+    if kind == 'e':
+        return None
+    # 'str' (a formula's text result) and 'd' (an ISO date)
+    return value
+
+
+def read_cells(xml, shared_strings, wanted, max_row):
+    """{(row, col): value} of the wanted cells of one sheet, parsing no further than max_row"""
+    values = {}
+    row_idx = -1
+    for _, element in ElementTree.iterparse(io.BytesIO(xml)):
+        if element.tag != MAIN_NS + 'row':
+            continue
+        # The r attributes are optional; without them rows and cells follow each other
+        row_idx = int(element.get('r')) - 1 if element.get('r') else row_idx + 1
+        if row_idx > max_row:
+            break
+        col_idx = -1
+        for cell in element.iter(MAIN_NS + 'c'):
+            ref = cell.get('r')
+            col_idx = _cell_position(ref)[1] if ref else col_idx + 1
+            if (row_idx, col_idx) in wanted:
+                values[(row_idx, col_idx)] = _cell_value(cell, shared_strings)
+        element.clear()
+    return values
+
+
+def extract_sheet(xml, shared_strings, title, period=None, template_name=DEFAULT_TEMPLATE, stats=None):
+    """(date, shift dicts) of one sheet of a month workbook; (None, []) for a sheet with no date
+
+    When a stats dict is given it receives readSeconds, buildSeconds and
+    cellsRead, as for extract_workbook.
+    """
+    template = get_template(template_name)
+    started = time.perf_counter()
+    wanted = set(template.cells)
+    wanted.add(template.date_cell)
+    wanted.update(template.employee_cells.values())
+    cells = read_cells(xml, shared_strings, wanted, template.max_row)
+    read = time.perf_counter()
+    date = parse_date(title, period) or header_date(cells.get(template.date_cell), period)
+    reports = []
+    if date:
+        values = [to_cents(cells.get(cell)) for cell in template.cells]
+        reports = [template.build_report(values, date, shift, cells.get(template.employee_cells.get(shift)))
+                   for shift in template.shift_columns]
+    if stats is not None:
+        stats['cellsRead'] = len(cells)
+        stats['readSeconds'] = read - started
+        stats['buildSeconds'] = time.perf_counter() - read
+    return date, reports
+
+
+if __name__ == '__main__':
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description='List the dated sheets of a month workbook')
+    parser.add_argument('workbook')
+    parser.add_argument('--year', type=int, default=datetime.now().year,
+                        help='Year for sheets titled month.day (default: current year)')
+    args = parser.parse_args()
+
+    period = parse_month(os.path.splitext(os.path.basename(args.workbook))[0]) or str(args.year)
+    sheets, strings = read_workbook(args.workbook)
+    for title, xml in sheets:
+        date, reports = extract_sheet(xml, strings, title, period)
+        print(json.dumps({'sheet': title, 'date': date, 'shifts': len(reports)}))
@@ -0,0 +1,395 @@
+"""Seeded, vectorized synthetic shift-report generator.
+
+One generator for the sample data, the January top-up and load-test datasets
+of any size: N locations, M employees per location, any date range, with
+configurable day/night value distributions and over/short variance.
+
+The work is split into chunks of consecutive days for one location. Every
+chunk draws from its own NumPy generator, spawned from the root seed with
+``SeedSequence.spawn``, so the same seed gives the same data whatever the
+number of worker processes. Chunks are serialized inside the workers and
+written to disk in chunk order, keeping memory flat. ``write_partitioned``
+writes the same chunks into the location/month partition layout instead.
+
+Amounts are drawn in whole cents and every derived field (totals, over/short,
+money given to POS) is int64 arithmetic on those, so the generated reports
+reconcile exactly; the columns become dollars once, when the records are built.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date as Date, timedelta
+from itertools import repeat
+import os
+
+import numpy as np
+
+from cents import to_cents, to_dollars
+from jsonStream import encode_item
+from reportKeys import report_id
+from shiftRecords import (
+    LOTTERY_KEYS, POS_KEYS, LotteryDraw, LotteryShiftData, PosShiftData, ShiftReport,
+    TransferBankDeposit, TransferBankDetails,
+)
+
+DENOMINATIONS = ['coin', '1', '2', '5', '10', '20', '50', '100']
+
+# Value ranges are (low, high) for a uniform draw, matching the original sample scripts
+DAY_PROFILE = {
+    'amStartTill': 500.00,
+    'expectedDeposit': (2200, 3500),
+    'lotteryTillAdded': (150, 300),
+    'posVariance': 15,
+    'lotteryAmStart': 300.00,
+    'videoCashIn': (400, 650),
+    'onlineSales': (100, 200),
+    'extraMoney': [(0, 50)],
+    'onlineValidate': (40, 80),
+    'freeTickets': (20, 40),
+    'scratchItValidate': (25, 50),
+    'miscPayout': [(10, 30)],
+    'transferBank': (600, 900),
+    'drawProbability': 0.7,
+    'drawAmount': (0, 100),
+    'submittedTime': 'T14:30:00.000Z',
+    'posComment': 'Day shift completed',
+    'lotteryComment': 'Lottery balanced',
+}
+
+NIGHT_PROFILE = {
+    'amStartTill': 500.00,
+    'expectedDeposit': (2800, 4000),
+    'lotteryTillAdded': (180, 320),
+    'posVariance': 20,
+    'lotteryAmStart': 300.00,
+    'videoCashIn': (450, 700),
+    'onlineSales': (120, 220),
+    # Night sheets carry the day and night columns separately
+    'extraMoney': [(0, 60), (0, 60)],
+    'onlineValidate': (50, 90),
+    'freeTickets': (25, 45),
+    'scratchItValidate': (30, 55),
+    'miscPayout': [(10, 35), (15, 40)],
+    'transferBank': (700, 1000),
+    'deposits': [(20, 150)] * 4 + [(100, 400)] * 2 + [(0, 200)] * 2,
+    'submittedTime': 'T23:45:00.000Z',
+    'posComment': 'Night shift closed',
+    'lotteryComment': 'Night shift completed',
+}
+
+CHUNK_DAYS = 366
+FORMATS = ['json', 'compact', 'jsonl']
+
+
+def date_range(start, end):
+    """ISO date strings from start to end inclusive"""
+    first, last = Date.fromisoformat(start), Date.fromisoformat(end)
+    return [(first + timedelta(days=i)).isoformat() for i in range((last - first).days + 1)]
+
+
+def _u(rng, bounds, n):
+    """Uniform draws rounded to whole cents"""
+    return np.rint(rng.uniform(bounds[0], bounds[1], n) * 100).astype(np.int64)
+
+
+def _shift_arrays(rng, profile, n, shift_type, variance_scale):
+    """Draw every value of n shifts of one type as int64 cent arrays, returned as dollar lists"""
+    am_start = np.full(n, to_cents(profile['amStartTill']))
+    expected = _u(rng, profile['expectedDeposit'], n)
+    till_added = _u(rng, profile['lotteryTillAdded'], n)
+    should_have = expected
+    variance = profile['posVariance'] * variance_scale
+    actually_have = should_have + _u(rng, (-variance, variance), n)
+
+    lottery_am = np.full(n, to_cents(profile['lotteryAmStart']))
+    video = _u(rng, profile['videoCashIn'], n)
+    online = _u(rng, profile['onlineSales'], n)
+    extra = [_u(rng, b, n) for b in profile['extraMoney']]
+    online_validate = _u(rng, profile['onlineValidate'], n)
+    free_tickets = _u(rng, profile['freeTickets'], n)
+    scratch = _u(rng, profile['scratchItValidate'], n)
+    misc = [_u(rng, b, n) for b in profile['miscPayout']]
+    money_given = online_validate + free_tickets + scratch + sum(misc)
+    total_lottery = lottery_am + video + online + sum(extra) - money_given
+    transfer_bank = _u(rng, profile['transferBank'], n)
+
+    cols = {
+        'pos': {
+            'amStartTill': am_start,
+            'expectedDeposit': expected,
+            'lotteryTillAdded': till_added,
+            'totalPosSales': expected - am_start - till_added,
+            'transferBankShouldHave': should_have,
+            'transferBankActuallyHave': actually_have,
+            'overShort': actually_have - should_have,
+        },
+        'lottery': {
+            'amStartTill': lottery_am,
+            'videoCashIn': video,
+            'onlineSales': online,
+        },
+    }
+    lottery = cols['lottery']
+    if shift_type == 'day':
+        lottery['extraMoneyAdded'] = extra[0]
+    else:
+        lottery['extraMoneyAddedDayshift'] = extra[0]
+        lottery['extraMoneyAddedNightshift'] = extra[1]
+    lottery['onlineValidate'] = online_validate
+    lottery['freeTickets'] = free_tickets
+    lottery['scratchItValidate'] = scratch
+    if shift_type == 'day':
+        lottery['miscPayout'] = misc[0]
+    else:
+        lottery['miscPayoutDayshift'] = misc[0]
+        lottery['miscPayoutNightshift'] = misc[1]
+    lottery['transferBank'] = transfer_bank
+    lottery['moneyGivenToPos'] = money_given
+    lottery['videoValidate'] = video
+    lottery['totalLottery'] = total_lottery
+    lottery['overShort'] = total_lottery - transfer_bank
+
+    # Convert once per column instead of once per field per report
+    dollars = {section: {k: to_dollars(v) for k, v in fields.items()}
+               for section, fields in cols.items()}
+
+    if shift_type == 'day':
+        keep = rng.random((n, 8)) < profile['drawProbability']
+        amounts = _u(rng, profile['drawAmount'], (n, 8))
+        keep &= amounts > 0
+        dollars['draws'] = (keep.tolist(), to_dollars(amounts))
+    else:
+        bounds = np.array(profile['deposits'], dtype=np.float64)
+        deposits = _u(rng, (bounds[:, 0], bounds[:, 1]), (n, len(bounds)))
+        dollars['deposits'] = to_dollars(deposits)
+        dollars['depositTotals'] = to_dollars(deposits.sum(axis=1))
+    return dollars
+
+
+def _build_reports(arrays, shift_type, profile, dates, employees, location_id, id_for):
+    """Turn the column arrays of one shift type into ShiftReport records"""
+    pos, lottery = arrays['pos'], arrays['lottery']
+    # Rows line up with the record fields; fields this shift type lacks stay None
+    pos_rows = zip(*(pos[key] for key in POS_KEYS[:-1]))
+    lottery_rows = zip(*(lottery.get(key, repeat(None)) for key in LOTTERY_KEYS[:-1]))
+    reports = []
+    for i, (date_str, pos_row, lottery_row) in enumerate(zip(dates, pos_rows, lottery_rows)):
+        report = ShiftReport(
+            id_for(i), date_str, shift_type, employees[i], 'submitted',
+            date_str + profile['submittedTime'], location_id,
+            PosShiftData(*pos_row, profile['posComment']),
+            LotteryShiftData(*lottery_row, profile['lotteryComment']),
+        )
+        if shift_type == 'day':
+            keep, amounts = arrays['draws']
+            report.lottery_draws = [LotteryDraw(amounts[i][j], j + 1) for j in range(8) if keep[i][j]]
+        else:
+            report.transfer_bank_deposits = [TransferBankDeposit(denom, amount, amount)
+                                             for denom, amount in zip(DENOMINATIONS, arrays['deposits'][i])]
+            report.transfer_bank_details = TransferBankDetails(
+                lottery['transferBank'][i], pos['transferBankShouldHave'][i],
+                pos['transferBankActuallyHave'][i], arrays['depositTotals'][i],
+            )
+        reports.append(report)
+    return reports
+
+
+def generate_chunk(chunk):
+    """Generate the ShiftReport records of one chunk (location x run of days), in date order"""
+    rng = np.random.default_rng(chunk['seed'])
+    dates = chunk['dates']
+    n = len(dates)
+    employees = chunk['employees']
+    m = len(employees)
+    options = chunk['options']
+
+    day_idx = rng.integers(0, m, n)
+    # The night shift is always someone other than the day employee
+    night_idx = (day_idx + 1 + rng.integers(0, max(m - 1, 1), n)) % m if m > 1 else day_idx
+    has_day = rng.random(n) < options['dayRate']
+    has_night = rng.random(n) < options['nightRate']
+
+    by_date = {}
+    for shift_type, profile, idx, present, offset in (
+        ('day', options['dayProfile'], day_idx, has_day, 0),
+        ('night', options['nightProfile'], night_idx, has_night, 1),
+    ):
+        arrays = _shift_arrays(rng, profile, n, shift_type, options['varianceScale'])
+        names = [employees[j] for j in idx.tolist()]
+        if options['idTemplate'] is None:
+            def id_for(i, shift_type=shift_type, names=names):
+                return report_id((dates[i], shift_type, names[i], chunk['locationId'] or ''))
+        else:
+            def id_for(i, offset=offset, shift_type=shift_type):
+                return options['idTemplate'].format(
+                    n=chunk['firstSlot'] + 2 * i + offset, location=chunk['locationNo'],
+                    date=dates[i].replace('-', ''), shift=shift_type)
+        reports = _build_reports(arrays, shift_type, profile, dates, names, chunk['locationId'], id_for)
+        for i, report in enumerate(reports):
+            if present[i]:
+                by_date.setdefault(i, []).append(report)
+    return [report for i in sorted(by_date) for report in by_date[i]]
+
+
+def _serialize_chunk(chunk):
+    """Generate a chunk inside a worker and return it already encoded"""
+    reports = generate_chunk(chunk)
+    fmt = chunk['options']['format']
+    reports = [r.to_dict() for r in reports]
+    if fmt == 'jsonl':
+        text = ''.join(encode_item(r, None) + '\n' for r in reports)
+    elif fmt == 'compact':
+        text = ','.join(encode_item(r, None) for r in reports)
+    else:
+        text = ',\n'.join(encode_item(r) for r in reports)
+    return text, len(reports)
+
+
+def plan_chunks(dates, locations=1, employees_per_location=6, employee_names=None,
+                seed=None, chunk_days=CHUNK_DAYS, day_rate=1.0, night_rate=1.0,
+                variance_scale=1.0, day_profile=None, night_profile=None,
+                id_template='gen-{location:03d}-{date}-{shift}', first_id=1, fmt='json',
+                location_ids=None):
+    """Split the dataset into independently seeded chunks
+
+    id_template=None gives every report the ID derived from its natural key
+    (see reportKeys), so regenerating a shift reproduces its ID.
+    """
+    if location_ids is None:
+        location_ids = [f'location-{i + 1:03d}' for i in range(locations)] if locations > 1 else [None]
+    options = {
+        'dayRate': day_rate,
+        'nightRate': night_rate,
+        'varianceScale': variance_scale,
+        'dayProfile': {**DAY_PROFILE, **(day_profile or {})},
+        'nightProfile': {**NIGHT_PROFILE, **(night_profile or {})},
+        'idTemplate': id_template,
+        'format': fmt,
+    }
+    runs = [dates[i:i + chunk_days] for i in range(0, len(dates), chunk_days)]
+    seeds = np.random.SeedSequence(seed).spawn(len(location_ids) * len(runs))
+    chunks = []
+    slot = first_id
+    for loc_no, location_id in enumerate(location_ids):
+        if employee_names:
+            employees = list(employee_names)
+        else:
+            employees = [f'Employee {loc_no + 1:03d}-{e + 1:03d}' for e in range(employees_per_location)]
+        for run in runs:
+            chunks.append({
+                'seed': seeds[len(chunks)],
+                'locationNo': loc_no + 1,
+                'locationId': location_id,
+                'employees': employees,
+                'dates': run,
+                'firstSlot': slot,
+                'options': options,
+            })
+            slot += 2 * len(run)
+    return chunks
+
+
+def iter_records(dates, **kwargs):
+    """Generate ShiftReport records in-process, for the small sample scripts"""
+    for chunk in plan_chunks(dates, **kwargs):
+        yield from generate_chunk(chunk)
+
+
+def iter_reports(dates, **kwargs):
+    """Generate report dicts in-process"""
+    for record in iter_records(dates, **kwargs):
+        yield record.to_dict()
+
+
+def write_dataset(path, chunks, workers=1):
+    """Generate the chunks (in parallel when workers > 1) and stream them to path in chunk order"""
+    fmt = chunks[0]['options']['format'] if chunks else 'json'
+    total = 0
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        if fmt != 'jsonl':
+            f.write('[')
+        first = True
+
+        def write(text, count):
+            nonlocal first, total
+            if not count:
+                return
+            if fmt == 'json':
+                f.write('\n' if first else ',\n')
+            elif fmt == 'compact' and not first:
+                f.write(',')
+            f.write(text)
+            first = False
+            total += count
+
+        if workers > 1 and len(chunks) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for text, count in pool.map(_serialize_chunk, chunks):
+                    write(text, count)
+        else:
+            for chunk in chunks:
+                write(*_serialize_chunk(chunk))
+        if fmt == 'json':
+            f.write(']' if first else '\n]')
+        elif fmt == 'compact':
+            f.write(']')
+    os.replace(tmp_path, path)
+    return total
+
+
+def generate_chunks(chunks, workers=1):
+    """Yield the records of every chunk in chunk order, generated in parallel when workers > 1"""
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for records in pool.map(generate_chunk, chunks):
+                yield from records
+    else:
+        for chunk in chunks:
+            yield from generate_chunk(chunk)
+
+
+def write_partitioned(data_dir, chunks, workers=1):
+    """Generate the chunks into data_dir/partitions, replacing what is there; returns the report count"""
+    from partitionedStore import open_partitions
+
+    results = open_partitions(data_dir).reset(generate_chunks(chunks, workers), workers)
+    return sum(result['reports'] for result in results.values())
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description='Generate a synthetic shift-report dataset')
+    parser.add_argument('output', help='Output file (.json array or .jsonl), or a data directory with --partitioned')
+    parser.add_argument('--start', default='2024-01-01', help='First date (default: %(default)s)')
+    parser.add_argument('--end', default='2024-12-31', help='Last date, inclusive (default: %(default)s)')
+    parser.add_argument('--locations', type=int, default=1)
+    parser.add_argument('--employees', type=int, default=6, help='Employees per location')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-j', '--workers', type=int, default=1)
+    parser.add_argument('--chunk-days', type=int, default=CHUNK_DAYS)
+    parser.add_argument('--day-rate', type=float, default=1.0, help='Share of days with a day shift report')
+    parser.add_argument('--night-rate', type=float, default=1.0, help='Share of days with a night shift report')
+    parser.add_argument('--variance-scale', type=float, default=1.0,
+                        help='Multiplier on the POS over/short variance (day +/-15, night +/-20)')
+    parser.add_argument('--format', choices=FORMATS, default=None,
+                        help='json (indented, like shiftReports.json), compact or jsonl '
+                             '(default: from the file extension)')
+    parser.add_argument('--partitioned', action='store_true',
+                        help='Write the location/month partitions under OUTPUT/partitions instead of one file')
+    args = parser.parse_args()
+
+    fmt = args.format or ('jsonl' if args.output.endswith('.jsonl') else 'json')
+    chunks = plan_chunks(
+        date_range(args.start, args.end), locations=args.locations, employees_per_location=args.employees,
+        seed=args.seed, chunk_days=args.chunk_days, day_rate=args.day_rate, night_rate=args.night_rate,
+        variance_scale=args.variance_scale, fmt=fmt,
+    )
+    started = time.perf_counter()
+    if args.partitioned:
+        total = write_partitioned(args.output, chunks, max(args.workers, 1))
+    else:
+        total = write_dataset(args.output, chunks, max(args.workers, 1))
+    elapsed = time.perf_counter() - started
+    print(f'[SUCCESS] Generated {total} shift reports in {len(chunks)} chunks to {args.output} '
+          f'in {elapsed:.2f}s ({total / elapsed if elapsed else 0:.0f} reports/s)')